@@ -135,4 +135,62 @@ def get_hour(format_date_str):
 def get_date(format_date_str):
     date_format = "%Y-%m-%d %H:%M:%S.%f"
     date = datetime.strptime(format_date_str, date_format)
-    return date.date()
\ No newline at end of file
+    return date.date()
+
+# 以下为上面时间函数的向量化版本：一次 pd.to_datetime 解析整列，避免对同一批时间字符串反复 strptime
+def parse_datetime_array(time_values) -> pd.Series:
+    """
+    向量化解析时间字符串（兼容带毫秒/不带毫秒），无法解析的值为NaT
+    
+    参数:
+        time_values: 时间字符串序列（列表、ndarray或Series），已是datetime64的直接返回
+    返回:
+        datetime64[ns] 类型的Series
+    """
+    values = time_values if isinstance(time_values, pd.Series) else pd.Series(time_values)
+    if pd.api.types.is_datetime64_any_dtype(values):
+        return values
+    return pd.to_datetime(values, format="ISO8601", errors="coerce")
+
+def calculate_time_diff_array(format_start_times, format_end_times) -> np.ndarray:
+    """批量计算时间差（秒），任一端无法解析时结果为NaN"""
+    start_times = parse_datetime_array(format_start_times).reset_index(drop=True)
+    end_times = parse_datetime_array(format_end_times).reset_index(drop=True)
+    return (end_times - start_times).dt.total_seconds().to_numpy()
+
+def get_weekday_array(format_date_strs) -> np.ndarray:
+    """批量判断周几（0=周一）"""
+    return parse_datetime_array(format_date_strs).dt.weekday.to_numpy()
+
+def is_weekday_array(format_date_strs) -> np.ndarray:
+    """批量判断是否工作日"""
+    return get_weekday_array(format_date_strs) < 5
+
+def get_hour_array(format_date_strs) -> np.ndarray:
+    """批量获取小时"""
+    return parse_datetime_array(format_date_strs).dt.hour.to_numpy()
+
+def get_date_array(format_date_strs) -> np.ndarray:
+    """批量提取日期（datetime.date对象）"""
+    return parse_datetime_array(format_date_strs).dt.date.to_numpy()
+
+def add_time_columns(df: pd.DataFrame, start_col: str = "start_time", end_col: str = "end_time") -> pd.DataFrame:
+    """
+    为行程表添加解析后的时间列及派生列（原地修改并返回df）
+    
+    新增列:
+        start_datetime / end_datetime: datetime64
+        hour: 出发小时
+        weekday: 出发日是周几（0=周一）
+        is_weekday: 出发日是否工作日
+        date: 出发日期（datetime.date）
+        duration_s: 行程时长（秒）
+    """
+    df["start_datetime"] = parse_datetime_array(df[start_col])
+    df["end_datetime"] = parse_datetime_array(df[end_col])
+    df["hour"] = df["start_datetime"].dt.hour
+    df["weekday"] = df["start_datetime"].dt.weekday
+    df["is_weekday"] = df["weekday"] < 5
+    df["date"] = df["start_datetime"].dt.date
+    df["duration_s"] = (df["end_datetime"] - df["start_datetime"]).dt.total_seconds()
+    return df
@@ -11,28 +11,27 @@ import pandas as pd
 from Handle_csv.scenario.navigation.navigation_info import get_navigation_info
 from Handle_csv.scenario.navigation.navigation_poi_time import plot_route_timeline, plot_route
 from scenario.navigation.navigation_persona import Navi_Persona
-from scenario.navigation.navigation_feature_label_new import Basic_feature_label
+from scenario.navigation.navigation_feature_label_new import Basic_feature_label, load_label_template
 from scenario.navigation.basic_info import navi_info
 
 
 def get_target_info(Navi_info:navi_info, scenario_type):
     config = Navi_info.config
-    navi_info = Navi_info.Get_json_info()
-    navi_data = navi_info['poi_info_list']
-    str_navi_data = str(navi_data)
     if scenario_type == 'navigation_json':
         print("Processing navigation scenario...")
+        # 只输出行程列表，不需要等待居住地推断
+        navi_data = Navi_info.trip_table.to_records()
         return json.dumps(navi_data,ensure_ascii=False, indent=2)
     
     elif scenario_type == 'nagivation_draw':
         print("Drawinging navigation scenario...")
 
-        plot_buf = plot_route_timeline(navi_data)
+        plot_buf = plot_route_timeline(Navi_info.trip_table)
         return plot_buf
     
     elif scenario_type == 'route_map':
         print("Drawinging route scenario...")
-        fig = plot_route(navi_data)
+        fig = plot_route(Navi_info.trip_table)
         return fig
     
     # elif scenario_type == 'user_overall_profile':
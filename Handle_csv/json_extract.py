@@ -0,0 +1,176 @@
+import json
+import threading
+from collections import OrderedDict
+from typing import Any, List, Optional, Sequence, Tuple
+
+# 可选的更快JSON解码器，未安装时退回标准库
+try:
+    import orjson
+
+    def loads(json_str):
+        return orjson.loads(json_str)
+except ImportError:
+    orjson = None
+    loads = json.loads
+
+_MISS = object()  # 快速路径未命中的标记
+
+
+class _LRUMemo:
+    """按原始字符串记忆解析结果的有界LRU缓存（大量行的payload完全相同），线程安全"""
+
+    def __init__(self, max_size: int):
+        self.max_size = max_size
+        self._data: "OrderedDict[str, Any]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Any:
+        with self._lock:
+            value = self._data.get(key, _MISS)
+            if value is not _MISS:
+                self._data.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: Any) -> None:
+        with self._lock:
+            self._data[key] = value
+            if len(self._data) > self.max_size:
+                self._data.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+class PathCachedKeyExtractor:
+    """
+    带路径学习的 find_any_key
+
+    首次命中时记录目标键所在字典的路径（字典键/列表下标序列），之后的payload先沿已学习的
+    路径直接取值，取不到或结果有歧义（如值为None）时再退回通用的递归查找。
+    沿路径前进时会检查每一层是否已包含目标键，保证与 find_any_key "先查当前层" 的优先级一致；
+    仅当更早的兄弟分支中也存在目标键时，结果才可能与通用查找不同（同一埋点schema下不会出现）。
+    """
+
+    def __init__(self, target_keys: Sequence[str], max_paths: int = 8, memo_size: int = 100_000):
+        self.target_keys: List[str] = [target_keys] if isinstance(target_keys, str) else list(target_keys)
+        self.max_paths = max_paths
+        self.paths: List[Tuple[Any, ...]] = []
+        self.memo = _LRUMemo(memo_size)
+        self.stats = {"memo_hits": 0, "path_hits": 0, "fallbacks": 0, "parse_errors": 0}
+
+    def _value_at(self, obj: dict) -> Any:
+        """按目标键顺序取当前字典中的值（与find_any_key相同的判断）"""
+        for key in self.target_keys:
+            if key in obj and obj[key] != "":
+                return obj[key]
+        return _MISS
+
+    def _follow(self, obj: Any, path: Tuple[Any, ...]) -> Any:
+        """沿已学习路径取值，失败或有歧义时返回_MISS"""
+        current = obj
+        for step in path:
+            if isinstance(current, dict):
+                if self._value_at(current) is not _MISS:
+                    return _MISS  # 上层已有目标键，交给通用查找决定
+                current = current.get(step, _MISS)
+            elif isinstance(current, list) and isinstance(step, int) and step < len(current):
+                current = current[step]
+            else:
+                return _MISS
+            if current is _MISS:
+                return _MISS
+        if not isinstance(current, dict):
+            return _MISS
+        value = self._value_at(current)
+        return _MISS if value is None else value
+
+    def _find_with_path(self, obj: Any, path: Tuple[Any, ...]) -> Tuple[Any, Optional[Tuple[Any, ...]]]:
+        """通用递归查找（与find_any_key遍历顺序一致），同时返回命中字典的路径"""
+        if isinstance(obj, dict):
+            value = self._value_at(obj)
+            if value is not _MISS:
+                return value, path
+            for key, child in obj.items():
+                result, found_path = self._find_with_path(child, path + (key,))
+                if result is not None:
+                    return result, found_path
+        elif isinstance(obj, list):
+            for index, item in enumerate(obj):
+                result, found_path = self._find_with_path(item, path + (index,))
+                if result is not None:
+                    return result, found_path
+        return None, None
+
+    def extract_from_obj(self, obj: Any) -> Any:
+        for path in self.paths:
+            value = self._follow(obj, path)
+            if value is not _MISS:
+                self.stats["path_hits"] += 1
+                return value
+        self.stats["fallbacks"] += 1
+        value, path = self._find_with_path(obj, ())
+        if value is not None and path is not None and path not in self.paths and len(self.paths) < self.max_paths:
+            self.paths.append(path)
+        return value
+
+    def extract(self, json_str: Optional[str]) -> Any:
+        """从JSON字符串中提取目标键的值，未找到返回None"""
+        if not json_str:
+            return None
+        cached = self.memo.get(json_str)
+        if cached is not _MISS:
+            self.stats["memo_hits"] += 1
+            return cached
+        try:
+            obj = loads(json_str)
+        except (ValueError, TypeError):
+            self.stats["parse_errors"] += 1
+            obj = None
+        value = self.extract_from_obj(obj) if obj is not None else None
+        self.memo.set(json_str, value)
+        return value
+
+
+class SignalValueExtractor:
+    """
+    从 status_json 信号列表 [{"name": ..., "value": ...}] 中提取指定信号的值
+
+    记录信号在列表中的下标，之后先检查该下标处的信号名，不匹配时再线性扫描；
+    结果按原始字符串记忆。
+    """
+
+    def __init__(self, signal_name: str, memo_size: int = 100_000):
+        self.signal_name = signal_name
+        self.index_hint: Optional[int] = None
+        self.memo = _LRUMemo(memo_size)
+
+    def _first_non_empty(self, signals: list) -> Any:
+        hint = self.index_hint
+        if hint is not None and hint < len(signals):
+            item = signals[hint]
+            if isinstance(item, dict) and item.get("name") == self.signal_name and item.get("value"):
+                return item["value"]
+        for index, item in enumerate(signals):
+            if isinstance(item, dict) and item.get("name") == self.signal_name and item.get("value"):
+                self.index_hint = index
+                return item["value"]
+        return None
+
+    def extract(self, json_str: Optional[str]) -> Any:
+        """返回信号的第一个非空值，未找到返回None"""
+        if not json_str:
+            return None
+        cached = self.memo.get(json_str)
+        if cached is not _MISS:
+            return cached
+        try:
+            signals = loads(json_str)
+        except (ValueError, TypeError):
+            signals = None
+        value = self._first_non_empty(signals) if isinstance(signals, list) else None
+        self.memo.set(json_str, value)
+        return value
@@ -1,8 +1,12 @@
+import threading
+import pandas as pd
+from concurrent.futures import ThreadPoolExecutor
 from use_GaoDe_api.geo import *
 from use_GaoDe_api.district import *
 from use_GaoDe_api.draw import *
 from Handle_csv.Util import *
 from use_llm.My_LLM import ask_LLMmodel
+from Handle_csv.scenario.navigation.trip_table import TripTable, TripRow
 class poi_info: #单次出行的起点和终点信息
     def __init__(self,info_dict: dict)-> None:
         self.start_location = info_dict['start_location'] # '116.407526,39.90403' 经度，纬度
@@ -39,21 +43,105 @@ class poi_info: #单次出行的起点和终点信息
         }
 
 
+ANCHOR_PENDING = "推断中"  # 居住地/工作地尚未推断完成时JSON中的占位值
+
+# 居住地/工作地的后台预取线程池（所有navi_info共享，LLM调用以IO等待为主）
+_anchor_executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix="anchor_prefetch")
+
+
 class navi_info: #一个vin的各段出行信息
-    def __init__(self,poi_info_list: list[poi_info],vin ="",config = None) -> None:
-        self.poi_info_list = poi_info_list
-        self.vin = "待接入"
-        self.home = self.get_home_name()
-        self.workplace = self.get_workplace_name()
+    # 锚点名称 -> 推断方法名
+    ANCHOR_GETTERS = {"home": "get_home_name", "workplace": "get_workplace_name"}
+
+    def __init__(self,poi_info_list,vin ="",config = None, prefetch_anchors = False) -> None:
+        # poi_info_list 可以是 poi_info 对象列表、字典列表或 TripTable，统一存为列式行程表
+        self.trip_table = TripTable.coerce(poi_info_list)
+        self.vin = vin if vin else "待接入"
         self.config = config
-    
+        # 居住地/工作地需要调用LLM，改为首次访问时才推断并缓存；地图、知识图谱等不读取它们的模块无需等待
+        self._anchors = {}
+        self._init_anchor_state()
+        if prefetch_anchors:
+            self.prefetch_anchors()
+
+    def _init_anchor_state(self) -> None:
+        self._anchor_futures = {}
+        self._anchor_locks = {name: threading.Lock() for name in self.ANCHOR_GETTERS}
+
+    def prefetch_anchors(self) -> "navi_info":
+        """在后台线程中提前推断居住地和工作地，不阻塞调用方"""
+        for name, getter in self.ANCHOR_GETTERS.items():
+            with self._anchor_locks[name]:
+                if name not in self._anchors and name not in self._anchor_futures:
+                    self._anchor_futures[name] = _anchor_executor.submit(getattr(self, getter))
+        return self
+
+    def _get_anchor(self, name: str):
+        """取锚点：已缓存直接返回；有后台预取则等待其结果；否则同步推断"""
+        with self._anchor_locks[name]:
+            if name not in self._anchors:
+                future = self._anchor_futures.pop(name, None)
+                if future is not None:
+                    self._anchors[name] = future.result()
+                else:
+                    self._anchors[name] = getattr(self, self.ANCHOR_GETTERS[name])()
+            return self._anchors[name]
+
+    def anchors_ready(self) -> bool:
+        """居住地和工作地是否都已得到结果（不会触发推断）"""
+        return all(name in self._anchors or
+                   (name in self._anchor_futures and self._anchor_futures[name].done())
+                   for name in self.ANCHOR_GETTERS)
 
+    @property
+    def home(self):
+        return self._get_anchor("home")
 
-    def Get_json_info(self):
+    @home.setter
+    def home(self, value):
+        self._anchors["home"] = value
+
+    @property
+    def workplace(self):
+        return self._get_anchor("workplace")
+
+    @workplace.setter
+    def workplace(self, value):
+        self._anchors["workplace"] = value
+
+    def __getstate__(self):
+        # 线程锁和Future无法序列化：已完成的预取结果并入缓存，未完成的在反序列化后重新按需推断
+        state = self.__dict__.copy()
+        anchors = dict(self._anchors)
+        for name, future in self._anchor_futures.items():
+            if future.done() and future.exception() is None:
+                anchors.setdefault(name, future.result())
+        state["_anchors"] = anchors
+        state.pop("_anchor_futures", None)
+        state.pop("_anchor_locks", None)
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._init_anchor_state()
+
+
+    @property
+    def poi_info_list(self) -> list[TripRow]:
+        """兼容旧接口：行程表的行视图列表"""
+        return list(self.trip_table)
+
+    def Get_json_info(self, wait_for_anchors: bool = False):
+        """
+        导航信息的JSON形式
+
+        参数:
+            wait_for_anchors: 是否等待居住地推断完成；默认不等待，未完成时 home 为 ANCHOR_PENDING
+        """
         json_info = {
             'vin':self.vin,
-            'home':self.home,
-            'poi_info_list': [poi_info.get_json_info() for poi_info in self.poi_info_list]
+            'home':self.home if wait_for_anchors or self.anchors_ready() else ANCHOR_PENDING,
+            'poi_info_list': self.trip_table.to_records()
         }
         return json_info
     
@@ -67,14 +155,18 @@ class navi_info: #一个vin的各段出行信息
         prompt = f"请分析输入的列表{input}，结合其type字段，帮我分析哪个地点（也就是poi字段）是用户的工作地，直接给出对应的地点名称（列表中其中一项的poi字段值）;如果不能判断出用户的工作地，则直接回答 无法确认用户工作地\n"
         return ask_LLMmodel(input,prompt)
 
+    def get_trip_frame(self) -> pd.DataFrame:
+        """行程表的DataFrame形式，含解析后的时间列及小时/周几/日期等派生列，只计算一次"""
+        return self.trip_table.to_frame()
+
     def get_poi_name_list(self)->list[str]:
-        return [poi_info.poi for poi_info in self.poi_info_list]
+        return self.trip_table.poi.tolist()
     
     def get_driving_distance_list(self)->list[float]: 
         return [poi_info.get_driving_distance() for poi_info in self.poi_info_list]
 
     def get_driving_time_list(self)->list[float]:
-        return [poi_info.get_driving_time() for poi_info in self.poi_info_list]
+        return (self.trip_table.duration_s / 60).tolist()
     
     def get_area_span(self)->list[dict]:
         return [poi_info.get_administrative_division() for poi_info in self.poi_info_list]
@@ -3,39 +3,52 @@ from folium import PolyLine, CircleMarker
 from folium.plugins import MarkerCluster, MiniMap
 from datetime import datetime
 from typing import List, Dict, Any
+import math
+import pandas as pd
+from Handle_csv.scenario.navigation.trip_table import TripTable
 
-def create_daily_navigation_maps(poi_info_list: List[Dict[str, Any]]) -> List[folium.Map]:
+def _format_hour_minute(time_obj) -> str:
+    """格式化为 时:分，时间无法解析时抛出ValueError（与逐条strptime的行为一致）"""
+    if pd.isna(time_obj):
+        raise ValueError("无法解析的时间")
+    return time_obj.strftime('%H:%M')
+
+def _lat_lon(lons, lats, index: int) -> List[float]:
+    """取行程表中第index行的 [纬度, 经度]，坐标无法解析时抛出ValueError"""
+    lon, lat = float(lons[index]), float(lats[index])
+    if math.isnan(lon) or math.isnan(lat):
+        raise ValueError("无法解析的坐标")
+    return [lat, lon]
+
+def create_daily_navigation_maps(poi_info_list) -> List[folium.Map]:
     """
     根据导航数据创建按天分组的交互式地图
     
     参数:
-        poi_info_list: 导航POI信息列表
+        poi_info_list: 导航POI信息列表（字典列表或TripTable）
         
     返回:
         按天分组的交互式地图列表
     """
-    # 按日期分组数据
+    # 直接使用行程表中已解析的时间和经纬度，按日期分组记录下标
+    trip_table = TripTable.coerce(poi_info_list)
+    start_datetimes = pd.Series(trip_table.start_datetime)
+    end_datetimes = pd.Series(trip_table.end_datetime)
     daily_data = {}
     
-    for item in poi_info_list:
-        # 提取日期部分（去除时间）
-        try:
-            date_str = datetime.strptime(item['start_time'], "%Y-%m-%d %H:%M:%S.%f").date()
-        except (KeyError, ValueError):
+    for i, start_dt in enumerate(start_datetimes):
+        if pd.isna(start_dt):
             # 处理日期格式错误
             continue
-            
-        if date_str not in daily_data:
-            daily_data[date_str] = []
-        daily_data[date_str].append(item)
+        daily_data.setdefault(start_dt.date(), []).append(i)
     
     # 为每一天创建地图
     maps = []
-    for date, data in sorted(daily_data.items()):
+    for date, indices in sorted(daily_data.items()):
+        data = [trip_table[i] for i in indices]
         # 创建地图，以第一条数据的起点为中心
         try:
-            first_start = data[0]['start_location'].split(',')
-            center_lat, center_lon = float(first_start[1]), float(first_start[0])
+            center_lat, center_lon = _lat_lon(trip_table.start_lon, trip_table.start_lat, indices[0])
         except (IndexError, ValueError):
             # 如果无法获取起点，使用默认位置（上海）
             center_lat, center_lon = 31.2304, 121.4737
@@ -57,9 +70,8 @@ def create_daily_navigation_maps(poi_info_list: List[Dict[str, Any]]) -> List[fo
         all_points = []
         
         # 添加起点标记
-        start_loc = data[0]['start_location'].split(',')
         try:
-            start_lon, start_lat = float(start_loc[0]), float(start_loc[1])
+            start_lat, start_lon = _lat_lon(trip_table.start_lon, trip_table.start_lat, indices[0])
             CircleMarker(
                 location=[start_lat, start_lon],
                 radius=10,
@@ -67,7 +79,7 @@ def create_daily_navigation_maps(poi_info_list: List[Dict[str, Any]]) -> List[fo
                 fill=True,
                 fill_color='green',
                 fill_opacity=0.7,
-                popup=f"起点: {datetime.strptime(data[0]['start_time'], '%Y-%m-%d %H:%M:%S.%f').strftime('%H:%M')}"
+                popup=f"起点: {_format_hour_minute(start_datetimes.iloc[indices[0]])}"
             ).add_to(marker_cluster)
             all_points.append([start_lat, start_lon])
         except (IndexError, ValueError):
@@ -81,9 +93,8 @@ def create_daily_navigation_maps(poi_info_list: List[Dict[str, Any]]) -> List[fo
         # 添加每个POI的标记
         for i, item in enumerate(data):
             try:
-                # 解析POI位置
-                poi_loc = item['poi_location'].split(',')
-                poi_lon, poi_lat = float(poi_loc[0]), float(poi_loc[1])
+                # POI位置（行程表中已解析）
+                poi_lat, poi_lon = _lat_lon(trip_table.poi_lon, trip_table.poi_lat, indices[i])
                 
                 # 添加POI标记
                 CircleMarker(
@@ -96,7 +107,7 @@ def create_daily_navigation_maps(poi_info_list: List[Dict[str, Any]]) -> List[fo
                     popup=f"""
                     <strong>{item['poi']}</strong><br>
                     类型: {item['type']}<br>
-                    到达: {datetime.strptime(item['end_time'], '%Y-%m-%d %H:%M:%S.%f').strftime('%H:%M')}
+                    到达: {_format_hour_minute(end_datetimes.iloc[indices[i]])}
                     """
                 ).add_to(marker_cluster)
                 
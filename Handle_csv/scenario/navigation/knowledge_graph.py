@@ -1,15 +1,17 @@
 import networkx as nx
 import pandas as pd
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
 import json
 import io  # 新增：导入io模块
 from datetime import datetime
 from pyvis.network import Network
 from io import BytesIO, StringIO
-from Handle_csv.Util import calculate_time_diff
+from Handle_csv.scenario.navigation.trip_table import TripTable
 from Handle_csv.scenario.navigation.visualization import generate_kg_visualization
+from utils.logger_setup import diagnostics
 import os
 import tempfile
+from utils.perf import perf_recorder
 
 class NavigationKnowledgeGraph:
     """导航知识图谱核心类（支持预测性导航和智能提醒）"""
@@ -43,13 +45,16 @@ class NavigationKnowledgeGraph:
             entity_type="地点"  # 确保设置entity_type
         )
     
-    def add_time_entity(self, time_id: str, time_str: str) -> None:
-        """添加时间实体"""
+    def add_time_entity(self, time_id: str, time_str: str, time_obj: Optional[datetime] = None) -> None:
+        """添加时间实体（time_obj为已解析的时间时不再重复解析）"""
         try:
             # 处理不同格式的时间字符串
             if '.' in time_str:
                 time_str = time_str.split('.')[0]  # 移除毫秒部分
-            time_obj = datetime.fromisoformat(time_str)
+            if time_obj is None:
+                time_obj = datetime.fromisoformat(time_str)
+            elif pd.isna(time_obj):
+                raise ValueError("无法解析的时间")
             time_attr = {
                 "type": "timestamp",
                 "label": time_str,
@@ -97,8 +102,9 @@ class NavigationKnowledgeGraph:
             weight=1.0
         )
     
-    def build_from_json_info(self, json_info_list: List[Dict[str, Any]]) -> None:
-        """从导航信息列表构建知识图谱"""
+    @perf_recorder.timed("知识图谱构建", size_func=lambda self, json_info_list: len(json_info_list))
+    def build_from_json_info(self, json_info_list) -> None:
+        """从导航信息列表（字典列表或TripTable）构建知识图谱"""
         if not json_info_list:
             return
         
@@ -106,11 +112,17 @@ class NavigationKnowledgeGraph:
         prev_loc_id = None
         prev_end_time = None
         
+        # 直接使用行程表中已解析的开始/结束时间和导航时长（分钟）
+        trip_table = TripTable.coerce(json_info_list)
+        start_datetimes = pd.Series(trip_table.start_datetime)
+        end_datetimes = pd.Series(trip_table.end_datetime)
+        durations = trip_table.duration_s / 60
+        
         for i, item in enumerate(json_info_list):
             # 确保必要字段存在
             required_fields = ["start_location", "poi_location", "start_time", "end_time", "poi"]
             if not all(field in item for field in required_fields):
-                print(f"跳过不完整数据: {item}")
+                diagnostics.record("知识图谱跳过不完整数据", item)
                 continue
             
             # 处理地点实体
@@ -132,14 +144,16 @@ class NavigationKnowledgeGraph:
             
             # 处理时间实体
             start_time_id = f"time_start_{i}"
-            self.add_time_entity(start_time_id, item["start_time"])
+            self.add_time_entity(start_time_id, item["start_time"], start_datetimes.iloc[i])
             
             end_time_id = f"time_end_{i}"
-            self.add_time_entity(end_time_id, item["end_time"])
+            self.add_time_entity(end_time_id, item["end_time"], end_datetimes.iloc[i])
             
             # 处理导航事件
             try:
-                duration = calculate_time_diff(item["start_time"], item["end_time"]) / 60
+                duration = durations[i]
+                if pd.isna(duration):
+                    raise ValueError(f"无法解析时间: {item['start_time']} / {item['end_time']}")
                 event_id = f"event_{i}"
                 self.add_navigation_event(
                     event_id,
@@ -150,19 +164,20 @@ class NavigationKnowledgeGraph:
                     duration
                 )
             except Exception as e:
-                print(f"计算导航时长失败: {e}")
+                diagnostics.record("知识图谱计算导航时长失败", e)
                 continue
             
             # 构建地点先后关系
-            if prev_loc_id and prev_end_time:
-                try:
-                    interval = calculate_time_diff(prev_end_time, item["start_time"]) / 60
+            if prev_loc_id and prev_end_time is not None:
+                interval = (start_datetimes.iloc[i] - prev_end_time).total_seconds() / 60
+                if pd.isna(interval):
+                    diagnostics.record("知识图谱计算时间间隔失败", item['start_time'])
+                else:
                     self.add_location_relation(prev_loc_id, start_loc_id, interval)
-                except Exception as e:
-                    print(f"计算时间间隔失败: {e}")
             
             prev_loc_id = poi_loc_id
-            prev_end_time = item["end_time"]
+            prev_end_time = end_datetimes.iloc[i]
+        diagnostics.flush("知识图谱跳过不完整数据", "知识图谱计算导航时长失败", "知识图谱计算时间间隔失败")
     
     def get_prediction_features(self) -> Dict[str, Any]:
         """提取预测特征（增加容错处理）"""
@@ -0,0 +1,182 @@
+from collections import Counter
+from typing import Any, Dict, List, Tuple
+
+import numpy as np
+import pandas as pd
+
+from Handle_csv.scenario.navigation.poi_rule_classifier import strip_branch
+from Handle_csv.scenario.navigation.trip_table import TripTable
+from use_GaoDe_api.geometry import EARTH_RADIUS_KM
+
+MAX_DWELL_HOURS = 72  # 两次出行间隔超过3天视为数据缺失，不计入停留时长
+LONG_DWELL_HOURS = 4  # 长时停留的阈值
+PUBLIC_SPACE_TYPES = ("公园", "景点")
+PUBLIC_SPACE_KEYWORDS = ("公园", "绿地", "绿道", "湿地", "滨江", "滨水", "滨海", "湖", "海滩", "江边", "森林")
+NON_BRAND_TYPES = ("住宅区", "办公园区", "办公楼")  # 小区分期、园区分区等括号说明不是连锁分店
+
+
+def _project_km(lon: np.ndarray, lat: np.ndarray) -> np.ndarray:
+    """以点集平均纬度为基准的等距圆柱投影，单位为千米"""
+    scale = np.radians(1.0) * EARTH_RADIUS_KM
+    return np.column_stack([lon * scale * np.cos(np.radians(lat.mean())), lat * scale])
+
+
+def _convex_hull_area(xy: np.ndarray) -> float:
+    """单调链法求凸包，再用鞋带公式求面积"""
+    points = np.unique(xy, axis=0)  # 去重并按 (x, y) 排序
+    if len(points) < 3:
+        return 0.0
+
+    def half_hull(ordered: List[Tuple[float, float]]) -> List[Tuple[float, float]]:
+        hull: List[Tuple[float, float]] = []
+        for x, y in ordered:
+            while len(hull) >= 2 and ((hull[-1][0] - hull[-2][0]) * (y - hull[-2][1])
+                                      - (hull[-1][1] - hull[-2][1]) * (x - hull[-2][0])) <= 0:
+                hull.pop()
+            hull.append((x, y))
+        return hull
+
+    ordered = points.tolist()
+    hull = np.array(half_hull(ordered)[:-1] + half_hull(ordered[::-1])[:-1])
+    if len(hull) < 3:  # 所有点共线
+        return 0.0
+    x, y = hull[:, 0], hull[:, 1]
+    return float(abs(np.dot(x, np.roll(y, -1)) - np.dot(np.roll(x, -1), y)) / 2)
+
+
+def _principal_axes(xy: np.ndarray) -> Tuple[float, float]:
+    """
+    访问点的主方向分析
+
+    返回:
+        (长短轴之比, 主方向与正东方向的夹角(0-180度))，点数不足时为 (nan, nan)
+    """
+    if len(np.unique(xy, axis=0)) < 3:
+        return np.nan, np.nan
+    eigenvalues, eigenvectors = np.linalg.eigh(np.cov(xy.T))
+    major = eigenvectors[:, 1]
+    ratio = np.sqrt(eigenvalues[1] / eigenvalues[0]) if eigenvalues[0] > 0 else np.inf
+    return float(ratio), float(np.degrees(np.arctan2(major[1], major[0])) % 180)
+
+
+def _daily_similarity(day_codes: np.ndarray, poi_codes: np.ndarray, day_count: int, poi_count: int) -> float:
+    """相邻两个出行日所到地点集合的Jaccard相似度的平均值"""
+    if day_count < 2:
+        return np.nan
+    visited = np.zeros((day_count, poi_count), dtype=bool)
+    visited[day_codes, poi_codes] = True
+    intersection = (visited[:-1] & visited[1:]).sum(axis=1)
+    union = (visited[:-1] | visited[1:]).sum(axis=1)
+    return float(np.mean(intersection / np.maximum(union, 1)))
+
+
+def compute_mobility_metrics(trips: Any) -> Dict[str, Any]:
+    """
+    由行程表的坐标和时间数组一次性计算空间移动指标（纯NumPy，不调用LLM和高德API）
+
+    参数:
+        trips: TripTable 或可转换为 TripTable 的字典列表
+    返回:
+        {
+            "visits": 有效到访次数, "distinct_locations": 不同地点数,
+            "discovery_rate": 不同地点数/到访次数,
+            "radius_of_gyration_km": 回转半径, "hull_area_km2": 凸包面积,
+            "elongation": 长短轴之比, "orientation_deg": 主方向角度,
+            "location_entropy": 位置熵, "normalized_entropy": 归一化位置熵, "top3_share": 前3个地点的到访占比,
+            "active_days": 出行天数, "daily_similarity": 相邻出行日地点相似度,
+            "hour_counts": 24小时出行次数, "peak_hour": 出行最多的小时, "peak_hour_share": 该小时占比,
+            "dwell_hours": 各次停留时长(小时), "dwell_median_h", "dwell_p90_h", "long_dwell_share"
+        }
+    """
+    trips = TripTable.coerce(trips)
+    metrics: Dict[str, Any] = {}
+
+    # 1. 空间足迹：目的地坐标
+    valid = np.isfinite(trips.poi_lon) & np.isfinite(trips.poi_lat)
+    lon, lat = trips.poi_lon[valid], trips.poi_lat[valid]
+    metrics["visits"] = int(valid.sum())
+    if len(lon):
+        xy = _project_km(lon, lat)
+        metrics["radius_of_gyration_km"] = float(np.sqrt(((xy - xy.mean(axis=0)) ** 2).sum(axis=1).mean()))
+        metrics["hull_area_km2"] = _convex_hull_area(xy)
+        metrics["elongation"], metrics["orientation_deg"] = _principal_axes(xy)
+    else:
+        metrics.update(radius_of_gyration_km=np.nan, hull_area_km2=np.nan, elongation=np.nan, orientation_deg=np.nan)
+
+    # 2. 地点分布：按POI名称编码统计到访次数
+    named = np.array([name is not None for name in trips.poi_categories], dtype=bool)[trips.poi_codes]
+    codes = trips.poi_codes[named]
+    counts = np.bincount(codes, minlength=len(trips.poi_categories))
+    counts = counts[counts > 0]
+    metrics["distinct_locations"] = int(len(counts))
+    metrics["discovery_rate"] = float(len(counts) / counts.sum()) if counts.sum() else np.nan
+    if len(counts):
+        p = counts / counts.sum()
+        entropy = float(-(p * np.log(p)).sum())
+        metrics["location_entropy"] = entropy
+        metrics["normalized_entropy"] = float(entropy / np.log(len(counts))) if len(counts) > 1 else 0.0
+        metrics["top3_share"] = float(np.sort(p)[::-1][:3].sum())
+    else:
+        metrics.update(location_entropy=np.nan, normalized_entropy=np.nan, top3_share=np.nan)
+
+    # 3. 规律性：出行日 × 地点 的到访矩阵
+    days = trips.start_datetime.astype("datetime64[D]")
+    dated = named & ~np.isnat(days)
+    day_codes, day_values = pd.factorize(days[dated], sort=True)
+    metrics["active_days"] = int(len(day_values))
+    metrics["daily_similarity"] = _daily_similarity(day_codes, trips.poi_codes[dated], len(day_values),
+                                                    len(trips.poi_categories))
+
+    # 4. 出行时段
+    hours = trips.hour[np.isfinite(trips.hour)].astype(int)
+    hour_counts = np.bincount(hours, minlength=24)
+    metrics["hour_counts"] = hour_counts.tolist()
+    metrics["peak_hour"] = int(hour_counts.argmax()) if len(hours) else None
+    metrics["peak_hour_share"] = float(hour_counts.max() / len(hours)) if len(hours) else np.nan
+
+    # 5. 停留时长：到达目的地（本次结束）到下一次出发的间隔
+    order = np.argsort(trips.start_datetime, kind="stable")
+    arrive = trips.end_datetime[order][:-1]
+    leave = trips.start_datetime[order][1:]
+    dwell = (leave - arrive) / np.timedelta64(1, "h")
+    dwell = dwell[~np.isnan(dwell) & (dwell > 0) & (dwell <= MAX_DWELL_HOURS)]
+    metrics["dwell_hours"] = dwell
+    if len(dwell):
+        metrics["dwell_median_h"], metrics["dwell_p90_h"] = (float(v) for v in np.percentile(dwell, [50, 90]))
+        metrics["long_dwell_share"] = float((dwell >= LONG_DWELL_HOURS).mean())
+    else:
+        metrics.update(dwell_median_h=np.nan, dwell_p90_h=np.nan, long_dwell_share=np.nan)
+    return metrics
+
+
+def brand_visits(trips: Any) -> List[Tuple[str, int, int]]:
+    """
+    连锁品牌的到访统计：名称带分店说明的POI去掉分店说明后即为品牌（住宅、办公类除外）
+
+    返回:
+        [(品牌, 到访次数, 不同分店数)]，按到访次数降序
+    """
+    trips = TripTable.coerce(trips)
+    visits: Counter = Counter()
+    branches: Dict[str, set] = {}
+    for name, poi_type in zip(trips.poi, trips.type):
+        if not isinstance(name, str) or poi_type in NON_BRAND_TYPES:
+            continue
+        brand = strip_branch(name)
+        if brand == name.strip():  # 没有分店说明
+            continue
+        visits[brand] += 1
+        branches.setdefault(brand, set()).add(name)
+    return [(brand, count, len(branches[brand])) for brand, count in visits.most_common()]
+
+
+def public_space_visits(trips: Any) -> List[Tuple[str, int]]:
+    """公园、景点、滨水区等开放空间的到访统计，返回 [(地点, 到访次数)]，按到访次数降序"""
+    trips = TripTable.coerce(trips)
+    visits: Counter = Counter()
+    for name, poi_type in zip(trips.poi, trips.type):
+        if not isinstance(name, str):
+            continue
+        if poi_type in PUBLIC_SPACE_TYPES or any(keyword in name for keyword in PUBLIC_SPACE_KEYWORDS):
+            visits[name] += 1
+    return visits.most_common()
@@ -1,4 +1,7 @@
 import json
+from collections import Counter
+from functools import cached_property
+from typing import Callable, Dict, Tuple
 from use_llm.My_LLM import ask_LLMmodel
 from datetime import datetime, timedelta
 from Handle_csv.Util import calculate_time_diff
@@ -7,7 +10,9 @@ import numpy as np
 from Util import *
 from use_GaoDe_api.geo import *
 from Handle_csv.scenario.navigation.basic_info import *
+from Handle_csv.scenario.navigation.trip_table import TripTable
 from Handle_csv.config import Config
+from utils.perf import perf_recorder
 
 # map={
 #     "基础信息":{"城市":"","居住地":"","工作地":""},
@@ -18,18 +23,59 @@ from Handle_csv.config import Config
 #     "通勤空间":{"通勤方向":""},
 #     "工作习惯":{"工作时长":""}
 # }
+
+# 规律性行程：地点对的每段行程出发、到达时间与平均值相差都不超过该阈值
+REGULAR_TRIP_TIME_THRESHOLD = timedelta(minutes=30)
+
+# 标签规则注册表：(特征, 标签) -> 规则函数
+# 规则函数签名为 rule(self, trip_table)，返回该标签的值；同时产出多个标签的规则返回 {标签: 值} 字典
+LABEL_RULES: Dict[Tuple[str, str], Callable] = {}
+
+
+def label_rule(feature: str, *labels: str):
+    """
+    声明一个标签规则
+
+    参数:
+        feature: 特征名（模板JSON的一级键）
+        labels: 该规则产出的标签名；传入多个时规则需返回 {标签: 值} 字典
+    """
+    def decorator(func):
+        for label in labels:
+            LABEL_RULES[(feature, label)] = func
+        func.label_names = labels
+        return func
+    return decorator
+
+
+def load_label_template(template_json: str) -> dict:
+    """读取标签模板 {特征: {标签: ""}}"""
+    with open(template_json, 'r') as f:
+        return json.load(f)
+
+
 class Basic_feature_label:
-    def __init__(self,navi_info:navi_info,config:Config) -> None:
+    def __init__(self,navi_info:navi_info,config:Config,compute:bool = True) -> None:
         # self.home_name = self.set_home_name(poi_info_list)
         self.navi_info = navi_info
-        poi_info_list = navi_info.Get_json_info()['poi_info_list']
-        self.home_name = navi_info.home
-        # self.workplace = self.set_work_location(poi_info_list)
-        self.workplace = navi_info.workplace
+        poi_info_list = navi_info.trip_table  # 列式行程表，按行迭代得到与原字典字段一致的行视图
+        self.trip_table = poi_info_list  # 规则和共享中间结果使用的行程表（见 _use_trip_table）
+        # 居住地/工作地由navi_info按需推断（见 home_name / workplace 属性）
         
-        self.basic_features_labels_mapping = self.get_features_labels_mapping(poi_info_list)
+        # compute=False 时不立即计算，由调用方通过 iter_features_labels 逐个获取（如后台任务上报进度）
+        self.basic_features_labels_mapping = {}
+        if compute:
+            self.basic_features_labels_mapping = self.get_features_labels_mapping(poi_info_list)
         
         pass
+
+    @property
+    def home_name(self):
+        return self.navi_info.home
+
+    @property
+    def workplace(self):
+        return self.navi_info.workplace
     
     def show_basic_feature_label(self) -> pd.DataFrame:
         tuples_list = []
@@ -46,67 +92,206 @@ class Basic_feature_label:
         df = pd.DataFrame([value_list],columns=multi_columns)
         return df
 
+    @perf_recorder.timed("特征标签计算", size_func=lambda self, poi_info_list, *args, **kwargs: len(poi_info_list))
     def get_features_labels_mapping(self,
                                     poi_info_list,
                                     template_json="Handle_csv/scenario/navigation/basic_features_labels_mapping_template.json"):
-        basic_features_labels_mapping = {}
-        with open(template_json, 'r') as f:
-            basic_features_labels_mapping = json.load(f)
-
-        for feature,labels in basic_features_labels_mapping.items():
-            if feature == "通勤基础":
-                # ret_info = self.sub_classify_6(poi_info_list)
-                ret_info = self.sub_classify_6(poi_info_list)
-                # print(basic_features_labels_mapping[feature])
-                # print(type(basic_features_labels_mapping[feature]))
-                for label in labels:
-                    value = ret_info[label]
-                    basic_features_labels_mapping[feature][label] = ret_info[label]
-                continue
-            for label in labels:
-                basic_features_labels_mapping[feature][label] = self.classify((feature,label),poi_info_list)
-                
+        """
+        按模板计算所有标签：每个规则只执行一次（产出多个标签的规则结果共享），
+        规则之间共享小时分布、工作日掩码、出行距离等中间结果，模板新增标签不会引入额外的全量扫描
+        """
+        basic_features_labels_mapping = load_label_template(template_json)
+        for feature, label, value in self.iter_features_labels(poi_info_list, template_json):
+            basic_features_labels_mapping[feature][label] = value
         return basic_features_labels_mapping
 
-    
-    def classify(self,feature_label_tuple,poi_info_list):
-        if feature_label_tuple == ("基础信息","居住地") :
-            return self.home_name
-        elif feature_label_tuple == ("基础信息","工作地") :
-            return self.workplace
-
-        elif feature_label_tuple == ("时间规律","出行周期偏好") :
-            return self.sub_classify_1(poi_info_list)
-        elif feature_label_tuple == ("时间规律","出行时段偏好") :
-            return self.sub_classify_2(poi_info_list)
-        elif feature_label_tuple == ("空间范围","单次出行距离") :
-            return self.sub_classify_3(poi_info_list)
-        
-        elif feature_label_tuple == ("空间范围","活动区域") :
-            return self.sub_classify_4(poi_info_list)
-        
-        elif feature_label_tuple == ("目的地偏好","高频目的地类型") :
-            return self.sub_classify_5(poi_info_list)
-        
-        elif feature_label_tuple == ("通勤空间","通勤方向") :
-            return self.sub_classify_9(poi_info_list)
-        elif feature_label_tuple == ("工作习惯","工作时长") :
-            return self.sub_classify_11(poi_info_list)
-        elif feature_label_tuple == ("时间规律","高峰出行模式") :
-            return self.sub_classify_12(poi_info_list)
-        else:
+    def iter_features_labels(self,
+                             poi_info_list=None,
+                             template_json="Handle_csv/scenario/navigation/basic_features_labels_mapping_template.json"):
+        """
+        按模板顺序逐个计算标签，依次产出 (特征, 标签, 值)
+
+        每个规则只执行一次，结果保存到 basic_features_labels_mapping 中
+        """
+        poi_info_list = self._use_trip_table(poi_info_list)
+        rule_results = {}  # 规则函数 -> 结果
+        for feature,labels in load_label_template(template_json).items():
+            for label in labels:
+                value = self._evaluate_rule((feature,label),poi_info_list,rule_results)
+                self.basic_features_labels_mapping.setdefault(feature, {})[label] = value
+                yield feature, label, value
+
+    def _use_trip_table(self, poi_info_list=None) -> TripTable:
+        """
+        确定本次计算使用的行程表：默认为 navi_info 的行程表，传入其他行程（TripTable或字典列表）时改用该行程表，
+        并丢弃按之前行程表算出的共享中间结果，保证规则与中间结果来自同一份数据
+        """
+        trip_table = self.navi_info.trip_table if poi_info_list is None else TripTable.coerce(poi_info_list)
+        if trip_table is not self.trip_table:
+            self.trip_table = trip_table
+            for name, attribute in vars(type(self)).items():
+                if isinstance(attribute, cached_property):
+                    self.__dict__.pop(name, None)
+        return trip_table
+
+    def _evaluate_rule(self, feature_label_tuple, poi_info_list, rule_results):
+        rule = LABEL_RULES.get(feature_label_tuple)
+        if rule is None:
             return ""
-        
-    
+        if rule not in rule_results:
+            rule_results[rule] = rule(self, poi_info_list)
+        result = rule_results[rule]
+        if len(rule.label_names) > 1:
+            return result[feature_label_tuple[1]]
+        return result
+
+    def classify(self,feature_label_tuple,poi_info_list):
+        """计算单个标签（未注册规则的标签返回空字符串）"""
+        return self._evaluate_rule(feature_label_tuple, self._use_trip_table(poi_info_list), {})
+
+    # ---- 规则共享的中间结果（基于 self.trip_table，每份行程表只计算一次） ----
+    @cached_property
+    def hour_histogram(self) -> np.ndarray:
+        """出发小时的24档计数（无法解析的时间不计入）"""
+        hours = self.trip_table.hour
+        valid_hours = hours[~np.isnan(hours)].astype(np.int64)
+        return np.bincount(valid_hours, minlength=24)
+
+    @cached_property
+    def weekday_mask(self) -> np.ndarray:
+        """每段出行是否在工作日出发"""
+        return self.trip_table.is_weekday
+
+    @cached_property
+    def trip_distances(self) -> np.ndarray:
+        """每段出行的驾车距离（米），相同起终点只请求一次"""
+        trip_table = self.trip_table
+        distance_by_od = {}
+        distances = []
+        for od in zip(trip_table.start_location.tolist(), trip_table.poi_location.tolist()):
+            if od not in distance_by_od:
+                distance_by_od[od] = get_driving_path_distance_by_loc(*od)
+            distances.append(distance_by_od[od])
+        return np.asarray(distances, dtype=np.float64)
+
+    @cached_property
+    def destination_divisions(self) -> list:
+        """每段出行目的地的行政区划，相同目的地坐标只请求一次"""
+        division_by_location = {}
+        divisions = []
+        for poi_location in self.trip_table.poi_location.tolist():
+            if poi_location not in division_by_location:
+                division_by_location[poi_location] = get_district(poi_location)
+            divisions.append(division_by_location[poi_location])
+        return divisions
+
+    @cached_property
+    def destination_city_district(self) -> Counter:
+        """目的地 (市, 区) 的出现次数（行政区划为列表时取第一个元素）"""
+        def get_str_value(value):
+            if isinstance(value, list):
+                return value[0] if value else ""
+            return value if value is not None else ""
+        return Counter((get_str_value(division.get('city')), get_str_value(division.get('district')))
+                       for division in self.destination_divisions)
+
+    @cached_property
+    def regular_trip_pairs(self) -> list:
+        """
+        规律性行程：不同天的两段行程组成地点对（A-B与B-A视为同一对），地点对的时间段列表中
+        每段行程按参与配对的次数计入；所有时间段的出发、到达时间都在平均值30分钟以内的地点对为规律行程
+
+        满足条件的地点对中任意两段行程的出发/到达时间相差都不超过1小时，因此只枚举按出发时间排序后
+        1小时窗口内的不同天行程对，再用 地点×日期 计数矩阵算出每个地点对的配对总数，
+        窗口内配对数等于总数的地点对才精确计算平均时间，避免对全部行程两两配对
+
+        返回:
+            [(地点1, 地点2, "HH:MM:SS-HH:MM:SS")]，按地点对首次出现的配对顺序
+        """
+        trip_table = self.trip_table
+        named = np.array([name is not None for name in trip_table.poi_categories], dtype=bool)[trip_table.poi_codes]
+        rows = np.flatnonzero(~np.isnat(trip_table.start_datetime) & ~np.isnat(trip_table.end_datetime) & named)
+        if len(rows) < 2:
+            return []
+        # 与 Timestamp.timestamp() 一致：无时区的时间按UTC换算为秒
+        epoch, second = np.datetime64(0, "s"), np.timedelta64(1, "s")
+        start_s = (trip_table.start_datetime[rows] - epoch) / second
+        end_s = (trip_table.end_datetime[rows] - epoch) / second
+        day_codes, day_values = pd.factorize(trip_table.start_datetime[rows].astype("datetime64[D]"), sort=True)
+        poi_codes = trip_table.poi_codes[rows]
+        threshold = REGULAR_TRIP_TIME_THRESHOLD.total_seconds()
+
+        # 1. 出发、到达时间都相差不超过1小时的不同天行程对（i < j 为行程表中的顺序）
+        order = np.argsort(start_s, kind="stable")
+        sorted_start = start_s[order]
+        window_sizes = np.searchsorted(sorted_start, sorted_start + 2 * threshold, side="right") - np.arange(len(order)) - 1
+        first = np.repeat(np.arange(len(order)), window_sizes)
+        offsets = np.arange(len(first)) - np.repeat(np.cumsum(window_sizes) - window_sizes, window_sizes)
+        a, b = order[first], order[first + 1 + offsets]
+        i, j = np.minimum(a, b), np.maximum(a, b)
+        close = (day_codes[i] != day_codes[j]) & (np.abs(end_s[i] - end_s[j]) <= 2 * threshold)
+        i, j = i[close], j[close]
+        if len(i) == 0:
+            return []
+
+        # 2. 地点对 (a, b) 的配对总数 = n_a*n_b - Σ_日 n_a(日)*n_b(日)，同一地点自身配对时除以2
+        poi_count = len(trip_table.poi_categories)
+        low, high = np.minimum(poi_codes[i], poi_codes[j]), np.maximum(poi_codes[i], poi_codes[j])
+        pair_keys, pair_index, close_count = np.unique(low * poi_count + high, return_inverse=True, return_counts=True)
+        key_low, key_high = pair_keys // poi_count, pair_keys % poi_count
+        involved, involved_codes = np.unique(np.concatenate([key_low, key_high]), return_inverse=True)
+        day_matrix = np.zeros((len(involved), len(day_values)), dtype=np.int64)
+        involved_index = np.full(poi_count, -1)
+        involved_index[involved] = np.arange(len(involved))
+        row_involved = involved_index[poi_codes]
+        in_matrix = row_involved >= 0
+        np.add.at(day_matrix, (row_involved[in_matrix], day_codes[in_matrix]), 1)
+        matrix_low, matrix_high = involved_codes[:len(pair_keys)], involved_codes[len(pair_keys):]
+        poi_total = day_matrix.sum(axis=1)
+        total = poi_total[matrix_low] * poi_total[matrix_high] - (day_matrix[matrix_low] * day_matrix[matrix_high]).sum(axis=1)
+        total = np.where(key_low == key_high, total // 2, total)
+        complete = (close_count == total)[pair_index]
+        if not complete.any():
+            return []
+
+        # 3. 每个配对的两段行程都计入该地点对的时间段列表，精确计算平均时间和最大偏差
+        i, j, pair_index = i[complete], j[complete], pair_index[complete]
+        spans = pd.DataFrame({
+            "pair": np.concatenate([pair_index, pair_index]),
+            "start": np.concatenate([start_s[i], start_s[j]]),
+            "end": np.concatenate([end_s[i], end_s[j]]),
+        })
+        grouped = spans.groupby("pair")
+        spans["deviation"] = np.maximum((spans["start"] - grouped["start"].transform("mean")).abs(),
+                                        (spans["end"] - grouped["end"].transform("mean")).abs())
+        first_seen = pd.Series(rows[i] * len(trip_table) + rows[j]).groupby(pair_index).min()
+        stats = grouped.agg(avg_start=("start", "mean"), avg_end=("end", "mean")).assign(
+            deviation=spans.groupby("pair")["deviation"].max(), first_seen=first_seen)
+        stats = stats[stats["deviation"] <= threshold].sort_values("first_seen", kind="stable")
+
+        result_pairs = []
+        for pair, avg_start_ts, avg_end_ts in zip(stats.index, stats["avg_start"], stats["avg_end"]):
+            names = sorted([trip_table.poi_categories[key_low[pair]], trip_table.poi_categories[key_high[pair]]])
+            avg_start, avg_end = datetime.fromtimestamp(avg_start_ts), datetime.fromtimestamp(avg_end_ts)
+            result_pairs.append((names[0], names[1], f"{avg_start.strftime('%H:%M:%S')}-{avg_end.strftime('%H:%M:%S')}"))
+        return result_pairs
+
+    @label_rule("基础信息","居住地")
+    def classify_home(self,poi_info_list) -> str:
+        return self.home_name
+
+    @label_rule("基础信息","工作地")
+    def classify_workplace(self,poi_info_list) -> str:
+        return self.workplace
+
+    @label_rule("时间规律","出行周期偏好")
     def sub_classify_1(self,poi_info_list) -> str:
         # ("时间规律","出行周期偏好")
-        week_day = []
-        for info in poi_info_list:
-            week_day.append(is_weekday(info['start_time']))
+        week_day = self.weekday_mask
         if len(week_day) == 0:
             return "缺少信息，无法判断"
         # 计算 工作日出行率
-        workday_rate = week_day.count(True) / len(week_day)
+        workday_rate = week_day.sum() / len(week_day)
         if workday_rate > 0.8:
             return "工作日主导型"
         elif workday_rate <0.4:
@@ -115,18 +300,18 @@ class Basic_feature_label:
             return "均衡型"
         
     
+    @label_rule("时间规律","出行时段偏好")
     def sub_classify_2(self,poi_info_list) -> str:
         # （"时间规律","出行时段偏好")
-        # 用util中get_hour统计每个时间段出现的次数 poi_info_dict的格式为 [{poi: "xxx", type: "xxx", start_time: "xxx", end_time: "xxx"}]
-        time_interval = []
-        for poi_item in poi_info_list:
-            time_interval.append(get_hour(poi_item['start_time']))
-        if time_interval == []:
+        # 使用共享的出发小时分布统计每个时间段出现的次数
+        time_interval = poi_info_list.hour
+        if len(time_interval) == 0:
             return "缺少信息，无法判断"
-        #对time_interval中的元素进行计数，统计7-18,>18，<7出现的次数
-        count_7_18 = time_interval.count("7-18")
-        count_19later = time_interval.count(">18")
-        count_7earlier = time_interval.count("<7")
+        #对出发小时进行计数，统计7-18,>18，<7出现的次数
+        hour_histogram = self.hour_histogram
+        count_7_18 = int(hour_histogram[7:19].sum())
+        count_19later = int(hour_histogram[19:].sum())
+        count_7earlier = int(hour_histogram[:7].sum())
         #如果7-18的次数大于80%，则返回"白天主导型"
         if count_7_18 / len(time_interval) > 0.5:
             return "日间活跃型"
@@ -139,36 +324,18 @@ class Basic_feature_label:
 
         
 
+    @label_rule("空间范围","单次出行距离")
     def sub_classify_3(self,poi_info_list) -> str:
         # ("空间范围","单次出行距离")
-        # 计算所有出行距离的平均值
-        total_distance = []
-        # 将poi_info_dict中的每一项按照天划分，用get_date函数
-        days = {}
-        for poi_item in poi_info_list:
-            date = get_date(poi_item['start_time'])
-            if date not in days:
-                days[date] = []
-            days[date].append(poi_item)
-        
-
-        # 每一天去第一个地点默认从家出发，立刻当天最后一个地点默认回家，计算每一段行程的距离，并累加到total_distance中计算所有出行距离的平均值
-        
-        for day in days:
-            for i in range(len(days[day])):
-                if i == 0:
-                    total_distance.append(get_driving_path_distance_by_loc(days[day][i]['start_location'],days[day][i]['poi_location']))
-                elif i == len(days[day])-1:
-                    total_distance.append(get_driving_path_distance_by_loc(days[day][i]['start_location'],days[day][i]['poi_location']))
-                else:
-                    total_distance.append(get_driving_path_distance_by_loc(days[day][i]['start_location'],days[day][i]['poi_location']))
+        # 每一段行程（含每天第一段默认从家出发、最后一段默认回家）都按起终点计算驾车距离，使用共享的距离数组
+        total_distance = self.trip_distances
         if len(total_distance) == 0:
             return "缺少信息，无法判断"
         # 统计total_distance，小于5000的比例大于70%，则返回"短途主导型"，超过50%在5000-200000之间，则返回"中途主导型"，超过40%在20000以上，则返回"长途主导型"，其他情况返回"均衡复合型"
         #小于5000的比例
-        count_5000 = len([i for i in total_distance if i < 5000]) / len(total_distance)
-        count_5000_20000 = len([i for i in total_distance if i >= 5000 and i <= 20000]) / len(total_distance)
-        count_20000 = len([i for i in total_distance if i > 20000]) / len(total_distance)
+        count_5000 = np.count_nonzero(total_distance < 5000) / len(total_distance)
+        count_5000_20000 = np.count_nonzero((total_distance >= 5000) & (total_distance <= 20000)) / len(total_distance)
+        count_20000 = np.count_nonzero(total_distance > 20000) / len(total_distance)
         if count_5000 > 0.7:
             return "短途主导型"
         elif count_5000_20000 > 0.5:
@@ -179,48 +346,19 @@ class Basic_feature_label:
             return "均衡复合型"
 
         
+    @label_rule("空间范围","活动区域")
     def sub_classify_4(self, poi_info_list) -> str:
     # ("空间范围","出行范围")
-        def get_str_value(value):
-            """处理可能为列表的值，提取字符串（如果是列表则取第一个元素）"""
-            if isinstance(value, list):
-                # 如果是列表，返回第一个元素（假设列表非空且第一个元素是字符串）
-                return value[0] if value else ""
-            else:
-                # 否则直接返回（假设是字符串或None）
-                return value if value is not None else ""
-    
-        area_spans: list[dict]
-        area_spans = self.navi_info.get_area_span()
-        city_district = {}
-        
-        for area_span in area_spans:
-            target_area = area_span['end_administrative_division']
-            
-            # 处理city和district，确保是字符串类型
-            city = get_str_value(target_area.get('city'))
-            district = get_str_value(target_area.get('district'))
-            
-            # 使用处理后的城市和区县作为键
-            key = (city, district)
-            
-            if key not in city_district:
-                city_district[key] = 1
-            else:
-                city_district[key] += 1
-        
         # 统计每个（市，区）出现的次数，如果出现跨市的行程，则返回”跨城活动“，
         # 如果90%以上目的地在同一个区，则返回”单区域活动“,
         # 否则返回”多区域活动“
-        cities = []
-        for city, district in city_district:
-            if city not in cities:
-                cities.append(city)
+        city_district = self.destination_city_district
         
         # 处理没有数据的特殊情况
         if not city_district:
             return "未知活动范围"  # 或者根据业务需求返回其他默认值
         
+        cities = {city for city, district in city_district}
         if len(cities) > 1:
             return "跨城活动"
         elif max(city_district.values()) / sum(city_district.values()) > 0.9:
@@ -228,24 +366,20 @@ class Basic_feature_label:
         else:
             return "多区域活动"
 
+    @label_rule("目的地偏好","高频目的地类型")
     def sub_classify_5(self,poi_info_list) -> str:
         # ("目的地偏好","高频目的地类型")
-        # 统计每个地点类型出现的次数 poi_info_dict的格式为 [{poi: "xxx", type: "xxx", start_time: "xxx", end_time: "xxx"}]
-        activity_types = {}
-        for poi_item in poi_info_list:
-            if poi_item['poi'] != self.home_name and poi_item['poi'] != self.workplace:
-                if poi_item['type'] in activity_types:
-                    activity_types[poi_item['type']] += 1
-                else:
-                    activity_types[poi_item['type']] = 1
-        if activity_types == {}:
+        # 统计居住地、工作地以外每个地点类型出现的次数
+        pois = poi_info_list.poi
+        elsewhere = (pois != self.home_name) & (pois != self.workplace)
+        activity_types = Counter(poi_info_list.type[elsewhere].tolist())
+        if not activity_types:
             return "无出行记录"
-        # 把activity_types这个字典按value大小排序，输出[(key, value), (key, value), ...]
-        high_frequency_activity_types = sorted(activity_types.items(), key=lambda x: x[1], reverse=True)
-        #返回最高频地点类型
-        return high_frequency_activity_types[0][0]
+        #返回最高频地点类型（次数相同时取先出现的）
+        return activity_types.most_common(1)[0][0]
 
     
+    @label_rule("通勤基础","规律性行程","规律行程距离","规律行程耗时")
     def sub_classify_6(self,poi_info_list):
         # ("通勤基础","规律性行程")
         # input = poi_info_list
@@ -277,70 +411,7 @@ class Basic_feature_label:
                 "规律行程距离": "无",
                 "规律行程耗时": "无"
             }
-        # 转换为DataFrame便于处理
-        df = pd.DataFrame(poi_info_list)
-        
-        # 解析时间
-        df['start_datetime'] = df['start_time'].apply(parse_datetime)
-        df['end_datetime'] = df['end_time'].apply(parse_datetime)
-        df['date'] = df['start_datetime'].apply(lambda x: x.date())
-        
-        # 存储地点对及其对应的时间段
-        location_pairs = defaultdict(list)
-        
-        # 提取所有可能的地点对（按时间顺序）
-        for i in range(len(df)):
-            for j in range(i+1, len(df)):
-                # 确保是不同天的行程
-                if df.loc[i, 'date']!= df.loc[j, 'date']:
-                    # 确定地点对（按字母顺序排序确保A-B和B-A被视为同一对）
-                    loc1 = df.loc[i, 'poi']
-                    loc2 = df.loc[j, 'poi']
-                    sorted_loc = tuple(sorted([loc1, loc2]))
-                    
-                    # 记录两个行程的时间段
-                    location_pairs[sorted_loc].append({
-                        'start': df.loc[i, 'start_datetime'],
-                        'end': df.loc[i, 'end_datetime']
-                    })
-                    location_pairs[sorted_loc].append({
-                        'start': df.loc[j, 'start_datetime'],
-                        'end': df.loc[j, 'end_datetime']
-                    })
-        
-        # 判断是否有符合条件的地点对（相似时间段）
-        result_pairs = []
-        # 定义时间差阈值（30分钟），可根据需要调整
-        TIME_THRESHOLD = timedelta(minutes=30)
-        
-        for pair, time_ranges in location_pairs.items():
-            # 需要至少两对不同天的行程
-            if len(time_ranges) >= 2:
-                # 检查时间段是否相似
-                # 计算平均开始时间和结束时间
-                start_times = [tr['start'] for tr in time_ranges]
-                end_times = [tr['end'] for tr in time_ranges]
-                
-                # 计算平均开始时间（转换为时间戳计算）
-                avg_start_ts = sum(dt.timestamp() for dt in start_times) / len(start_times)
-                avg_start = datetime.fromtimestamp(avg_start_ts)
-                
-                # 计算平均结束时间
-                avg_end_ts = sum(dt.timestamp() for dt in end_times) / len(end_times)
-                avg_end = datetime.fromtimestamp(avg_end_ts)
-                
-                # 检查所有时间是否在平均时间的阈值范围内
-                all_similar = True
-                for tr in time_ranges:
-                    if (abs(tr['start'] - avg_start) > TIME_THRESHOLD or 
-                        abs(tr['end'] - avg_end) > TIME_THRESHOLD):
-                        all_similar = False
-                        break
-                
-                if all_similar:
-                    # 格式化平均时间段
-                    avg_time_str = f"{avg_start.strftime('%H:%M:%S')}-{avg_end.strftime('%H:%M:%S')}"
-                    result_pairs.append((pair[0], pair[1], avg_time_str))
+        result_pairs = self.regular_trip_pairs
         
         if result_pairs:
             #计算规律行程的平均距离，用get_driving_path_distance_by_address计算
@@ -366,7 +437,6 @@ class Basic_feature_label:
                 "规律行程耗时": "无"
             }
             return ret_info
-        
 
     def sub_classify_7(self,poi_info_list) -> str:
         # ("通勤基础","通勤时长")
@@ -375,9 +445,11 @@ class Basic_feature_label:
     def sub_classify_8(self,poi_info_list) -> str:
         return "待实现"
 
+    @label_rule("通勤空间","通勤方向")
     def sub_classify_9(self,poi_info_list) -> str:
         return "待实现"
     
+    @label_rule("工作习惯","工作时长")
     def sub_classify_11(self,poi_info_list) -> str:
         # ("工作习惯","工作时长")
         if self.workplace == "无法确认用户工作地点":
@@ -385,14 +457,14 @@ class Basic_feature_label:
         scaned_work_location = False
         work_start_time = None
         work_time_list = []
-        for poi_item in poi_info_list:
-            if scaned_work_location and work_start_time != None and poi_item['poi'] != self.workplace:
-                work_time_list.append(calculate_time_diff(work_start_time,poi_item['end_time'])/3600)
+        for poi, end_datetime in zip(poi_info_list.poi, pd.Series(poi_info_list.end_datetime)):
+            if scaned_work_location and work_start_time != None and poi != self.workplace:
+                work_time_list.append((end_datetime - work_start_time).total_seconds()/3600)
                 #保留2位小数
                 scaned_work_location = False
-            if poi_item['poi'] == self.workplace:
+            if poi == self.workplace:
                 scaned_work_location = True
-                work_start_time = poi_item['end_time']
+                work_start_time = end_datetime
         if  len(work_time_list) > 0:
             work_time = sum(work_time_list)/len(work_time_list)
             if work_time < 6:
@@ -403,21 +475,17 @@ class Basic_feature_label:
                 return "标准工时"
         return "work_time_list is []"
     
+    @label_rule("时间规律","高峰出行模式")
     def sub_classify_12(self,poi_info_list) -> str:
         # ("时间规律","高峰出行模式")
-        # 用util中get_hour统计每个时间段出现的次数 poi_info_dict的格式为 [{poi: "xxx", type: "xxx", start_time: "xxx", end_time: "xxx"}]
-        time_interval = []
-        for poi_item in poi_info_list:
-            start_hour = get_hour(poi_item['start_time'])
-            if (start_hour>=7 and start_hour<=9) or (start_hour>=17 and start_hour<=19):
-                time_interval.append("高峰")
-            else:
-                time_interval.append("非高峰")
-        if time_interval == []:
+        # 使用共享的出发小时分布统计高峰/非高峰次数
+        time_interval = poi_info_list.hour
+        if len(time_interval) == 0:
             return "无法确认"   
-        #对time_interval中的元素进行计数，统计高峰和非高峰出现的次数
-        count_peak = time_interval.count("高峰")
-        count_non_peak = time_interval.count("非高峰")
+        #统计高峰和非高峰出现的次数
+        hour_histogram = self.hour_histogram
+        count_peak = int(hour_histogram[7:10].sum() + hour_histogram[17:20].sum())
+        count_non_peak = len(time_interval) - count_peak
         #如果高峰出现的次数大于非高峰出现的次数，则返回"高峰出行型"
         if count_peak/len(time_interval) > 0.7:
             return "高峰期出行者"
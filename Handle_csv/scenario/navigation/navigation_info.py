@@ -1,26 +1,85 @@
 import pandas as pd
 import json
+from concurrent.futures import ThreadPoolExecutor
 
-from Handle_csv.Util import find_any_key,extract_json_from_string,calculate_time_diff
+from Handle_csv.Util import find_any_key,extract_json_from_string,calculate_time_diff,parse_datetime_array
 from Handle_csv.scenario.scenario_util import get_scenario_info
 from use_llm.My_LLM import ask_LLMmodel
 from Handle_csv.scenario.navigation.basic_info import *
-def classify_poi_type(poi_list) -> dict:
+from Handle_csv.json_extract import PathCachedKeyExtractor, SignalValueExtractor, loads
+from Handle_csv.scenario.navigation.poi_type_dictionary import poi_type_dictionary, UNKNOWN_POI_TYPE
+from Handle_csv.scenario.navigation.poi_rule_classifier import poi_rule_classifier
+from utils.perf import perf_recorder
+from utils.logger_setup import diagnostics, setup_logger
+
+# json_all中的POI名称、status_json中的目的地坐标（跨文件复用已学习的路径，按payload字符串记忆）
+POI_KEYWORD_LIST = ['poi_name', 'poi']
+poi_extractor = PathCachedKeyExtractor(POI_KEYWORD_LIST)
+destination_extractor = SignalValueExtractor("Vehicle.Travel.OneMap.Navi.DestinationPosition")
+POI_CLASSIFY_BATCH_SIZE = 50  # 每次LLM调用最多分类的POI数量
+POI_CLASSIFY_MAX_WORKERS = 4  # 并发的LLM调用数
+
+def _classify_poi_batch(poi_batch, known_types) -> dict:
+    """调用LLM为一批（已去重的）POI名称分类，只返回批内名称且类型为字符串的结果"""
+    type_hint = f"已有的POI类型：{known_types}，如果属于其中某一类请直接沿用该类型名称。" if known_types else ""
     prompt = f"""
     你是一个专业的地点类型分类器。请根据以下POI信息进行分类：
-    POI信息：{poi_list}
+    POI信息：{poi_batch}
     请返回一个字典，键值都是双引号字符串
     键: POI名称（poi_list中的一项)
     值: POI类型（如餐厅、商店、景点等）。
     如果两个poi属于同一类，那么它们在字典中对应的值应该一样。
+    {type_hint}
     """
-    response = ask_LLMmodel(poi_list, prompt)
+    response = ask_LLMmodel(poi_batch, prompt)
     try:
         output_json = extract_json_from_string(response)
-        return output_json
-    except json.JSONDecodeError:
+    except (json.JSONDecodeError, ValueError):
         print(f"无法解析LLM响应: {response}")
-        return {"poi": poi_list, "type": "未知"}
+        return {}
+    if not isinstance(output_json, dict):
+        return {}
+    batch_names = set(poi_batch)
+    return {name: poi_type for name, poi_type in output_json.items()
+            if name in batch_names and isinstance(poi_type, str) and poi_type}
+
+def classify_poi_type(poi_list) -> dict:
+    """
+    为POI名称分类
+
+    先用本地规则分类器处理名称中带有明显类别词的POI（小区、医院、停车场等），
+    其余名称查持久化的POI类型字典，只有字典中也没有的名称才分批（每批最多 POI_CLASSIFY_BATCH_SIZE 个）
+    并发交给LLM，新结果写回字典供之后的文件和vin复用；LLM没有给出类型的名称返回"未知"（不写入字典，下次重试）。
+
+    参数:
+        poi_list: POI名称列表（可重复）
+    返回:
+        {POI名称: POI类型}，包含poi_list中的每个名称
+    """
+    poi_names = list(dict.fromkeys(poi_list))
+    rule_types, ambiguous = poi_rule_classifier.classify_many(poi_names)
+    unseen = poi_type_dictionary.missing(ambiguous)
+    if unseen:
+        known_types = list(dict.fromkeys(poi_rule_classifier.types + poi_type_dictionary.known_types()))
+        batches = [unseen[i:i + POI_CLASSIFY_BATCH_SIZE] for i in range(0, len(unseen), POI_CLASSIFY_BATCH_SIZE)]
+        new_types = {}
+        with perf_recorder.span("classify_poi_type(LLM)", size=len(unseen)):
+            with ThreadPoolExecutor(max_workers=min(POI_CLASSIFY_MAX_WORKERS, len(batches))) as executor:
+                futures = [executor.submit(_classify_poi_batch, batch, known_types) for batch in batches]
+                for future in futures:
+                    try:
+                        new_types.update(future.result())
+                    except Exception as e:
+                        print(f"POI分类失败: {str(e)}")
+        poi_type_dictionary.update(new_types)
+    if poi_names:
+        coverage = poi_rule_classifier.coverage_stats()
+        setup_logger().info(f"POI分类: 共 {len(poi_names)} 个名称，规则命中 {len(rule_types)}，"
+                            f"词典命中 {len(ambiguous) - len(unseen)}，LLM分类 {len(unseen)}；"
+                            f"规则累计覆盖率 {coverage['coverage']:.2%}（{coverage['resolved']}/{coverage['checked']}）")
+    poi_type_dict = poi_type_dictionary.lookup(ambiguous)
+    poi_type_dict.update(rule_types)
+    return {name: poi_type_dict.get(name, UNKNOWN_POI_TYPE) for name in poi_names}
 
 def navigation_related(row) -> bool:
     # 判断行是否与导航相关
@@ -35,22 +94,23 @@ def navigation_related(row) -> bool:
                 if d['domain'] == 'navigation' or d['command'] == 'global/navigation':
                     return True
         except:
-            print("voice_dc is not a valid list of dictionaries.")
+            diagnostics.record("voice_dc无法解析", row['voice_dc'])
     return False
 
 def get_navigation_related_row(df):
-    return get_scenario_info(df, navigation_related)
+    with perf_recorder.span("get_navigation_related_row", size=len(df)):
+        navigation_related_row = get_scenario_info(df, navigation_related)
+    diagnostics.flush("voice_dc无法解析")
+    return navigation_related_row
 
 def get_location(row):
-    json_dict = json.loads(row['status_json'])
-    for d in json_dict:
-        if d["name"] == "Vehicle.Travel.OneMap.Navi.DestinationPosition":
-            location = d["value"]
-            if location:
-                location = json.loads(location)
-                location_str = f"{location['longitude']},{location['latitude']}"
-                return location_str
+    location = destination_extractor.extract(row['status_json'])
+    if location:
+        location = loads(location)
+        location_str = f"{location['longitude']},{location['latitude']}"
+        return location_str
     return None
+@perf_recorder.timed("extract_poi_from_navigation_related_row", size_func=lambda rows: len(rows))
 def extract_poi_from_navigation_related_row(navigation_related_row):
     
     # 提取POI信息
@@ -58,10 +118,11 @@ def extract_poi_from_navigation_related_row(navigation_related_row):
     poi_list = []
     last_place_location = None
     for index, row in navigation_related_row.iterrows():
-        json_dict = json.loads(row['json_all'])
-        poi_keyword_list = ['poi_name', 'poi']
-        poi = find_any_key(json_dict, poi_keyword_list)
-        if poi is not None and row["event_key"] == 'X_Map_008_0002':
+        # 只有发起导航的行才需要解析json_all
+        if row["event_key"] != 'X_Map_008_0002':
+            continue
+        poi = poi_extractor.extract(row['json_all'])
+        if poi is not None:
             start_time = row['format_time_ms']
             # description = row['desc']
             end_time = "不确定"
@@ -86,16 +147,21 @@ def extract_poi_from_navigation_related_row(navigation_related_row):
     # 对poi_info进行精简，如果同一天内，有连续的几项poi相同，则合并它们的时间范围
     def merge_poi_info(poi_info):
         merged_info = []
+        # 一次性解析所有开始时间（秒），循环内不再逐个strptime
+        start_seconds = parse_datetime_array([item['start_time'] for item in poi_info]).to_numpy(dtype="datetime64[ms]").astype("int64") / 1000
+        merged_start_second = None
         for i in range(len(poi_info)):
             if i == 0:
                 merged_info.append(poi_info[i])
+                merged_start_second = start_seconds[i]
             else:
                 time_threold = 1200  # 20分钟
-                if poi_info[i]['poi'] == merged_info[-1]['poi'] and calculate_time_diff(poi_info[i]['start_time'], merged_info[-1]['start_time']) < time_threold:
+                if poi_info[i]['poi'] == merged_info[-1]['poi'] and merged_start_second - start_seconds[i] < time_threold:
                     merged_info[-1]['start_time'] = poi_info[i]['start_time']
                     merged_info[-1]['end_time'] = poi_info[i]['end_time']
                 else:
                     merged_info.append(poi_info[i])
+                merged_start_second = start_seconds[i]
         return merged_info
     poi_info = merge_poi_info(poi_info)
     def add_start_location(poi_list):
@@ -142,15 +208,16 @@ def extract_poi_from_navigation_related_row(navigation_related_row):
     poi_info = add_start_location(poi_info)
     poi_type_dict = classify_poi_type(poi_list)
     for poi_item in poi_info:
-        poi_item["type"] = poi_type_dict[poi_item["poi"]]
+        poi_item["type"] = poi_type_dict.get(poi_item["poi"], UNKNOWN_POI_TYPE)
     return poi_info
 
-def get_navigation_info(df,config = None)->navi_info:
+def get_navigation_info(df,config = None,vin = "",prefetch_anchors = False)->navi_info:
     # 获取导航信息
     navigation_related_row = get_navigation_related_row(df)
     # 提取POI信息
     poi_info_list = extract_poi_from_navigation_related_row(navigation_related_row)
-    Navi_info = navi_info([poi_info(info_dict) for info_dict in poi_info_list],config=config)
+    # prefetch_anchors=True 时居住地/工作地在后台推断，不阻塞返回
+    Navi_info = navi_info(poi_info_list,vin=vin,config=config,prefetch_anchors=prefetch_anchors)
     return Navi_info
 
 
@@ -1,43 +1,50 @@
 import json
 from use_llm.My_LLM import ask_LLMmodel
 from datetime import datetime
-from Handle_csv.Util import calculate_time_diff
 import pandas as pd
 import numpy as np
 from Handle_csv.scenario.navigation.navigation_feature_label_new import Basic_feature_label
+from Handle_csv.scenario.navigation.mobility_metrics import (LONG_DWELL_HOURS, brand_visits,
+                                                             compute_mobility_metrics, public_space_visits)
+from Handle_csv.scenario.navigation.trip_table import TripTable
 class Navi_Persona:
     def __init__(self,poi_info,config=None) -> None:
+        # poi_info 只解析一次为列式行程表，空间/时间指标由坐标和时间数组一次性算出（不调用LLM）
+        trips = TripTable.coerce(json.loads(poi_info) if isinstance(poi_info, str) else poi_info)
+        self.mobility_metrics = compute_mobility_metrics(trips)
+        metrics = self.mobility_metrics
+
         # 1. 核心锚点与通勤模式 （家和公司）
         # 这是用户画像中最基础、最稳定的空间特征，如同骨架。通常通过分析用户长时间停留的地点来识别。
         self.home_location = self.set_home_location(poi_info)
         self.work_location = self.set_work_location(poi_info)
         self.commuting_distance = 0
-        self.commuting_time = self.get_commuting_time(poi_info)
+        self.commuting_time = self.get_commuting_time(trips)
         self.commuting_direction = ""
         
         # 2. 活动范围与空间足迹 （结合地图可视化的方式）
         # 这描述了用户生活的“边界”和空间的“形状”，反映了其生活延展性和探索性。
-        self.activity_radius = 0
-        self.new_location_discovery_rate = self.get_new_location_discovery_rate(poi_info)
-        self.footprint_area = 0
-        self.footprint_shape = ""
-        self.spatial_concentration = ""
+        self.activity_radius = self.get_activity_radius(metrics)
+        self.new_location_discovery_rate = self.get_new_location_discovery_rate(metrics)
+        self.footprint_area = self.get_footprint_area(metrics)
+        self.footprint_shape = self.get_footprint_shape(metrics)
+        self.spatial_concentration = self.get_spatial_concentration(metrics)
         
         #活动类型与场所偏好
         #这揭示了用户的兴趣、消费习惯和生活方式，是画像的“血肉”。这通常通过分析用户停留点的POI（Point of Interest）类型来获得
 
-        self.high_frequency_activity_types = self.get_high_frequency_activity_types(poi_info)
+        self.high_frequency_activity_types = self.get_high_frequency_activity_types(trips)
         self.activity_time_preference = ""
-        self.brand_preferernce = self.get_brand_preferernce(poi_info)
-        self.public_space_preference = self.get_public_space_preference(poi_info)
+        self.brand_preferernce = self.get_brand_preferernce(trips)
+        self.public_space_preference = self.get_public_space_preference(trips)
         self.consumption_level_preference = ""
 
         #移动规律与行为模式 
         # 这描述了用户移动的“节奏”和“习惯”，体现其生活的规律性。
-        self.mobility_regularity = ""
-        self.peak_travel_time = ""
+        self.mobility_regularity = self.get_mobility_regularity(metrics)
+        self.peak_travel_time = self.get_peak_travel_time(metrics)
         self.rout_choice_preference = ""
-        self.dwell_time_characteristics = ""
+        self.dwell_time_characteristics = self.get_dwell_time_characteristics(metrics)
 
 
         self.basic_feature_label = Basic_feature_label(poi_info,config).basic_features_labels_mapping
@@ -78,53 +85,59 @@ class Navi_Persona:
         prompt = f"请分析这个列表:{poi_info}，结合其type字段，帮我分析哪个地点（也就是poi字段）是用户的工作或学习的地点，并直接给出对应的地点名称（列表中其中一项的poi字段值）,如果不能判断出用户的居住地，则直接回答 无法确认用户工作地点\n"
         return ask_LLMmodel(input, prompt)
 
-    def get_commuting_time(self,poi_info):
-        time_format = "%Y-%m-%d %H:%M:%S.%f"
-        poi_info_dict = json.loads(poi_info)
-        for poi_item in poi_info_dict:
-
-            if poi_item['poi'] == self.work_location:
-                time_diff = calculate_time_diff(poi_item['start_time'],poi_item['end_time'])
-                return f"{time_diff / 60:.2f} 分钟"
+    def get_commuting_time(self,trips):
+        # 行程表中的时间已解析，直接用出行时长
+        for poi, duration_s in zip(trips.poi, trips.duration_s):
+            if poi == self.work_location and not np.isnan(duration_s):
+                return f"{duration_s / 60:.2f} 分钟"
         return "无法确认通勤时间"
 
     
-    def get_new_location_discovery_rate(self,poi_info):
-        # TODO
-        
-        return 0
-
-    def get_activity_radius(self,poi_info):
-        # TODO 在非家-公司地点活动的主要时间段。
-
-        return 0
-
-    def get_footprint_area(self,poi_info):
-        # TODO
-
-        return 0
-
-    def get_footprint_shape(self,poi_info):
-        # TODO
-
-        return 0
-
-    def get_spatial_concentration(self,poi_info):
-        # TODO
-
-        return 0
-
-    def get_high_frequency_activity_types(self,poi_info):
-        # TODO
-        poi_info_dict = json.loads(poi_info)
-        # 统计每个地点类型出现的次数 poi_info_dict的格式为 [{poi: "xxx", type: "xxx", start_time: "xxx", end_time: "xxx"}]
+    def get_new_location_discovery_rate(self,metrics):
+        # 不同地点数 / 到访次数，越高说明越常去新地点
+        rate = metrics["discovery_rate"]
+        return 0 if np.isnan(rate) else round(float(rate), 4)
+
+    def get_activity_radius(self,metrics):
+        # 回转半径：各目的地到目的地重心距离的均方根
+        radius = metrics["radius_of_gyration_km"]
+        return 0 if np.isnan(radius) else f"{radius:.2f} 公里"
+
+    def get_footprint_area(self,metrics):
+        # 目的地凸包面积
+        area = metrics["hull_area_km2"]
+        return 0 if np.isnan(area) else f"{area:.2f} 平方公里"
+
+    def get_footprint_shape(self,metrics):
+        # 按目的地分布的长短轴之比判断形态，主方向按角度划分
+        ratio, angle = metrics["elongation"], metrics["orientation_deg"]
+        if np.isnan(ratio):
+            return "地点过少，无法判断"
+        directions = ["东西", "东北-西南", "南北", "西北-东南"]
+        direction = directions[int(((angle + 22.5) % 180) // 45)]
+        if ratio >= 3:
+            return f"狭长型（主要沿{direction}方向分布）"
+        if ratio >= 1.5:
+            return f"椭圆型（偏{direction}方向）"
+        return "团块型（各方向较均衡）"
+
+    def get_spatial_concentration(self,metrics):
+        # 归一化位置熵越低，到访越集中在少数地点
+        entropy = metrics["normalized_entropy"]
+        if np.isnan(entropy):
+            return "地点过少，无法判断"
+        level = "高度集中" if entropy < 0.5 else ("较集中" if entropy < 0.75 else "分散")
+        return f"{level}（前3个地点占{metrics['top3_share']:.0%}的到访，位置熵{metrics['location_entropy']:.2f}）"
+
+    def get_high_frequency_activity_types(self,trips):
+        # 统计每个地点类型出现的次数（不含居住地和工作地）
         activity_types = {}
-        for poi_item in poi_info_dict:
-            if poi_item['poi'] != self.home_location and poi_item['poi'] != self.work_location:
-                if poi_item['type'] in activity_types:
-                    activity_types[poi_item['type']] += 1
+        for poi, poi_type in zip(trips.poi, trips.type):
+            if poi != self.home_location and poi != self.work_location:
+                if poi_type in activity_types:
+                    activity_types[poi_type] += 1
                 else:
-                    activity_types[poi_item['type']] = 1
+                    activity_types[poi_type] = 1
         # 把activity_types这个字典按value大小排序，输出[(key, value), (key, value), ...]
         activity_types = sorted(activity_types.items(), key=lambda x: x[1], reverse=True)
         return activity_types
@@ -136,19 +149,20 @@ class Navi_Persona:
 
         return 0
 
-    def get_brand_preferernce(self,poi_info):
-        # TODO
-        input = poi_info
-        prompt = f"请分析这个列表:{poi_info}，帮我分析用户对特定连锁品牌（如某咖啡、超市等）的忠诚度。如果能分析出来，则回复：用户是XX（某品牌）的常客。如果无法分析出来，则回复：暂未发现用户的特定品牌偏好。\n"
-        return ask_LLMmodel(input,prompt)
-
+    def get_brand_preferernce(self,trips):
+        # 名称带分店说明的连锁品牌，到访3次以上或去过2家以上分店视为常客
+        for brand, count, branch_count in brand_visits(trips):
+            if count >= 3 or branch_count >= 2:
+                return f"用户是{brand}的常客。"
+        return "暂未发现用户的特定品牌偏好。"
 
-    def get_public_space_preference(self,poi_info):
-        # TODO
-        input = poi_info
-        prompt = f"请分析这个列表:{poi_info}，帮我分析用户对公园、广场、滨水区等开放空间的访问频率。如果分析出来用户喜欢去的公共空间，则回复：用户喜欢去一些公共空间，如XX。如果无法分析出来，则回复：暂未发现用户的相关偏好。\n"
 
-        return ask_LLMmodel(input,prompt)
+    def get_public_space_preference(self,trips):
+        # 公园、景点、滨水区等开放空间累计到访2次以上
+        visits = public_space_visits(trips)
+        if sum(count for _, count in visits) >= 2:
+            return f"用户喜欢去一些公共空间，如{'、'.join(name for name, _ in visits[:3])}。"
+        return "暂未发现用户的相关偏好。"
 
 
     def get_consumption_level_preference(self,poi_info):
@@ -156,25 +170,31 @@ class Navi_Persona:
 
         return 0
 
-    def get_mobility_regularity(self,poi_info):
-        # TODO
+    def get_mobility_regularity(self,metrics):
+        # 相邻两个出行日所到地点集合的平均Jaccard相似度
+        similarity = metrics["daily_similarity"]
+        if np.isnan(similarity):
+            return "出行天数不足，无法判断"
+        level = "规律" if similarity >= 0.5 else ("较规律" if similarity >= 0.25 else "随机性较强")
+        return f"{level}（相邻出行日地点相似度{similarity:.2f}，共{metrics['active_days']}天）"
 
-        return 0
-
-    def get_peak_travel_time(self,poi_info):
-        # TODO
-
-        return 0
+    def get_peak_travel_time(self,metrics):
+        peak_hour = metrics["peak_hour"]
+        if peak_hour is None:
+            return "无法确认出行高峰时段"
+        return f"{peak_hour:02d}:00-{(peak_hour + 1) % 24:02d}:00（占{metrics['peak_hour_share']:.0%}的出行）"
 
     def get_rout_choice_preference(self,poi_info):
         # TODO
 
         return 0
 
-    def get_dwell_time_characteristics(self,poi_info):
-        # TODO
-        
-        return 0
+    def get_dwell_time_characteristics(self,metrics):
+        # 到达目的地到下一次出发的间隔
+        if np.isnan(metrics["dwell_median_h"]):
+            return "无法确认停留时长特征"
+        return (f"中位停留{metrics['dwell_median_h']:.1f}小时，90%分位{metrics['dwell_p90_h']:.1f}小时，"
+                f"长时停留（≥{LONG_DWELL_HOURS}小时）占{metrics['long_dwell_share']:.0%}")
 
     
     def get_basic_persona(self,poi_info):
@@ -1,15 +1,25 @@
 import matplotlib.pyplot as plt
 import matplotlib.colors as mcolors
+from matplotlib.figure import Figure
+from matplotlib.lines import Line2D
+from matplotlib.ticker import MultipleLocator
 from io import BytesIO
-from Handle_csv.Util import parse_datetime
+import pandas as pd
+from Handle_csv.scenario.navigation.trip_table import TripTable
 from use_GaoDe_api.draw import draw_ordered_points
 from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
 import os
+
+ROUTE_MAP_MAX_WORKERS = 4  # 并发请求静态地图的线程数（实际请求速率另受高德限速器约束）
+
 # 核心函数：绘制用户路线时序图（纵轴时间段视觉增强）
 def plot_route_timeline(json_data):
     """
     优化纵轴显示，使时间段在视觉上更长更清晰
     只在右上角显示地点对应的颜色块图例
+
+    直接创建 Figure 而不经过 pyplot 的全局当前图，可以在后台任务线程中绘制
     """
     plt.rcParams["font.family"] = ["Heiti TC"]
     plt.rcParams["axes.unicode_minus"] = False
@@ -20,29 +30,36 @@ def plot_route_timeline(json_data):
     start_datetimes = []
     end_datetimes = []
 
-    for entry in json_data:
-        if "poi" in entry and "start_time" in entry and "end_time" in entry:
-            try:
-                start_dt = parse_datetime(entry["start_time"])
-                end_dt = parse_datetime(entry["end_time"])
+    # 直接使用行程表中已解析的时间，避免逐条调用解析函数
+    trip_table = TripTable.coerce(json_data)
+    parsed_starts = pd.Series(trip_table.start_datetime)
+    parsed_ends = pd.Series(trip_table.end_datetime)
+
+    for entry, start_ts, end_ts in zip(trip_table, parsed_starts, parsed_ends):
+        try:
+            if pd.isna(start_ts) or pd.isna(end_ts):
+                raise ValueError(f"无法解析时间: {entry['start_time']} / {entry['end_time']}")
+            start_dt = start_ts.to_pydatetime()
+            end_dt = end_ts.to_pydatetime()
+            
+            if end_dt > start_dt:
+                start_datetimes.append(start_dt)
+                end_datetimes.append(end_dt)
+                location = entry["poi"].strip()
+                locations.append(location)
+            else:
+                print(f"跳过无效时间数据: {entry}，结束时间应晚于开始时间")
                 
-                if end_dt > start_dt:
-                    start_datetimes.append(start_dt)
-                    end_datetimes.append(end_dt)
-                    location = entry["poi"].strip()
-                    locations.append(location)
-                else:
-                    print(f"跳过无效时间数据: {entry}，结束时间应晚于开始时间")
-                    
-            except Exception as e:
-                print(f"跳过无效数据: {entry}，错误: {str(e)}")
+        except Exception as e:
+            print(f"跳过无效数据: {entry}，错误: {str(e)}")
 
     if not start_datetimes:
         print("未找到有效数据，请检查JSON格式是否包含'poi'、'start_time'和'end_time'字段")
         return None
     
     # 关键调整：大幅增加纵向尺寸，使纵轴视觉上更长
-    fig, ax = plt.subplots(figsize=(10, 15))  # 宽度10，高度18，纵向空间显著增加
+    fig = Figure(figsize=(10, 15))  # 宽度10，高度18，纵向空间显著增加
+    ax = fig.subplots()
     fig.patch.set_facecolor('#f0f2f6')  # 匹配Streamlit背景
     
     # 处理日期（x轴）
@@ -130,8 +147,8 @@ def plot_route_timeline(json_data):
     ax.invert_yaxis()
     
     # 增加纵轴刻度线密度，增强纵向视觉引导
-    ax.yaxis.set_major_locator(plt.MultipleLocator(1))
-    ax.yaxis.set_minor_locator(plt.MultipleLocator(0.5))
+    ax.yaxis.set_major_locator(MultipleLocator(1))
+    ax.yaxis.set_minor_locator(MultipleLocator(0.5))
     ax.grid(True, which='major', linestyle='--', alpha=0.8, linewidth=1.2)
     ax.grid(True, which='minor', linestyle=':', alpha=0.5, linewidth=0.8)
     
@@ -142,7 +159,7 @@ def plot_route_timeline(json_data):
     
     # 创建地点颜色块图例（右上角）
     legend_elements = [
-        plt.Line2D([0], [0], color=color_map[loc], lw=8, label=loc)
+        Line2D([0], [0], color=color_map[loc], lw=8, label=loc)
         for loc in unique_locations
     ]
     
@@ -157,12 +174,12 @@ def plot_route_timeline(json_data):
     )
     
     # 调整布局，为纵轴留出更多空间
-    plt.subplots_adjust(right=0.8, left=0.15)  # 增加左侧边距，确保纵轴标签完整显示
-    plt.tight_layout()
+    fig.subplots_adjust(right=0.8, left=0.15)  # 增加左侧边距，确保纵轴标签完整显示
+    fig.tight_layout()
     
     # 保存到缓冲区
     buf = BytesIO()
-    plt.savefig(buf, format='png', dpi=300, bbox_inches='tight')
+    fig.savefig(buf, format='png', dpi=300, bbox_inches='tight')
     buf.seek(0)
     return buf
         
@@ -171,22 +188,54 @@ def plot_route_timeline(json_data):
 
 def plot_route(json_data):
     # print("json_data = ",json_data)
-    poi_location_list = [item['poi_location'] for item in json_data]
-    locations =[]
-    for location in poi_location_list:
-        location = [float(i) for i in location.split(',')]
-        locations.append(location)
+    # 行程表中的经纬度已解析为float数组
+    trip_table = TripTable.coerce(json_data)
+    locations = [[lon, lat] for lon, lat in zip(trip_table.poi_lon.tolist(), trip_table.poi_lat.tolist())]
     # print("locations = ",locations)
     # 返回路线图
     return draw_ordered_points(locations, key='6617df78ec04efcba67789cc7e02895b', save_path=None)
 
-def plot_route_by_date(json_data, save_dir=None):
+
+def _load_rendered_route(save_path):
+    """读取已生成的路线图，文件不存在或过小（为空或损坏）时返回None"""
+    try:
+        if os.path.getsize(save_path) < 1024:
+            return None
+        with open(save_path, "rb") as f:
+            return f.read()
+    except OSError:
+        return None
+
+
+def _render_route_for_date(date_str, items, key, save_path):
+    """生成单个日期的路线图，失败时返回None"""
+    try:
+        locations = []
+        for item in items:
+            # 将"经度,纬度"字符串转换为[float, float]
+            lon, lat = item['poi_location'].split(',')
+            locations.append([float(lon), float(lat)])
+
+        print(f"{date_str}共有{len(locations)}个地点")
+        # draw_ordered_points 内部限速，并以原子替换的方式写入 save_path
+        return draw_ordered_points(locations=locations, key=key, save_path=save_path)
+    except Exception as e:
+        print(f"处理{date_str}时出错：{str(e)}")
+        return None
+
+
+def plot_route_by_date(json_data, save_dir=None, max_workers=ROUTE_MAP_MAX_WORKERS, overwrite=False):
     """
     按日期划分导航数据，并为每个日期绘制路线图
     
+    各日期的请求在有界线程池中并发发出（受高德限速器约束）；指定 save_dir 时，
+    目录中已存在的 route_<日期>.png 直接读取，不再重复请求，重新运行只补齐缺失的日期。
+    
     参数:
         json_data: 导航数据列表（即nav_data）
         save_dir: 可选，保存图片的目录路径
+        max_workers: 并发线程数，默认 ROUTE_MAP_MAX_WORKERS
+        overwrite: 是否重新生成已存在的图片，默认False
         
     返回:
         字典，键为日期字符串，值为对应日期的地图二进制数据或None（失败时）
@@ -211,49 +260,38 @@ def plot_route_by_date(json_data, save_dir=None):
     
     print(f"成功按日期分组，共{len(date_groups)}天数据")
     
-    # 2. 为每个日期绘制路线图
+    # 2. 跳过已生成的日期
     results = {}
+    pending = {}
     key = '6617df78ec04efcba67789cc7e02895b'  # API密钥
-    
+    if save_dir:
+        os.makedirs(save_dir, exist_ok=True)
     for date_str, items in date_groups.items():
-        print(f"\n处理{date_str}的数据...")
-        
-        # 提取该日期的所有poi_location
-        try:
-            poi_location_list = [item['poi_location'] for item in items]
-            locations = []
-            for location in poi_location_list:
-                # 将"经度,纬度"字符串转换为[float, float]
-                lon, lat = location.split(',')
-                locations.append([float(lon), float(lat)])
-            
-            print(f"{date_str}共有{len(locations)}个地点")
-            
-            # 生成保存路径（如果指定了保存目录）
-            save_path = None
-            if save_dir:
-                os.makedirs(save_dir, exist_ok=True)
-                save_path = os.path.join(save_dir, f"route_{date_str}.png")
-            
-            # 调用绘图函数
-            map_data = draw_ordered_points(
-                locations=locations,
-                key=key,
-                save_path=save_path
-            )
-            
-            results[date_str] = map_data
-            
-            if map_data:
-                print(f"{date_str}的路线图生成成功")
-            else:
-                print(f"{date_str}的路线图生成失败")
-                
-        except Exception as e:
-            print(f"处理{date_str}时出错：{str(e)}")
-            results[date_str] = None
-    
-    return results
+        save_path = os.path.join(save_dir, f"route_{date_str}.png") if save_dir else None
+        rendered = _load_rendered_route(save_path) if save_path and not overwrite else None
+        if rendered is not None:
+            results[date_str] = rendered
+            print(f"{date_str}的路线图已存在，跳过")
+        else:
+            pending[date_str] = (items, save_path)
+
+    # 3. 并发为其余日期绘制路线图
+    if pending:
+        with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(pending))),
+                                thread_name_prefix="route_map") as executor:
+            futures = {
+                date_str: executor.submit(_render_route_for_date, date_str, items, key, save_path)
+                for date_str, (items, save_path) in pending.items()
+            }
+            for date_str, future in futures.items():
+                results[date_str] = future.result()
+                if results[date_str]:
+                    print(f"{date_str}的路线图生成成功")
+                else:
+                    print(f"{date_str}的路线图生成失败")
+
+    # 按原始日期顺序返回
+    return {date_str: results[date_str] for date_str in date_groups}
 
 # 使用示例
 if __name__ == "__main__":
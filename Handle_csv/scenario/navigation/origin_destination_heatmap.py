@@ -3,6 +3,8 @@ import numpy as np
 import matplotlib.pyplot as plt
 import seaborn as sns
 from collections import defaultdict
+import math
+from Handle_csv.scenario.navigation.trip_table import TripTable
 
 # 常量：地球半径(米)
 EARTH_RADIUS = 6371000
@@ -70,11 +72,14 @@ def plot_origin_destination_heatmap(nav_data, grid_size=200):
     frequency_data = defaultdict(lambda: defaultdict(int))
     grid_bounds = {}  # 存储每个网格的经纬度范围
     
-    for item in nav_data:
+    # 出发点经纬度直接取行程表中已解析的float列
+    trip_table = TripTable.coerce(nav_data)
+    for destination, start_lon, start_lat in zip(trip_table.poi.tolist(),
+                                                 trip_table.start_lon.tolist(),
+                                                 trip_table.start_lat.tolist()):
         try:
-            # 解析出发点经纬度
-            start_loc = item['start_location'].split(',')
-            start_lon, start_lat = float(start_loc[0]), float(start_loc[1])
+            if math.isnan(start_lon) or math.isnan(start_lat):
+                raise ValueError("无法解析出发点经纬度")
             
             # 获取网格ID和范围
             grid_id = get_grid_id(start_lon, start_lat, grid_size)
@@ -82,7 +87,6 @@ def plot_origin_destination_heatmap(nav_data, grid_size=200):
                 grid_bounds[grid_id] = get_grid_bounds(grid_id, grid_size)
             
             # 统计频率
-            destination = item['poi']
             frequency_data[grid_id][destination] += 1
             
         except (KeyError, ValueError, IndexError) as e:
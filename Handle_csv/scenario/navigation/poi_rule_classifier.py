@@ -0,0 +1,156 @@
+import re
+import threading
+from typing import Dict, Iterable, List, Optional, Tuple
+
+# POI类型 -> 名称中的类别词（只收录不会歧义的多字词）。名称以类别词结尾（后缀匹配）时直接判定；
+# 没有后缀匹配时，名称中包含的类别词全部指向同一类型才判定，否则交给LLM。
+# 苑、府、里、村、站、寺等单字后缀歧义太大（太古里是商圈、孔府是景点、度假村是酒店），不作为规则
+DEFAULT_POI_TYPE_RULES: Dict[str, Tuple[str, ...]] = {
+    "住宅区": ("小区", "花园", "公寓", "新村", "家园", "住宅", "别墅"),
+    "办公园区": ("园区", "开发区", "科技园", "产业园", "工业园", "软件园", "创业园", "孵化器"),
+    "办公楼": ("大厦", "写字楼", "办公楼", "大楼"),
+    "购物中心": ("广场", "商场", "购物中心", "百货", "奥特莱斯", "商城"),
+    "超市": ("超市", "便利店", "鲜生", "菜场", "菜市场", "大卖场"),
+    "餐厅": ("餐厅", "饭店", "酒家", "酒楼", "火锅", "烧烤", "面馆", "食府", "小吃", "食堂"),
+    "医院": ("医院", "卫生院", "诊所", "卫生服务中心", "门诊部", "急救中心"),
+    "学校": ("学校", "小学", "中学", "大学", "学院", "幼儿园", "附中", "附小"),
+    "停车场": ("停车场", "停车库", "停车楼"),
+    "交通枢纽": ("火车站", "高铁站", "机场", "航站楼", "地铁站", "汽车站", "客运站", "码头", "枢纽"),
+    "加油站": ("加油站", "加气站"),
+    "充电站": ("充电站", "充电桩", "换电站"),
+    "酒店": ("酒店", "宾馆", "旅馆", "民宿", "招待所"),
+    "公园": ("公园", "绿地", "植物园", "湿地"),
+    "景点": ("景区", "风景区", "博物馆", "纪念馆", "古镇", "动物园"),
+    "政府机构": ("政府", "派出所", "公安局", "税务局", "政务中心", "街道办", "居委会"),
+    "银行": ("银行", "支行", "分行"),
+    "体育健身": ("体育馆", "体育中心", "健身房", "健身中心", "游泳馆", "体育场", "球场"),
+    "休闲娱乐": ("影城", "电影院", "影院", "KTV", "剧院", "网吧"),
+    "汽车服务": ("4S店", "汽车城", "洗车", "维修厂", "汽修"),
+}
+
+# 名称末尾的分店/分区说明，如 "星巴克(南京西路店)"、"万达广场（江桥店）"
+_BRANCH_SUFFIX = re.compile(r"[(（][^()（）]*[)）]\s*$")
+# 类别词的最短长度，更短的（单字）类别词即使出现在自定义规则中也会被忽略
+_MIN_KEYWORD_LEN = 2
+
+
+def strip_branch(name: str) -> str:
+    """去掉名称末尾的分店说明（"星巴克(南京西路店)" -> "星巴克"），去掉后为空时返回原名称"""
+    name = name.strip()
+    return _BRANCH_SUFFIX.sub("", name) or name
+
+
+class _TrieNode:
+    __slots__ = ("children", "poi_type")
+
+    def __init__(self) -> None:
+        self.children: Dict[str, "_TrieNode"] = {}
+        self.poi_type: Optional[str] = None
+
+
+class PoiRuleClassifier:
+    """
+    基于类别词的本地POI分类器，放在LLM之前处理名称中带有明显类别词的POI
+
+    - 后缀字典树（类别词倒序插入）：从名称末尾向前走，取最长的后缀类别词，如"XX医院停车场"判为停车场、"中石化加油站"判为加油站
+    - 前缀字典树（类别词正序插入）：没有后缀匹配时扫描名称中出现的类别词，全部指向同一类型才判定
+    无法确定的名称返回None，由调用方交给LLM。分类器累计覆盖率统计，用于观察减少了多少LLM调用。
+    """
+
+    def __init__(self, rules: Optional[Dict[str, Iterable[str]]] = None) -> None:
+        rules = rules if rules is not None else DEFAULT_POI_TYPE_RULES
+        self.types = list(rules)
+        self._suffix_root = _TrieNode()
+        self._contains_root = _TrieNode()
+        for poi_type, keywords in rules.items():
+            for keyword in keywords:
+                if len(keyword) < _MIN_KEYWORD_LEN:
+                    continue
+                self._insert(self._suffix_root, reversed(keyword), poi_type)
+                self._insert(self._contains_root, keyword, poi_type)
+        self._stats_lock = threading.Lock()
+        self._checked = 0
+        self._resolved = 0
+
+    @staticmethod
+    def _insert(root: _TrieNode, chars: Iterable[str], poi_type: str) -> None:
+        node = root
+        for char in chars:
+            node = node.children.setdefault(char, _TrieNode())
+        node.poi_type = poi_type
+
+    def _match_suffix(self, name: str) -> Optional[str]:
+        """最长后缀匹配"""
+        node = self._suffix_root
+        matched = None
+        for char in reversed(name):
+            node = node.children.get(char)
+            if node is None:
+                break
+            if node.poi_type is not None:
+                matched = node.poi_type
+        return matched
+
+    def _match_contains(self, name: str) -> Optional[str]:
+        """名称中出现的类别词只指向一种类型时返回该类型"""
+        found = set()
+        for start in range(len(name)):
+            node = self._contains_root
+            for char in name[start:]:
+                node = node.children.get(char)
+                if node is None:
+                    break
+                if node.poi_type is not None:
+                    found.add(node.poi_type)
+        return found.pop() if len(found) == 1 else None
+
+    def classify(self, name: str) -> Optional[str]:
+        """
+        为单个POI名称分类
+
+        返回:
+            POI类型，无法确定时返回None
+        """
+        if not isinstance(name, str):
+            return None
+        stripped = strip_branch(name)
+        return self._match_suffix(stripped) or self._match_contains(stripped)
+
+    def classify_many(self, names: Iterable[str]) -> Tuple[Dict[str, str], List[str]]:
+        """
+        为一组（已去重的）POI名称分类，并累计覆盖率
+
+        返回:
+            ({名称: 类型} 规则能确定的部分, [无法确定、需要交给LLM的名称])
+        """
+        resolved = {}
+        ambiguous = []
+        for name in names:
+            poi_type = self.classify(name)
+            if poi_type is None:
+                ambiguous.append(name)
+            else:
+                resolved[name] = poi_type
+        with self._stats_lock:
+            self._checked += len(resolved) + len(ambiguous)
+            self._resolved += len(resolved)
+        return resolved, ambiguous
+
+    def coverage_stats(self) -> Dict[str, float]:
+        """累计覆盖率：checked 为分类过的名称数，resolved 为规则直接确定（无需LLM）的名称数"""
+        with self._stats_lock:
+            checked, resolved = self._checked, self._resolved
+        return {
+            "checked": checked,
+            "resolved": resolved,
+            "coverage": round(resolved / checked, 4) if checked else 0.0,
+        }
+
+    def reset_stats(self) -> None:
+        with self._stats_lock:
+            self._checked = 0
+            self._resolved = 0
+
+
+# 创建全局规则分类器实例
+poi_rule_classifier = PoiRuleClassifier()
@@ -0,0 +1,103 @@
+import json
+import os
+import threading
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+
+UNKNOWN_POI_TYPE = "未知"
+# 可通过环境变量 POI_TYPE_DICT_PATH 指定字典文件（如基准测试、隔离的批处理环境）
+DEFAULT_DICTIONARY_PATH = Path(os.environ.get("POI_TYPE_DICT_PATH", Path(".cache") / "poi_type_dict.json"))
+
+
+class PoiTypeDictionary:
+    """
+    持久化的 POI名称 -> POI类型 字典，跨文件、跨vin共享
+
+    分类结果保存在本地JSON文件中，再次遇到同名POI时直接查表，只有新出现的名称才需要交给LLM分类。
+    写盘时先读回磁盘上的内容再合并（多进程批处理时各进程的新结果互不覆盖），
+    并通过临时文件原子替换，避免读到写了一半的文件。
+    """
+
+    def __init__(self, path: Optional[Path] = None) -> None:
+        self.path = Path(path) if path is not None else DEFAULT_DICTIONARY_PATH
+        self._types: Dict[str, str] = {}
+        self._lock = threading.Lock()
+        self._loaded = False
+
+    def _read_file(self) -> Dict[str, str]:
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            return {str(k): str(v) for k, v in data.items()} if isinstance(data, dict) else {}
+        except FileNotFoundError:
+            return {}
+        except (json.JSONDecodeError, OSError) as e:
+            print(f"加载POI类型字典失败: {str(e)}，将使用空字典")
+            return {}
+
+    def _ensure_loaded(self) -> None:
+        """首次使用时加载磁盘上的字典（调用方持有锁）"""
+        if not self._loaded:
+            self._types.update(self._read_file())
+            self._loaded = True
+
+    def lookup(self, names: Iterable[str]) -> Dict[str, str]:
+        """返回names中已知名称的类型，未知名称不出现在结果中"""
+        with self._lock:
+            self._ensure_loaded()
+            return {name: self._types[name] for name in names if name in self._types}
+
+    def missing(self, names: Iterable[str]) -> List[str]:
+        """返回names中尚未分类的名称（去重、保持首次出现顺序）"""
+        with self._lock:
+            self._ensure_loaded()
+            return [name for name in dict.fromkeys(names) if name not in self._types]
+
+    def known_types(self) -> List[str]:
+        """字典中已有的类型（去重），提示LLM尽量沿用，保证同类POI的类型名称一致"""
+        with self._lock:
+            self._ensure_loaded()
+            return list(dict.fromkeys(self._types.values()))
+
+    def update(self, types: Dict[str, str]) -> None:
+        """合并新的分类结果并写盘"""
+        if not types:
+            return
+        with self._lock:
+            self._ensure_loaded()
+            self._types.update(types)
+            merged = self._read_file()
+            merged.update(self._types)
+            self._types = merged
+            tmp_path = self.path.with_suffix(f".{os.getpid()}.tmp")
+            try:
+                self.path.parent.mkdir(parents=True, exist_ok=True)
+                with open(tmp_path, "w", encoding="utf-8") as f:
+                    json.dump(merged, f, ensure_ascii=False)
+                os.replace(tmp_path, self.path)
+            except OSError as e:
+                print(f"保存POI类型字典失败: {str(e)}")
+                tmp_path.unlink(missing_ok=True)
+
+    def set_path(self, path: Path) -> None:
+        """切换到另一个字典文件（丢弃内存中的内容，下次使用时从新文件加载）"""
+        with self._lock:
+            self.path = Path(path)
+            self._types = {}
+            self._loaded = False
+
+    def clear(self) -> None:
+        """清空字典（内存和磁盘）"""
+        with self._lock:
+            self._types = {}
+            self._loaded = True
+            self.path.unlink(missing_ok=True)
+
+    def __len__(self) -> int:
+        with self._lock:
+            self._ensure_loaded()
+            return len(self._types)
+
+
+# 创建全局POI类型字典实例
+poi_type_dictionary = PoiTypeDictionary()
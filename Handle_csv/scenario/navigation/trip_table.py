@@ -0,0 +1,224 @@
+import numpy as np
+import pandas as pd
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+from Handle_csv.Util import parse_datetime_array, add_time_columns
+from use_GaoDe_api.geo import get_driving_path_distance_by_loc
+from use_GaoDe_api.district import get_district
+
+TRIP_FIELDS = ("start_location", "poi", "type", "poi_location", "start_time", "end_time")
+
+
+def _split_locations(locations: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """把 '经度,纬度' 字符串数组拆成两个float64数组，无法解析的为NaN"""
+    if len(locations) == 0:
+        return np.empty(0, dtype=np.float64), np.empty(0, dtype=np.float64)
+    parts = pd.Series(locations, dtype=object).str.split(",", n=1, expand=True)
+    if parts.shape[1] < 2:
+        nan_array = np.full(len(locations), np.nan)
+        return nan_array, nan_array.copy()
+    lon = pd.to_numeric(parts[0], errors="coerce").to_numpy(dtype=np.float64)
+    lat = pd.to_numeric(parts[1], errors="coerce").to_numpy(dtype=np.float64)
+    return lon, lat
+
+
+def _encode(values: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """分类编码：返回 (int32编码数组, 类别数组)，None也作为一个类别保留"""
+    codes, categories = pd.factorize(values, use_na_sentinel=False)
+    categories = np.asarray(categories, dtype=object)
+    categories[pd.isna(categories)] = None  # factorize会把None变成NaN，还原为None以保持JSON输出一致
+    return codes.astype(np.int32), categories
+
+
+class TripRow:
+    """
+    行程表中一行的只读视图，不复制数据
+
+    同时支持属性访问（row.poi）和字典式访问（row['poi']、'poi' in row、row.get('poi')），
+    可以直接替代原来的 poi_info 对象和 poi_info.get_json_info() 字典。
+    """
+    __slots__ = ("_table", "_index")
+
+    def __init__(self, table: "TripTable", index: int) -> None:
+        self._table = table
+        self._index = index
+
+    @property
+    def start_location(self) -> str:
+        return self._table.start_location[self._index]
+
+    @property
+    def poi(self) -> str:
+        table = self._table
+        return table.poi_categories[table.poi_codes[self._index]]
+
+    @property
+    def type(self) -> str:
+        table = self._table
+        return table.type_categories[table.type_codes[self._index]]
+
+    @property
+    def poi_location(self) -> str:
+        return self._table.poi_location[self._index]
+
+    @property
+    def start_time(self) -> str:
+        return self._table.start_time[self._index]
+
+    @property
+    def end_time(self) -> str:
+        return self._table.end_time[self._index]
+
+    @property
+    def start_datetime(self) -> pd.Timestamp:
+        return pd.Timestamp(self._table.start_datetime[self._index])
+
+    @property
+    def end_datetime(self) -> pd.Timestamp:
+        return pd.Timestamp(self._table.end_datetime[self._index])
+
+    def __getitem__(self, key: str) -> Any:
+        if key not in TRIP_FIELDS:
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def __contains__(self, key: str) -> bool:
+        return key in TRIP_FIELDS
+
+    def get(self, key: str, default: Any = None) -> Any:
+        return getattr(self, key) if key in TRIP_FIELDS else default
+
+    def keys(self) -> Tuple[str, ...]:
+        return TRIP_FIELDS
+
+    def get_json_info(self) -> Dict[str, Any]:
+        return {field: getattr(self, field) for field in TRIP_FIELDS}
+
+    def __repr__(self) -> str:
+        return f"TripRow({self.get_json_info()})"
+
+    def get_driving_distance(self) -> float:  # 单位米
+        return get_driving_path_distance_by_loc(self.start_location, self.poi_location)
+
+    def get_driving_time(self) -> float:  # 单位分钟
+        return self._table.duration_s[self._index] / 60
+
+    def get_administrative_division(self):  # 行政区划分
+        return {
+            'start_administrative_division': get_district(self.start_location),
+            'end_administrative_division': get_district(self.poi_location)
+        }
+
+
+class TripTable:
+    """
+    列式存储的行程表（一个vin的全部出行，每段出行一行）
+
+    列:
+        start_location / poi_location / start_time / end_time: 原始字符串（object数组，用于JSON输出）
+        start_lon, start_lat, poi_lon, poi_lat: float64 经纬度，无法解析为NaN
+        start_datetime, end_datetime: datetime64[ns]，无法解析为NaT
+        poi_codes / poi_categories, type_codes / type_categories: POI名称与类型的分类编码
+        hour, weekday, is_weekday, duration_s: 由开始/结束时间派生
+    坐标和时间只在构建时解析一次，下游的标签、地图、知识图谱直接读取这些数组。
+    """
+
+    def __init__(self, start_location: Iterable, poi: Iterable, type: Iterable,
+                 poi_location: Iterable, start_time: Iterable, end_time: Iterable) -> None:
+        self.start_location = np.asarray(list(start_location), dtype=object)
+        self.poi_location = np.asarray(list(poi_location), dtype=object)
+        self.start_time = np.asarray(list(start_time), dtype=object)
+        self.end_time = np.asarray(list(end_time), dtype=object)
+
+        self.poi_codes, self.poi_categories = _encode(np.asarray(list(poi), dtype=object))
+        self.type_codes, self.type_categories = _encode(np.asarray(list(type), dtype=object))
+
+        self.start_lon, self.start_lat = _split_locations(self.start_location)
+        self.poi_lon, self.poi_lat = _split_locations(self.poi_location)
+
+        start_series = parse_datetime_array(self.start_time)
+        end_series = parse_datetime_array(self.end_time)
+        self.start_datetime = start_series.to_numpy(dtype="datetime64[ns]")
+        self.end_datetime = end_series.to_numpy(dtype="datetime64[ns]")
+        self.hour = start_series.dt.hour.to_numpy(dtype=np.float64)
+        self.weekday = start_series.dt.weekday.to_numpy(dtype=np.float64)
+        self.is_weekday = self.weekday < 5
+        self.duration_s = (end_series - start_series).dt.total_seconds().to_numpy()
+
+        self._records: Optional[List[Dict[str, Any]]] = None
+        self._frame: Optional[pd.DataFrame] = None
+
+    @classmethod
+    def from_records(cls, records: Iterable[Any]) -> "TripTable":
+        """从字典列表（或poi_info/TripRow等带同名字段的对象）构建"""
+        columns = {field: [] for field in TRIP_FIELDS}
+        for record in records:
+            for field in TRIP_FIELDS:
+                value = record.get(field) if isinstance(record, (dict, TripRow)) else getattr(record, field, None)
+                columns[field].append(value)
+        return cls(**columns)
+
+    @classmethod
+    def coerce(cls, data: Any) -> "TripTable":
+        """TripTable原样返回，字典列表等其他输入转换为TripTable"""
+        if isinstance(data, cls):
+            return data
+        return cls.from_records(data if data is not None else [])
+
+    def __len__(self) -> int:
+        return len(self.start_time)
+
+    def __getitem__(self, index: int) -> TripRow:
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError(index)
+        return TripRow(self, index)
+
+    def __iter__(self):
+        for index in range(len(self)):
+            yield TripRow(self, index)
+
+    @property
+    def poi(self) -> np.ndarray:
+        """每行的POI名称（object数组）"""
+        return self.poi_categories[self.poi_codes]
+
+    @property
+    def type(self) -> np.ndarray:
+        """每行的POI类型（object数组）"""
+        return self.type_categories[self.type_codes]
+
+    @property
+    def date(self) -> np.ndarray:
+        """每行的出发日期（datetime.date，无法解析为NaT）"""
+        return pd.Series(self.start_datetime).dt.date.to_numpy()
+
+    def to_records(self) -> List[Dict[str, Any]]:
+        """
+        字典列表形式（与原 Get_json_info()['poi_info_list'] 一致），只生成一次
+
+        注意返回的是缓存的同一个列表，调用方不应原地修改。
+        """
+        if self._records is None:
+            self._records = [
+                dict(zip(TRIP_FIELDS, values))
+                for values in zip(self.start_location, self.poi, self.type,
+                                  self.poi_location, self.start_time, self.end_time)
+            ]
+        return self._records
+
+    def to_frame(self) -> pd.DataFrame:
+        """DataFrame形式，含原始列、解析后的时间列和派生列，只生成一次"""
+        if self._frame is None:
+            frame = pd.DataFrame({
+                "start_location": self.start_location,
+                "poi": self.poi,
+                "type": self.type,
+                "poi_location": self.poi_location,
+                "start_time": self.start_time,
+                "end_time": self.end_time,
+                "start_datetime": self.start_datetime,
+                "end_datetime": self.end_datetime,
+            })
+            self._frame = add_time_columns(frame, start_col="start_datetime", end_col="end_datetime")
+        return self._frame
@@ -11,6 +11,7 @@ import os
 import tempfile
 # 渲染自定义HTML
 import cairo
+from Handle_csv.scenario.navigation.trip_table import TripTable
 # 设置中文字体
 plt.rcParams["font.sans-serif"] = ["SimHei"]
 plt.rcParams["font.family"] = ["Heiti TC"]
@@ -26,8 +27,11 @@ def plot_destination_time_heatmap(nav_data: List[Dict[str, Any]]) -> None:
     if not nav_data:
         raise ValueError("导航数据为空，无法绘制热力图")  # 检查输入数据是否为空
         
-    # 转换数据格式，将列表形式的导航数据转换为DataFrame格式
-    df = pd.DataFrame(nav_data)
+    # 转换数据格式：TripTable直接取已解析的列，列表形式的导航数据转换为DataFrame格式
+    if isinstance(nav_data, TripTable):
+        df = pd.DataFrame({'poi': nav_data.poi, 'start_time': nav_data.start_datetime})
+    else:
+        df = pd.DataFrame(nav_data)
     
     # 提取日期和小时信息
     if 'start_time' not in df.columns:
@@ -64,7 +68,10 @@ def plot_destination_type_pie(nav_data: List[Dict[str, Any]]) -> None:
         raise ValueError("导航数据为空，无法绘制饼状图")
         
     # 转换数据格式
-    df = pd.DataFrame(nav_data)
+    if isinstance(nav_data, TripTable):
+        df = pd.DataFrame({'type': nav_data.type})
+    else:
+        df = pd.DataFrame(nav_data)
     
     # 提取目的地类型
     type_column = 'type'
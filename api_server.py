@@ -0,0 +1,269 @@
+# demo/api_server.py
+"""
+导航场景的本地HTTP接口（无界面，供下游系统直接拉取用户画像）
+
+基于标准库 ThreadingHTTPServer，每个请求一个线程；导航信息按上传文件的指纹缓存
+（与仪表盘共用 utils.cache_utils 的进程内LRU和离线缓存），各场景的结果再按
+(指纹, VIN, 场景) 缓存在共享的结果缓存中，并发请求同一结果只计算一次。
+VIN随请求传入，不写回共享的导航信息，同一文件以不同VIN请求互不影响。
+
+接口:
+    GET  /health                                   健康检查
+    POST /files[?vin=xxx]                          请求体为CSV原始内容，解析并缓存，返回指纹
+    POST /scenarios/<scenario>[?vin=xxx]           请求体为CSV原始内容，直接返回场景结果
+    GET  /scenarios/<scenario>?fingerprint=<md5>[&vin=xxx]   使用已上传文件的指纹返回场景结果
+    POST /jobs/<kind>?fingerprint=<md5>            提交后台分析任务（anchors / feature_labels / route_maps /
+                                                   route_timeline / daily_maps），返回任务ID
+    GET  /jobs/<job_id>                            查询任务进度和阶段性结果（PNG以base64返回，交互地图以HTML返回）
+    POST /jobs/<job_id>/cancel                     取消任务
+
+场景（与 Handle_csv.handle.get_target_info 一致）:
+    navigation_json          导航行程JSON {"vin": ..., "poi_info_list": [...]}
+    nagivation_draw          路线时间线PNG
+    route_map                路线静态地图PNG
+    user_basic_feature_label 用户基本特征标签JSON
+
+用法（需在项目根目录运行，特征标签模板使用相对路径）:
+    python api_server.py --host 127.0.0.1 --port 8600
+"""
+import argparse
+import base64
+import hashlib
+import io
+import json
+import threading
+from collections import OrderedDict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Optional, Tuple
+from urllib.parse import parse_qs, urlparse
+
+import matplotlib
+matplotlib.use("Agg")  # 无界面渲染
+import matplotlib.pyplot as plt
+import pandas as pd
+
+from Handle_csv.handle import get_target_info
+from utils.analysis_jobs import ANALYSIS_JOBS, submit_analysis
+from utils.cache_utils import cache_navigation_info, get_cached_navigation_info
+from utils.job_queue import job_manager
+from utils.logger_setup import setup_logger
+from utils.perf import perf_recorder
+
+SCENARIOS = ("navigation_json", "nagivation_draw", "route_map", "user_basic_feature_label")
+DEFAULT_RESULT_CACHE_SIZE = 64
+
+logger = setup_logger()
+
+
+class ScenarioResultCache:
+    """(指纹, VIN, 场景) -> (Content-Type, 响应体) 的线程安全LRU缓存，同一结果并发请求时只计算一次"""
+
+    def __init__(self, max_entries: int = DEFAULT_RESULT_CACHE_SIZE):
+        self.max_entries = max_entries
+        self._results: "OrderedDict[Tuple[str, str, str], Tuple[str, bytes]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._key_locks: Dict[Tuple[str, str, str], threading.Lock] = {}
+
+    def get(self, key: Tuple[str, str, str]) -> Optional[Tuple[str, bytes]]:
+        with self._lock:
+            result = self._results.get(key)
+            if result is not None:
+                self._results.move_to_end(key)
+            return result
+
+    def get_or_compute(self, key: Tuple[str, str, str], compute) -> Tuple[str, bytes]:
+        result = self.get(key)
+        if result is not None:
+            return result
+        with self._lock:
+            key_lock = self._key_locks.setdefault(key, threading.Lock())
+        try:
+            with key_lock:
+                result = self.get(key)
+                if result is None:
+                    result = compute()
+                    with self._lock:
+                        self._results[key] = result
+                        while len(self._results) > self.max_entries:
+                            self._results.popitem(last=False)
+        finally:
+            # 计算失败时同样释放该键的锁，避免 _key_locks 无限增长
+            with self._lock:
+                self._key_locks.pop(key, None)
+        return result
+
+
+result_cache = ScenarioResultCache()
+_render_lock = threading.Lock()  # pyplot不是线程安全的，绘图场景串行执行
+
+
+def ingest_csv(raw: bytes):
+    """
+    解析CSV并缓存导航信息（缓存的导航信息在请求间共享，不做修改）
+
+    返回:
+        (指纹, navi_info)
+    """
+    fingerprint = hashlib.md5(raw).hexdigest()
+    navi_info = get_cached_navigation_info(fingerprint)
+    if navi_info is None:
+        with perf_recorder.span("CSV解析", size=len(raw)):
+            df = pd.read_csv(io.BytesIO(raw))
+        navi_info = cache_navigation_info(df, fingerprint, show_spinner=False)
+    return fingerprint, navi_info
+
+
+def render_scenario(navi_info, scenario: str, vin: str = "") -> Tuple[str, bytes]:
+    """
+    计算单个场景的结果
+
+    参数:
+        vin: 本次请求的VIN，为空时使用导航信息中的默认值
+    返回:
+        (Content-Type, 响应体)
+    """
+    if scenario == "navigation_json":
+        payload = {"vin": vin or navi_info.vin, "poi_info_list": navi_info.trip_table.to_records()}
+        return "application/json; charset=utf-8", json.dumps(payload, ensure_ascii=False, indent=2).encode("utf-8")
+    if scenario == "user_basic_feature_label":
+        mapping = get_target_info(navi_info, scenario).basic_features_labels_mapping
+        return "application/json; charset=utf-8", json.dumps(mapping, ensure_ascii=False).encode("utf-8")
+    if scenario == "nagivation_draw":
+        with _render_lock:
+            try:
+                buf = get_target_info(navi_info, scenario)
+            finally:
+                plt.close("all")
+        if buf is None:
+            raise ValueError("没有可绘制的导航数据")
+        return "image/png", buf.getvalue()
+    if scenario == "route_map":
+        image = get_target_info(navi_info, scenario)
+        if not image:
+            raise ValueError("静态地图生成失败")
+        return "image/png", image
+    raise KeyError(scenario)
+
+
+def _jsonable(value):
+    """任务结果中的二进制（PNG）转为base64字符串、folium地图转为HTML，便于JSON返回"""
+    if isinstance(value, (bytes, bytearray)):
+        return base64.b64encode(value).decode("ascii")
+    if hasattr(value, "get_root"):  # folium.Map
+        return value.get_root().render()
+    if isinstance(value, dict):
+        return {str(k): _jsonable(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_jsonable(v) for v in value]
+    return value
+
+
+class NavigationAPIHandler(BaseHTTPRequestHandler):
+    """导航场景接口的请求处理"""
+    server_version = "NavigationAPI/1.0"
+
+    def _send(self, status: int, content_type: str, body: bytes) -> None:
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _send_json(self, status: int, payload) -> None:
+        self._send(status, "application/json; charset=utf-8", json.dumps(payload, ensure_ascii=False).encode("utf-8"))
+
+    def _read_body(self) -> bytes:
+        length = int(self.headers.get("Content-Length") or 0)
+        return self.rfile.read(length) if length > 0 else b""
+
+    def _serve_scenario(self, scenario: str, fingerprint: str, navi_info, vin: str) -> None:
+        content_type, body = result_cache.get_or_compute(
+            (fingerprint, vin, scenario), lambda: render_scenario(navi_info, scenario, vin)
+        )
+        self._send(200, content_type, body)
+
+    def _handle(self, method: str) -> None:
+        url = urlparse(self.path)
+        query = parse_qs(url.query)
+        parts = [part for part in url.path.split("/") if part]
+        try:
+            if method == "GET" and parts == ["health"]:
+                self._send_json(200, {"status": "ok"})
+            elif method == "POST" and parts == ["files"]:
+                raw = self._read_body()
+                if not raw:
+                    self._send_json(400, {"error": "请求体为空，请上传CSV内容"})
+                    return
+                fingerprint, navi_info = ingest_csv(raw)
+                self._send_json(200, {"fingerprint": fingerprint, "vin": query.get("vin", [""])[0] or navi_info.vin,
+                                      "trips": len(navi_info.trip_table)})
+            elif len(parts) == 2 and parts[0] == "scenarios":
+                scenario = parts[1]
+                if scenario not in SCENARIOS:
+                    self._send_json(404, {"error": f"不支持的场景: {scenario}", "scenarios": list(SCENARIOS)})
+                    return
+                if method == "POST":
+                    raw = self._read_body()
+                    if not raw:
+                        self._send_json(400, {"error": "请求体为空，请上传CSV内容"})
+                        return
+                    fingerprint, navi_info = ingest_csv(raw)
+                else:
+                    fingerprint = query.get("fingerprint", [""])[0]
+                    navi_info = get_cached_navigation_info(fingerprint) if fingerprint else None
+                    if navi_info is None:
+                        self._send_json(404, {"error": "未找到该指纹对应的文件，请先 POST /files 上传"})
+                        return
+                self._serve_scenario(scenario, fingerprint, navi_info, query.get("vin", [""])[0])
+            elif method == "POST" and len(parts) == 2 and parts[0] == "jobs" and parts[1] in ANALYSIS_JOBS:
+                fingerprint = query.get("fingerprint", [""])[0]
+                navi_info = get_cached_navigation_info(fingerprint) if fingerprint else None
+                if navi_info is None:
+                    self._send_json(404, {"error": "未找到该指纹对应的文件，请先 POST /files 上传"})
+                    return
+                self._send_json(202, {"job_id": submit_analysis(parts[1], fingerprint, navi_info)})
+            elif method == "GET" and len(parts) == 2 and parts[0] == "jobs":
+                snapshot = job_manager.get_status(parts[1])
+                if snapshot is None:
+                    self._send_json(404, {"error": f"未找到任务: {parts[1]}"})
+                else:
+                    self._send_json(200, _jsonable(snapshot))
+            elif method == "POST" and len(parts) == 3 and parts[0] == "jobs" and parts[2] == "cancel":
+                self._send_json(200, {"cancelled": job_manager.cancel(parts[1])})
+            else:
+                self._send_json(404, {"error": f"未知接口: {method} {url.path}"})
+        except Exception as e:
+            logger.error(f"处理请求 {method} {self.path} 失败: {str(e)}", exc_info=True)
+            self._send_json(500, {"error": str(e)})
+
+    def do_GET(self) -> None:
+        self._handle("GET")
+
+    def do_POST(self) -> None:
+        self._handle("POST")
+
+    def log_message(self, format, *args) -> None:
+        logger.info(f"[API] {self.address_string()} {format % args}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="导航场景本地HTTP接口")
+    parser.add_argument("--host", default="127.0.0.1", help="监听地址，默认仅本机")
+    parser.add_argument("--port", type=int, default=8600, help="监听端口")
+    parser.add_argument("--cache-size", type=int, default=DEFAULT_RESULT_CACHE_SIZE,
+                        help="场景结果缓存的最大条目数")
+    args = parser.parse_args()
+
+    result_cache.max_entries = args.cache_size
+    server = ThreadingHTTPServer((args.host, args.port), NavigationAPIHandler)
+    logger.info(f"导航接口已启动: http://{args.host}:{args.port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
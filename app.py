@@ -1,3 +1,5 @@
+import io
+import hashlib
 import streamlit as st
 import pandas as pd
 from typing import List
@@ -11,6 +13,8 @@ from modules.navigation_knowledge_graph import NavigationKnowledgeGraphModule
 from modules.data_filter import DataFilterModule
 from utils.logger_setup import setup_logger
 from utils.cache_manager import cache_manager  # 导入离线缓存管理器
+from utils.perf import perf_recorder  # 导入性能统计
+from utils.csv_preview import preview_csv  # 上传文件的快速预览
 #忽略警告
 import warnings
 warnings.filterwarnings("ignore")
@@ -26,6 +30,7 @@ class DashboardApp:
         self.data = None
         self.current_filename = None
         self.modules: List[BaseModule] = []
+        self.overview = DataOverviewModule(width=100)  # 上传后先用快速预览展示，完整解析后再更新
         
         # 初始化模块
         self._initialize_modules()
@@ -48,23 +53,40 @@ class DashboardApp:
                 filename = uploaded_file.name
                 self.current_filename = filename
                 
-                # 读取数据
-                df = pd.read_csv(uploaded_file)
+                # 读取数据，文件内容的md5作为指纹，供离线缓存和各模块的结果缓存使用
+                raw = uploaded_file.getvalue()
+                fingerprint = hashlib.md5(raw).hexdigest()
+                
+                # 先只读表头、前几行和抽样行展示概览，不等完整解析
+                overview_slot = st.empty()
+                with perf_recorder.span("CSV快速预览", size=uploaded_file.size):
+                    self.overview.set_preview(preview_csv(raw))
+                with overview_slot.container():
+                    self.overview.render()
+                
+                with st.spinner("正在解析完整数据..."):
+                    with perf_recorder.span("CSV解析", size=uploaded_file.size):
+                        df = pd.read_csv(io.BytesIO(raw))
+                self.overview.set_data(df, filename, fingerprint)
+                with overview_slot.container():
+                    self.overview.render()
                 
                 # 检查离线缓存是否有效
-                if cache_manager.is_cache_valid(filename, df):
+                with perf_recorder.span("缓存校验", size=len(df)):
+                    cache_valid = cache_manager.is_cache_valid(filename, df, fingerprint=fingerprint)
+                if cache_valid:
                     st.success(f"文件 '{filename}' 已从离线缓存加载！")
                     logger.info(f"从离线缓存加载文件: {filename}")
                 else:
                     # 更新离线缓存
-                    cache_manager.update_file_cache(filename, df)
+                    cache_manager.update_file_cache(filename, df, fingerprint=fingerprint)
                     st.success(f"文件 '{filename}' 上传并保存到离线缓存！")
                     logger.info(f"新文件保存到离线缓存: {filename}")
                 
                 # 将数据和文件名传递给所有模块
                 self.data = df.copy()
                 for module in self.modules:
-                    module.set_data(self.data.copy(), filename)  # 传递文件名用于缓存
+                    module.set_data(self.data.copy(), filename, fingerprint)  # 传递文件名和指纹用于缓存
                 
             except Exception as e:
                 error_msg = f"文件读取错误: {str(e)}"
@@ -113,6 +135,20 @@ class DashboardApp:
             for module in self.modules:
                 module.render()
                 st.divider()  # 模块之间的分隔线
+            
+            self._render_performance_panel()
+    
+    def _render_performance_panel(self) -> None:
+        """渲染性能统计面板（默认折叠）"""
+        with st.expander("性能统计", expanded=False):
+            perf_df = perf_recorder.to_dataframe()
+            if perf_df.empty:
+                st.info("暂无性能统计数据")
+            else:
+                st.dataframe(perf_df, use_container_width=True, hide_index=True)
+            if st.button("重置性能统计"):
+                perf_recorder.log_summary()
+                perf_recorder.reset()
 
 if __name__ == "__main__":
     app = DashboardApp()
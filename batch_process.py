@@ -0,0 +1,177 @@
+# demo/batch_process.py
+"""
+多VIN导航数据批量处理（无界面，替代Streamlit上传入口）
+
+输入目录中每辆车一个 all_sequence_<VIN>_merged.csv 文件，
+使用进程池并行执行：导航信息提取 -> 用户基本特征标签 -> 导航知识图谱，
+每个VIN输出到 <输出目录>/<VIN>/ 下，全部完成后写出汇总 summary.json / summary.csv。
+
+用法（需在项目根目录运行，特征标签模板使用相对路径）:
+    python batch_process.py data/sequences -o output/batch -w 8
+"""
+import argparse
+import json
+import os
+import re
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+from typing import Any, Dict, List
+
+import pandas as pd
+
+from Handle_csv.handle import get_target_info
+from Handle_csv.scenario.navigation.navigation_info import get_navigation_info
+from Handle_csv.scenario.navigation.knowledge_graph import NavigationKnowledgeGraph
+from utils.logger_setup import setup_logger
+
+VIN_FILE_PATTERN = re.compile(r"^all_sequence_(?P<vin>[A-Za-z0-9]+)_merged\.csv$")
+
+
+def find_vin_files(input_dir: str) -> List[Dict[str, str]]:
+    """扫描目录，返回 [{'vin':..., 'path':...}]，按VIN排序"""
+    vin_files = []
+    for path in sorted(Path(input_dir).iterdir()):
+        match = VIN_FILE_PATTERN.match(path.name)
+        if match and path.is_file():
+            vin_files.append({"vin": match.group("vin"), "path": str(path)})
+    return vin_files
+
+
+def _write_trips(poi_info_list: List[Dict[str, Any]], vin_dir: Path) -> str:
+    """将行程表写为Parquet，缺少parquet引擎时退回CSV，返回实际写出的文件名"""
+    trips_df = pd.DataFrame(poi_info_list)
+    try:
+        trips_df.to_parquet(vin_dir / "trips.parquet", index=False)
+        return "trips.parquet"
+    except ImportError:
+        trips_df.to_csv(vin_dir / "trips.csv", index=False)
+        return "trips.csv"
+
+
+def process_vin_file(vin: str, csv_path: str, output_dir: str) -> Dict[str, Any]:
+    """
+    处理单个VIN文件（在子进程中运行）
+
+    每个阶段单独捕获异常，某一阶段失败不影响其它阶段的输出。
+
+    返回:
+        该VIN的处理汇总信息
+    """
+    logger = setup_logger()
+    vin_dir = Path(output_dir) / vin
+    vin_dir.mkdir(parents=True, exist_ok=True)
+    summary = {
+        "vin": vin,
+        "file": os.path.basename(csv_path),
+        "rows": 0,
+        "trips": 0,
+        "navigation_info": "未执行",
+        "feature_label": "未执行",
+        "knowledge_graph": "未执行",
+        "error": "",
+        "elapsed_s": 0.0,
+    }
+    start_time = time.time()
+
+    try:
+        df = pd.read_csv(csv_path)
+        summary["rows"] = len(df)
+        # 居住地与工作地两次LLM调用在后台并行进行
+        navi_info = get_navigation_info(df, vin=vin, prefetch_anchors=True)
+        json_info = navi_info.Get_json_info(wait_for_anchors=True)
+        poi_info_list = json_info["poi_info_list"]
+        summary["trips"] = len(poi_info_list)
+        with open(vin_dir / "navigation_info.json", "w", encoding="utf-8") as f:
+            json.dump(json_info, f, ensure_ascii=False, indent=2)
+        summary["navigation_info"] = _write_trips(poi_info_list, vin_dir)
+    except Exception as e:
+        summary["navigation_info"] = "失败"
+        summary["error"] = f"导航信息提取失败: {str(e)}"
+        summary["elapsed_s"] = round(time.time() - start_time, 2)
+        logger.error(f"[{vin}] {summary['error']}", exc_info=True)
+        return summary
+
+    errors = []
+    try:
+        feature_label = get_target_info(navi_info, "user_basic_feature_label")
+        with open(vin_dir / "feature_labels.json", "w", encoding="utf-8") as f:
+            json.dump(feature_label.basic_features_labels_mapping, f, ensure_ascii=False, indent=2)
+        summary["feature_label"] = "feature_labels.json"
+    except Exception as e:
+        summary["feature_label"] = "失败"
+        errors.append(f"特征标签计算失败: {str(e)}")
+        logger.error(f"[{vin}] 特征标签计算失败: {str(e)}", exc_info=True)
+
+    try:
+        kg = NavigationKnowledgeGraph(user_id=vin)
+        kg.build_from_json_info(navi_info.trip_table)
+        kg.export_to_json(str(vin_dir / "navigation_kg.json"))
+        summary["knowledge_graph"] = "navigation_kg.json"
+    except Exception as e:
+        summary["knowledge_graph"] = "失败"
+        errors.append(f"知识图谱构建失败: {str(e)}")
+        logger.error(f"[{vin}] 知识图谱构建失败: {str(e)}", exc_info=True)
+
+    summary["error"] = "; ".join(errors)
+    summary["elapsed_s"] = round(time.time() - start_time, 2)
+    logger.info(f"[{vin}] 处理完成: {summary['trips']} 段行程, 耗时 {summary['elapsed_s']}秒")
+    return summary
+
+
+def run_batch(input_dir: str, output_dir: str, workers: int = None) -> List[Dict[str, Any]]:
+    """并行处理目录下所有VIN文件，并写出汇总"""
+    logger = setup_logger()
+    vin_files = find_vin_files(input_dir)
+    if not vin_files:
+        print(f"目录 {input_dir} 中没有找到 all_sequence_<VIN>_merged.csv 文件")
+        return []
+
+    os.makedirs(output_dir, exist_ok=True)
+    workers = workers or os.cpu_count() or 1
+    print(f"共 {len(vin_files)} 个VIN文件，使用 {workers} 个进程处理...")
+    logger.info(f"批量处理开始: {len(vin_files)} 个文件, {workers} 个进程, 输出目录 {output_dir}")
+
+    results = []
+    start_time = time.time()
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = {
+            executor.submit(process_vin_file, item["vin"], item["path"], output_dir): item
+            for item in vin_files
+        }
+        for future in as_completed(futures):
+            item = futures[future]
+            try:
+                summary = future.result()
+            except Exception as e:
+                # 子进程异常退出（如内存不足）时也要记录到汇总里
+                summary = {"vin": item["vin"], "file": os.path.basename(item["path"]),
+                           "error": f"子进程异常: {str(e)}"}
+                logger.error(f"[{item['vin']}] 子进程异常: {str(e)}")
+            results.append(summary)
+            status = "失败" if summary.get("error") else "成功"
+            print(f"[{len(results)}/{len(vin_files)}] {item['vin']} {status}")
+
+    results.sort(key=lambda x: x["vin"])
+    with open(os.path.join(output_dir, "summary.json"), "w", encoding="utf-8") as f:
+        json.dump(results, f, ensure_ascii=False, indent=2)
+    pd.DataFrame(results).to_csv(os.path.join(output_dir, "summary.csv"), index=False)
+
+    elapsed = time.time() - start_time
+    failed = sum(1 for r in results if r.get("error"))
+    print(f"批量处理完成，耗时 {elapsed:.2f}秒，成功 {len(results) - failed} 个，失败 {failed} 个")
+    logger.info(f"批量处理完成，耗时 {elapsed:.2f}秒，失败 {failed} 个")
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="多VIN导航数据批量处理")
+    parser.add_argument("input_dir", help="包含 all_sequence_<VIN>_merged.csv 的目录")
+    parser.add_argument("-o", "--output-dir", default="output/batch", help="输出目录")
+    parser.add_argument("-w", "--workers", type=int, default=None, help="进程数，默认使用全部CPU核")
+    args = parser.parse_args()
+    run_batch(args.input_dir, args.output_dir, args.workers)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,161 @@
+# demo/benchmark/run_benchmark.py
+"""
+导航流水线端到端基准测试
+
+对每个数据规模：生成合成序列CSV -> 逐阶段计时（CSV解析、导航行筛选、POI提取、
+锚点推断、特征标签、知识图谱、各图表渲染），LLM与高德API使用 stand_ins 中的替身，
+输出每个阶段的耗时以及 rows/s、trips/s 吞吐。
+
+用法（在项目根目录运行）:
+    python -m benchmark.run_benchmark --rows 10000 100000 -o bench_output.json
+"""
+import argparse
+import json
+import os
+import tempfile
+import time
+from typing import Any, Callable, Dict, List
+
+import matplotlib
+matplotlib.use("Agg")  # 无界面渲染
+import matplotlib.pyplot as plt
+import pandas as pd
+
+from Handle_csv.handle import get_target_info
+from Handle_csv.scenario.navigation.navigation_info import (
+    get_navigation_related_row,
+    extract_poi_from_navigation_related_row,
+)
+from Handle_csv.scenario.navigation.basic_info import navi_info
+from Handle_csv.scenario.navigation.poi_rule_classifier import poi_rule_classifier
+from Handle_csv.scenario.navigation.knowledge_graph import NavigationKnowledgeGraph
+from Handle_csv.scenario.navigation.interactive_maps import create_daily_navigation_maps
+from Handle_csv.scenario.navigation.navigation_poi_time import plot_route_timeline
+from Handle_csv.scenario.navigation.origin_destination_heatmap import plot_origin_destination_heatmap
+from Handle_csv.scenario.navigation.visualization import (
+    plot_destination_time_heatmap,
+    plot_destination_type_pie,
+)
+from benchmark.stand_ins import install_stand_ins
+from benchmark.synthetic_data import write_sequence_csv
+from utils.perf import perf_recorder
+
+DEFAULT_ROWS = [10_000, 50_000]
+
+
+def _timed(results: List[Dict[str, Any]], stage: str, n_rows: int, n_trips: int,
+           func: Callable, *args, **kwargs) -> Any:
+    """执行一个阶段并记录耗时与吞吐"""
+    start_time = time.perf_counter()
+    value = func(*args, **kwargs)
+    elapsed = time.perf_counter() - start_time
+    results.append({
+        "rows": n_rows,
+        "stage": stage,
+        "elapsed_s": round(elapsed, 4),
+        "rows_per_s": round(n_rows / elapsed, 1) if elapsed > 0 else None,
+        "trips": n_trips,
+        "trips_per_s": round(n_trips / elapsed, 1) if elapsed > 0 and n_trips else None,
+    })
+    print(f"  {stage:<36s} {elapsed:9.3f}s")
+    return value
+
+
+def _render_and_close(plot_func: Callable, *args) -> Any:
+    value = plot_func(*args)
+    plt.close("all")
+    return value
+
+
+def benchmark_size(n_rows: int, data_dir: str, skip_charts: bool = False) -> List[Dict[str, Any]]:
+    """对单个数据规模运行全部阶段"""
+    results: List[Dict[str, Any]] = []
+    csv_path = os.path.join(data_dir, f"all_sequence_BENCH{n_rows}_merged.csv")
+    print(f"\n== {n_rows} 行 ==")
+    if not os.path.exists(csv_path):
+        _timed(results, "生成合成数据(不计入流水线)", n_rows, 0, write_sequence_csv, csv_path, n_rows)
+
+    df = _timed(results, "CSV解析", n_rows, 0, pd.read_csv, csv_path)
+    related = _timed(results, "get_navigation_related_row", n_rows, 0, get_navigation_related_row, df)
+    poi_info_list = _timed(results, "extract_poi_from_navigation_related_row", n_rows, 0,
+                           extract_poi_from_navigation_related_row, related)
+    n_trips = len(poi_info_list)
+    # 提取阶段完成后才知道行程数，补写到前面各阶段
+    for row in results:
+        if row["trips"] == 0 and row["stage"] != "生成合成数据(不计入流水线)":
+            row["trips"] = n_trips
+            row["trips_per_s"] = round(n_trips / row["elapsed_s"], 1) if row["elapsed_s"] > 0 and n_trips else None
+
+    def build_navi():
+        navi = navi_info(poi_info_list, vin=f"BENCH{n_rows}", prefetch_anchors=True)
+        navi.home, navi.workplace  # 等待后台锚点推断完成
+        return navi
+    navi = _timed(results, "navi_info构建(锚点推断)", n_rows, n_trips, build_navi)
+    nav_data = navi.trip_table
+    _timed(results, "特征标签计算", n_rows, n_trips, get_target_info, navi, "user_basic_feature_label")
+
+    def build_kg():
+        kg = NavigationKnowledgeGraph(user_id=navi.vin)
+        kg.build_from_json_info(nav_data)
+        return kg
+    _timed(results, "知识图谱构建", n_rows, n_trips, build_kg)
+
+    if not skip_charts and nav_data:
+        _timed(results, "图表渲染(路线时间线)", n_rows, n_trips, _render_and_close, plot_route_timeline, nav_data)
+        _timed(results, "图表渲染(起点-终点热力图)", n_rows, n_trips, _render_and_close,
+               plot_origin_destination_heatmap, nav_data)
+        _timed(results, "图表渲染(目的地时间热力图)", n_rows, n_trips, _render_and_close,
+               plot_destination_time_heatmap, nav_data)
+        _timed(results, "图表渲染(目的地类型饼图)", n_rows, n_trips, _render_and_close,
+               plot_destination_type_pie, nav_data)
+        _timed(results, "图表渲染(每日导航地图)", n_rows, n_trips, create_daily_navigation_maps, nav_data)
+
+    pipeline = [r for r in results if r["stage"] != "生成合成数据(不计入流水线)"]
+    total = sum(r["elapsed_s"] for r in pipeline)
+    results.append({
+        "rows": n_rows,
+        "stage": "流水线合计",
+        "elapsed_s": round(total, 4),
+        "rows_per_s": round(n_rows / total, 1) if total > 0 else None,
+        "trips": n_trips,
+        "trips_per_s": round(n_trips / total, 1) if total > 0 and n_trips else None,
+    })
+    print(f"  {'流水线合计':<36s} {total:9.3f}s  ({n_trips} 段行程)")
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="导航流水线端到端基准测试")
+    parser.add_argument("--rows", type=int, nargs="+", default=DEFAULT_ROWS,
+                        help="数据规模（行数），可指定多个，如 10000 100000 1000000")
+    parser.add_argument("--data-dir", default=None, help="合成CSV存放目录，默认使用临时目录（已存在的文件会复用）")
+    parser.add_argument("--skip-charts", action="store_true", help="跳过图表渲染阶段")
+    parser.add_argument("-o", "--output", default=None, help="结果JSON输出路径")
+    args = parser.parse_args()
+
+    replaced = install_stand_ins()
+    print(f"已安装LLM/高德替身（{replaced} 处绑定）")
+
+    data_dir = args.data_dir or tempfile.mkdtemp(prefix="navi_bench_")
+    os.makedirs(data_dir, exist_ok=True)
+    all_results = []
+    for n_rows in args.rows:
+        all_results.extend(benchmark_size(n_rows, data_dir, args.skip_charts))
+
+    print("\n吞吐汇总:")
+    print(pd.DataFrame(all_results).to_string(index=False))
+    coverage = poi_rule_classifier.coverage_stats()
+    print(f"\nPOI规则分类覆盖率: {coverage['resolved']}/{coverage['checked']} ({coverage['coverage']:.1%})，其余交给词典/LLM")
+    print("\n子阶段统计（perf_recorder）:")
+    print(perf_recorder.to_dataframe().to_string(index=False))
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump({"results": all_results, "perf_stats": perf_recorder.get_stats(),
+                       "poi_rule_coverage": coverage},
+                      f, ensure_ascii=False, indent=2)
+        print(f"\n结果已写入 {args.output}")
+
+
+if __name__ == "__main__":
+    main()
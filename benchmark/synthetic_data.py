@@ -0,0 +1,269 @@
+# demo/benchmark/synthetic_data.py
+"""
+合成车机埋点序列数据（all_sequence_<VIN>_merged.csv 格式）
+
+按"出行"生成数据：每段出行以 X_Map_008_0002（发起导航，json_all 含 poi_name，
+status_json 含 Vehicle.Travel.OneMap.Navi.DestinationPosition）开始，
+中间夹杂导航相关/无关的埋点行，以 X_Map_009_0006（导航结束）结束，
+出行之间再插入若干无关行。出行时间按"早通勤-晚通勤-晚间活动"的日程排布，
+周末改为休闲目的地，便于特征标签产生有意义的结果。
+
+各类payload预先渲染后按下标取用（真实数据中同一目的地的payload也大量重复），
+按块向量化生成，可在合理时间内写出 1万~1000万 行的CSV。
+
+用法:
+    python -m benchmark.synthetic_data 1000000 -o data/all_sequence_SYN0000001_merged.csv
+"""
+import argparse
+import json
+import os
+from typing import Iterator, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+# 行类型
+KIND_OTHER = 0       # 与导航无关的埋点（媒体、空调等）
+KIND_NAVI_START = 1  # 发起导航 X_Map_008_0002
+KIND_NAVI_END = 2    # 导航结束 X_Map_009_0006
+KIND_NAVI_MID = 3    # 导航过程中的onemap埋点
+KIND_VOICE_NAVI = 4  # 语音导航指令
+
+NAVI_START_KEY = "X_Map_008_0002"
+NAVI_END_KEY = "X_Map_009_0006"
+DESTINATION_SIGNAL = "Vehicle.Travel.OneMap.Navi.DestinationPosition"
+ONEMAP_APP = "com.autonavi.onemap"
+
+SEQUENCE_COLUMNS = [
+    "vin", "event_key", "app_source", "voice_dc", "json_all", "status_json", "format_time_ms"
+]
+
+# 默认POI目录：(名称, 类型, 经度, 纬度)，前两项分别作为居住地和工作地
+DEFAULT_POI_CATALOG: List[Tuple[str, str, float, float]] = [
+    ("金地西郊风华", "住宅区", 121.370007, 31.192397),
+    ("漕河泾开发区科技绿洲", "办公园区", 121.403874, 31.174885),
+    ("万达广场(七宝店)", "购物中心", 121.350522, 31.160065),
+    ("上海虹桥站", "交通枢纽", 121.320152, 31.193925),
+    ("复旦大学附属中山医院", "医院", 121.454183, 31.200524),
+    ("世纪公园", "公园", 121.551734, 31.219631),
+    ("星巴克(徐家汇店)", "餐饮", 121.437582, 31.195366),
+    ("宜家家居(徐汇店)", "家居卖场", 121.434522, 31.166510),
+    ("上海体育场", "体育场馆", 121.441251, 31.183032),
+    ("虹桥天地停车场", "停车场", 121.318760, 31.192850),
+    ("七宝实验小学", "学校", 121.347030, 31.156950),
+    ("盒马鲜生(虹桥店)", "超市", 121.394530, 31.199080),
+]
+
+_OTHER_JSON_POOL = [
+    {"event": "media_play", "data": {"source": "qqmusic", "song": "晴天", "duration": 269}},
+    {"event": "hvac_adjust", "data": {"zone": "driver", "temperature": 24.5}},
+    {"event": "phone_call", "data": {"direction": "incoming", "contact_hash": "a91f"}},
+    {"event": "seat_heat", "data": {"level": 2}},
+    {"event": "app_open", "data": {"package": "com.tencent.wechat", "screen": "main"}},
+]
+_OTHER_APPS = np.array(["com.tencent.qqmusic", "com.car.hvac", "com.car.phone", None, None], dtype=object)
+_OTHER_VOICE = np.array([
+    None, None, None,
+    str([{"domain": "music", "command": "media/play"}]),
+    str([{"domain": "hvac", "command": "climate/set"}]),
+], dtype=object)
+_VOICE_NAVI = str([{"domain": "navigation", "command": "global/navigation"}])
+
+
+def _status_json(destination: Optional[Tuple[float, float]], speed: float) -> str:
+    """生成status_json：信号列表，DestinationPosition的value为JSON字符串（无目的地时为空串）"""
+    value = ""
+    if destination is not None:
+        value = json.dumps({"longitude": destination[0], "latitude": destination[1]})
+    signals = [
+        {"name": "Vehicle.Speed", "value": f"{speed:.1f}"},
+        {"name": "Vehicle.Powertrain.Battery.SOC", "value": "76"},
+        {"name": "Vehicle.Cabin.HVAC.Temperature", "value": "24.5"},
+        {"name": "Vehicle.Travel.OneMap.Navi.Status", "value": "1" if destination else "0"},
+        {"name": DESTINATION_SIGNAL, "value": value},
+        {"name": "Vehicle.Body.Lights.Beam.Low", "value": "false"},
+    ]
+    return json.dumps(signals, ensure_ascii=False)
+
+
+class SequenceGenerator:
+    """合成序列数据生成器"""
+
+    def __init__(self,
+                 vin: str = "SYN0000001",
+                 seed: int = 42,
+                 start_date: str = "2025-06-02",
+                 poi_catalog: Optional[List[Tuple[str, str, float, float]]] = None,
+                 mid_rows: Tuple[int, int] = (5, 40),
+                 gap_rows: Tuple[int, int] = (3, 30)):
+        """
+        参数:
+            vin: 车辆VIN
+            seed: 随机种子（相同参数生成相同数据）
+            start_date: 第一天的日期
+            poi_catalog: POI目录 [(名称, 类型, 经度, 纬度)]，前两项为居住地、工作地
+            mid_rows: 每段出行中间埋点行数范围 [min, max)
+            gap_rows: 出行之间无关埋点行数范围 [min, max)
+        """
+        self.vin = vin
+        self.rng = np.random.default_rng(seed)
+        self.start_ms = int(pd.Timestamp(start_date).value // 1_000_000)
+        self.poi_catalog = poi_catalog or DEFAULT_POI_CATALOG
+        self.mid_rows = mid_rows
+        self.gap_rows = gap_rows
+        self._trip_index = 0  # 已生成的出行数（跨块连续）
+
+        # 预渲染payload
+        self._start_json = np.array([
+            json.dumps({"event": "navi_start",
+                        "data": {"route": {"strategy": "fastest",
+                                           "dest": {"poi_name": name, "poi_type": poi_type}}}},
+                       ensure_ascii=False)
+            for name, poi_type, _, _ in self.poi_catalog
+        ], dtype=object)
+        self._start_status = np.array([
+            _status_json((lng, lat), 0.0) for _, _, lng, lat in self.poi_catalog
+        ], dtype=object)
+        self._end_json = json.dumps({"event": "navi_end", "data": {"reason": "arrived"}})
+        self._mid_json = json.dumps({"event": "navi_guide", "data": {"tbt": {"road": "中环路", "distance": 800}}},
+                                    ensure_ascii=False)
+        self._moving_status = _status_json(None, 42.0)
+        self._parked_status = _status_json(None, 0.0)
+        self._other_json = np.array([json.dumps(p, ensure_ascii=False) for p in _OTHER_JSON_POOL], dtype=object)
+
+    def _schedule(self, n_trips: int) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """为接下来的n_trips段出行安排 (目的地下标, 出发时间ms, 行程时长ms)"""
+        trip_ids = self._trip_index + np.arange(n_trips)
+        day = trip_ids // 3
+        slot = trip_ids % 3
+        weekday = (pd.Timestamp(self.start_ms, unit="ms").weekday() + day) % 7
+        is_weekend = weekday >= 5
+
+        # 工作日：08点去公司、18点去其它地点、20点半回家；周末：10点/15点去休闲地点、19点回家
+        base_hour = np.where(is_weekend,
+                             np.choose(slot, [10.0, 15.0, 19.0]),
+                             np.choose(slot, [8.0, 18.0, 20.5]))
+        jitter_min = self.rng.normal(0, 15, size=n_trips).clip(-40, 40)
+        depart_ms = self.start_ms + day * 86_400_000 + ((base_hour * 60 + jitter_min) * 60_000).astype(np.int64)
+
+        n_poi = len(self.poi_catalog)
+        other_poi = self.rng.integers(2, n_poi, size=n_trips)
+        poi_idx = np.where(slot == 2, 0, np.where((slot == 0) & ~is_weekend, 1, other_poi))
+        duration_ms = self.rng.integers(15, 70, size=n_trips) * 60_000
+        self._trip_index += n_trips
+        return poi_idx, depart_ms, duration_ms
+
+    def generate_chunk(self, n_trips: int) -> pd.DataFrame:
+        """生成n_trips段出行（含出行间的无关行）对应的DataFrame"""
+        poi_idx, depart_ms, duration_ms = self._schedule(n_trips)
+        mids = self.rng.integers(self.mid_rows[0], self.mid_rows[1], size=n_trips)
+        gaps = self.rng.integers(self.gap_rows[0], self.gap_rows[1], size=n_trips)
+        lengths = 2 + mids + gaps
+        total = int(lengths.sum())
+        trip_of_row = np.repeat(np.arange(n_trips), lengths)
+        offsets = np.arange(total) - np.repeat(np.cumsum(lengths) - lengths, lengths)
+        row_mid = mids[trip_of_row]
+
+        # 行类型：0=发起导航，1..mid=行程中，mid+1=导航结束，其后为出行间隙
+        kinds = np.full(total, KIND_OTHER, dtype=np.int8)
+        in_trip = (offsets >= 1) & (offsets <= row_mid)
+        mid_kind = self.rng.choice([KIND_NAVI_MID, KIND_OTHER, KIND_VOICE_NAVI], size=total, p=[0.5, 0.45, 0.05])
+        kinds[in_trip] = mid_kind[in_trip]
+        kinds[offsets == 0] = KIND_NAVI_START
+        kinds[offsets == row_mid + 1] = KIND_NAVI_END
+
+        # 时间：行程中的行均匀分布在[出发, 到达]之间，间隙行在到达后每10秒一行
+        trip_duration = duration_ms[trip_of_row]
+        time_ms = np.where(
+            offsets <= row_mid + 1,
+            depart_ms[trip_of_row] + offsets * trip_duration // (row_mid + 1),
+            depart_ms[trip_of_row] + trip_duration + (offsets - row_mid - 1) * 10_000,
+        )
+
+        other_pick = self.rng.integers(0, len(self._other_json), size=total)
+        json_all = self._other_json[other_pick]
+        app_source = _OTHER_APPS[other_pick]
+        voice_dc = _OTHER_VOICE[other_pick]
+        status_json = np.where(offsets > row_mid + 1, self._parked_status, self._moving_status).astype(object)
+        event_key = np.array(["X_Media_001_0001", "X_Hvac_002_0003", "X_Phone_003_0001",
+                              "X_Seat_004_0002", "X_App_005_0001"], dtype=object)[other_pick]
+
+        start_mask = kinds == KIND_NAVI_START
+        json_all[start_mask] = self._start_json[poi_idx[trip_of_row[start_mask]]]
+        status_json[start_mask] = self._start_status[poi_idx[trip_of_row[start_mask]]]
+        event_key[start_mask] = NAVI_START_KEY
+        end_mask = kinds == KIND_NAVI_END
+        json_all[end_mask] = self._end_json
+        event_key[end_mask] = NAVI_END_KEY
+        mid_mask = kinds == KIND_NAVI_MID
+        json_all[mid_mask] = self._mid_json
+        event_key[mid_mask] = "X_Map_010_0001"
+        navi_mask = start_mask | end_mask | mid_mask
+        app_source[navi_mask] = ONEMAP_APP
+        voice_dc[navi_mask] = None
+        voice_mask = kinds == KIND_VOICE_NAVI
+        voice_dc[voice_mask] = _VOICE_NAVI
+        app_source[voice_mask] = "com.car.voice"
+        event_key[voice_mask] = "X_Voice_006_0001"
+
+        format_time_ms = pd.to_datetime(time_ms, unit="ms").strftime("%Y-%m-%d %H:%M:%S.%f").str[:-3]
+        return pd.DataFrame({
+            "vin": self.vin,
+            "event_key": event_key,
+            "app_source": app_source,
+            "voice_dc": voice_dc,
+            "json_all": json_all,
+            "status_json": status_json,
+            "format_time_ms": np.asarray(format_time_ms, dtype=object),
+        }, columns=SEQUENCE_COLUMNS)
+
+    def iter_chunks(self, n_rows: int, chunk_rows: int = 200_000) -> Iterator[pd.DataFrame]:
+        """按块生成共n_rows行数据（最后一块截断到精确行数）"""
+        avg_trip_rows = 2 + sum(self.mid_rows) / 2 + sum(self.gap_rows) / 2
+        remaining = n_rows
+        while remaining > 0:
+            n_trips = max(1, int(min(chunk_rows, remaining) / avg_trip_rows) + 1)
+            chunk = self.generate_chunk(n_trips)
+            if len(chunk) > remaining:
+                chunk = chunk.iloc[:remaining]
+            remaining -= len(chunk)
+            yield chunk
+
+
+def generate_sequence_df(n_rows: int, vin: str = "SYN0000001", seed: int = 42, **kwargs) -> pd.DataFrame:
+    """在内存中生成n_rows行序列数据"""
+    generator = SequenceGenerator(vin=vin, seed=seed, **kwargs)
+    return pd.concat(list(generator.iter_chunks(n_rows)), ignore_index=True)
+
+
+def write_sequence_csv(path: str, n_rows: int, vin: str = "SYN0000001", seed: int = 42,
+                       chunk_rows: int = 200_000, **kwargs) -> str:
+    """
+    分块写出n_rows行序列CSV（内存占用与总行数无关）
+
+    返回:
+        写出的文件路径
+    """
+    save_dir = os.path.dirname(path)
+    if save_dir:
+        os.makedirs(save_dir, exist_ok=True)
+    generator = SequenceGenerator(vin=vin, seed=seed, **kwargs)
+    for i, chunk in enumerate(generator.iter_chunks(n_rows, chunk_rows)):
+        chunk.to_csv(path, mode="w" if i == 0 else "a", header=(i == 0), index=False)
+    return path
+
+
+def main():
+    parser = argparse.ArgumentParser(description="生成合成车机埋点序列CSV")
+    parser.add_argument("rows", type=int, help="行数（1万~1000万）")
+    parser.add_argument("-o", "--output", default=None, help="输出路径，默认 data/all_sequence_<VIN>_merged.csv")
+    parser.add_argument("--vin", default="SYN0000001")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+    output = args.output or os.path.join("data", f"all_sequence_{args.vin}_merged.csv")
+    write_sequence_csv(output, args.rows, vin=args.vin, seed=args.seed)
+    print(f"已生成 {args.rows} 行数据: {output}")
+
+
+if __name__ == "__main__":
+    main()
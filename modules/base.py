@@ -48,15 +48,17 @@ class BaseModule(ABC):
         self.width = width
         self.data: Optional[pd.DataFrame] = None
         self.filename: Optional[str] = None  # 关联的文件名
+        self.fingerprint: Optional[str] = None  # 上传文件内容的指纹，用作计算结果的缓存键
         self.background_color: Optional[str] = None
         self.border: bool = True
         self.height: Optional[int] = None
         self.logger = setup_logger()
     
-    def set_data(self, data: pd.DataFrame, filename: Optional[str] = None) -> None:
-        """设置模块数据并关联文件名"""
+    def set_data(self, data: pd.DataFrame, filename: Optional[str] = None, fingerprint: Optional[str] = None) -> None:
+        """设置模块数据并关联文件名和文件指纹"""
         self.data = data
         self.filename = filename
+        self.fingerprint = fingerprint
         self.process_data()  # 数据更新后自动处理
     
     def _get_cache_key(self, content_name: str) -> str:
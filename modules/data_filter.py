@@ -2,6 +2,8 @@ import streamlit as st
 import pandas as pd
 import numpy as np
 from .base import BaseModule
+from utils.cache_utils import dataframe_fingerprint
+from utils.frame_index import get_frame_index
 
 class DataFilterModule(BaseModule):
     """数据筛选模块"""
@@ -11,7 +13,9 @@ class DataFilterModule(BaseModule):
             title="数据筛选",
             description="根据条件筛选数据",** kwargs
         )
-        self.filtered_data = None
+        self.filtered_positions = None  # 筛选结果的行位置
+        self.max_choice_values = 200  # 不同取值不超过该数量的列用多选筛选，否则用关键字筛选
+        self.page_sizes = [50, 100, 500, 1000]
         
     def process_data(self) -> None:
         """处理数据筛选"""
@@ -25,6 +29,8 @@ class DataFilterModule(BaseModule):
         st.write("### 数据筛选器")
         st.caption("根据条件筛选数据，支持多维度组合筛选")
         
+        frame_index = self._get_frame_index()
+        
         # 使用折叠面板收纳筛选条件
         with st.expander("筛选条件设置", expanded=True):
             # 支持多列筛选
@@ -40,37 +46,57 @@ class DataFilterModule(BaseModule):
                 st.write(f"#### 筛选：{col}")
                 
                 if pd.api.types.is_numeric_dtype(col_data):
-                    min_val = float(col_data.min())
-                    max_val = float(col_data.max())
+                    # 范围条件走排序索引，最值直接取索引两端
+                    sorted_index = frame_index.sorted_index(col)
+                    if sorted_index.min is None:
+                        st.caption("该列没有有效数值")
+                        continue
+                    min_val, max_val = sorted_index.min, sorted_index.max
+                    if min_val == max_val:
+                        st.caption(f"该列只有一个取值：{min_val}")
+                        continue
                     val_range = st.slider(
                         f"{col}的范围",
                         min_val, max_val, (min_val, max_val)
                     )
                     filters.append((col, "range", val_range))
-                    
-                # 其他类型处理...
+                else:
+                    # 分类/文本条件走倒排索引：取值不多时按取值多选，否则按关键字包含筛选
+                    inverted_index = frame_index.inverted_index(col)
+                    if len(inverted_index) <= self.max_choice_values:
+                        selected = st.multiselect(f"{col}的取值", inverted_index.categories.tolist())
+                        if selected:
+                            filters.append((col, "in", selected))
+                    else:
+                        keyword = st.text_input(f"{col}包含的文字（{len(inverted_index)} 个不同取值）")
+                        if keyword:
+                            filters.append((col, "contains", keyword))
         
         # 应用筛选
         if filters:
-            self.filtered_data = self.data.copy()
-            for col, filter_type, value in filters:
-                if filter_type == "range":
-                    self.filtered_data = self.filtered_data[
-                        (self.filtered_data[col] >= value[0]) & 
-                        (self.filtered_data[col] <= value[1])
-                    ]
+            positions = frame_index.query(filters)
+            self.filtered_positions = positions  # 结果只按页取用，不再复制整个筛选结果
             
-            # 筛选结果展示
-            st.success(f"筛选完成：{len(self.filtered_data)} 行数据（原始：{len(self.data)}行）")
-            st.dataframe(self.filtered_data, use_container_width=True)
+            # 筛选结果展示（服务端分页，只把当前页发给前端）
+            st.success(f"筛选完成：{len(positions)} 行数据（原始：{len(self.data)}行）")
+            col_size, col_page = st.columns(2)
+            with col_size:
+                page_size = st.selectbox("每页行数", self.page_sizes, index=1)
+            page_count = max((len(positions) + page_size - 1) // page_size, 1)
+            with col_page:
+                page = st.number_input(f"页码（共 {page_count} 页）", min_value=1, max_value=page_count, value=1, step=1)
+            st.dataframe(frame_index.page(positions, int(page), page_size), use_container_width=True)
             
-            # 下载按钮美化
-            csv = self.filtered_data.to_csv(index=False)
+            # 下载按钮美化（点击时才分块生成CSV）
             st.download_button(
                 label="📥 下载筛选后的数据",
-                data=csv,
+                data=lambda: frame_index.export_csv(positions),
                 file_name="filtered_data.csv",
                 mime="text/csv",
                 use_container_width=True
             )
-        
\ No newline at end of file
+    
+    def _get_frame_index(self):
+        """当前文件的筛选索引（按文件指纹复用）"""
+        fingerprint = self.fingerprint or dataframe_fingerprint(self.data)
+        return get_frame_index(fingerprint, self.data)
@@ -1,5 +1,5 @@
 import streamlit as st
-from typing import Optional
+from typing import Optional, Dict, Any
 from .base import BaseModule
 import pandas as pd
 class DataOverviewModule(BaseModule):
@@ -10,27 +10,59 @@ class DataOverviewModule(BaseModule):
             title="数据概览",
             description="展示数据集的基本信息和前几行数据",** kwargs
         )
+        self.preview: Optional[Dict[str, Any]] = None  # 完整解析前的快速预览（utils.csv_preview.preview_csv的结果）
+        
+    def set_preview(self, preview: Dict[str, Any]) -> None:
+        """设置快速预览，完整数据到达前先用它渲染概览"""
+        self.preview = preview
         
     def process_data(self) -> None:
         """处理数据，获取基本信息"""
         if self.data is None:
+            if self.preview is None:
+                return
+            # 只有快速预览：行数来自换行计数，列类型来自抽样推断
+            self.output = {
+                "shape": (self.preview["row_count"], len(self.preview["columns"])),
+                "columns": self.preview["columns"],
+                "dtypes": self.preview["dtypes"],
+                "head": self.preview["head"],
+                "is_preview": True,
+            }
             return
             
         self.output = {
             "shape": self.data.shape,
             "columns": self.data.columns.tolist(),
             "dtypes": self.data.dtypes.astype(str).to_dict(),
-            "head": self.data.head()
+            "head": self.data.head(),
+            "is_preview": False,
         }
     
+    def render(self) -> None:
+        """完整数据未到达时用快速预览渲染"""
+        if self.data is None and self.preview is not None:
+            self.process_data()
+            with st.expander(self.title, expanded=True):
+                st.write(self.description)
+                self.render_output()
+            return
+        super().render()
+    
     def render_output(self) -> None:
         if not self.output:
             return
             
+        if self.output.get("is_preview"):
+            exact = self.preview["row_count_exact"]
+            st.caption(f"快速预览：基于前{len(self.output['head'])}行和{self.preview['sample_size']}行抽样推断列类型，"
+                       f"{'行数精确' if exact else '行数按换行符估算'}，完整数据解析中...")
+            
         # 顶部关键信息卡片
         col1, col2, col3 = st.columns(3)
         with col1:
-            st.metric("总行数", self.output['shape'][0])
+            row_count_exact = not self.output.get("is_preview") or self.preview["row_count_exact"]
+            st.metric("总行数" if row_count_exact else "总行数（约）", self.output['shape'][0])
         with col2:
             st.metric("总列数", self.output['shape'][1])
         with col3:
@@ -55,4 +87,3 @@ class DataOverviewModule(BaseModule):
                 columns=['列名', '数据类型']
             )
             st.dataframe(cols_info, use_container_width=True, hide_index=True)
-    
\ No newline at end of file
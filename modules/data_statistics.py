@@ -2,6 +2,8 @@ import streamlit as st
 import pandas as pd
 import numpy as np
 from .base import BaseModule
+from utils.cache_utils import dataframe_fingerprint
+from utils.streaming_stats import get_frame_stats
 
 class DataStatisticsModule(BaseModule):
     """数据统计分析模块"""
@@ -11,15 +13,18 @@ class DataStatisticsModule(BaseModule):
             title="数据统计分析",
             description="展示数值型列的统计信息",** kwargs
         )
+        self.stats = None
         
     def process_data(self) -> None:
-        """处理数据，计算统计信息"""
+        """处理数据，计算统计信息（按文件指纹缓存，同一文件只扫描一次）"""
         if self.data is None:
             return
             
+        fingerprint = self.fingerprint or dataframe_fingerprint(self.data)
+        self.stats = get_frame_stats(fingerprint, self.data)
         # 只对数值型列进行统计
-        numeric_cols = self.data.select_dtypes(include=[np.number]).columns
-        self.output = self.data[numeric_cols].describe()
+        describe = self.stats.describe()
+        self.output = describe if not describe.empty else None
     
     def render_output(self) -> None:
         """渲染统计信息"""
@@ -28,14 +33,9 @@ class DataStatisticsModule(BaseModule):
             return
             
         st.dataframe(self.output)
+        st.caption("分位数（25%/50%/75%）为近似值")
         
         # 显示缺失值情况
         st.subheader("缺失值统计")
-        missing_values = self.data.isnull().sum()
-        missing_percentage = (missing_values / len(self.data)) * 100
-        missing_df = pd.DataFrame({
-            '缺失值数量': missing_values,
-            '缺失值比例(%)': missing_percentage
-        })
+        missing_df = self.stats.missing()
         st.dataframe(missing_df[missing_df['缺失值数量'] > 0])
-    
\ No newline at end of file
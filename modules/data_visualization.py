@@ -3,7 +3,11 @@ import pandas as pd
 import numpy as np
 import matplotlib.pyplot as plt
 import seaborn as sns
+from matplotlib.colors import LogNorm
 from .base import BaseModule
+from utils.cache_utils import dataframe_fingerprint
+from utils.correlation import get_correlation
+from utils.chart_aggregates import finite_values, histogram, sampled_kde, density_2d, box_stats, cached_aggregate
 
 # 设置中文字体
 plt.rcParams["font.family"] = ["Heiti TC"]
@@ -51,23 +55,109 @@ class DataVisualizationModule(BaseModule):
                 configs["col_x"] = st.selectbox("X轴", numeric_cols)
                 configs["col_y"] = st.selectbox("Y轴", numeric_cols, 
                                             index=1 if len(numeric_cols) > 1 else 0)
+                configs["bins"] = st.slider("密度分箱数量", 20, 200, 100)
             elif chart_type == "箱线图":
                 configs["col"] = st.selectbox("选择列", numeric_cols)
+            elif chart_type == "相关性热力图":
+                if len(numeric_cols) > 2:
+                    configs["top_k"] = st.slider("展示方差最大的列数", 2, min(len(numeric_cols), 30),
+                                                 min(len(numeric_cols), 10))
+                else:
+                    configs["top_k"] = len(numeric_cols)
         
         with col2:
             st.write(f"### {chart_type} 展示")
+            # 图表只绘制服务端聚合好的结果，绘图开销与行数无关
+            fingerprint = self.fingerprint or dataframe_fingerprint(self.data)
+            fig = None
             if chart_type == "直方图":
+                col, bins = configs["col"], configs["bins"]
+                hist, kde = cached_aggregate(
+                    (fingerprint, "直方图", col, bins),
+                    lambda: self._histogram_with_kde(finite_values(self.data[col]), bins)
+                )
                 fig, ax = plt.subplots(figsize=(10, 6))
-                sns.histplot(data=self.data, x=configs["col"], bins=configs["bins"], kde=True)
+                ax.stairs(hist["counts"], hist["edges"], fill=True, alpha=0.6)
+                if kde is not None:
+                    ax.plot(kde["x"], kde["y"], linewidth=2)
                 ax.set_title(f"{configs['col']}的分布", fontsize=14, pad=20)
                 ax.set_xlabel(configs["col"], fontsize=12)
                 ax.set_ylabel("频数", fontsize=12)
                 st.pyplot(fig)
+            elif chart_type == "散点图":
+                col_x, col_y, bins = configs["col_x"], configs["col_y"], configs["bins"]
+                density = cached_aggregate(
+                    (fingerprint, "散点图", col_x, col_y, bins),
+                    lambda: self._density(col_x, col_y, bins)
+                )
+                fig, ax = plt.subplots(figsize=(10, 6))
+                if density is None:
+                    st.info("所选列没有同时有效的数值")
+                else:
+                    # 大数据量下用二维密度代替逐点散点，颜色表示该格内的点数
+                    counts = np.ma.masked_equal(density["counts"].T, 0)
+                    mesh = ax.pcolormesh(density["x_edges"], density["y_edges"], counts,
+                                         norm=LogNorm() if counts.count() else None, cmap="viridis")
+                    fig.colorbar(mesh, ax=ax, label="点数")
+                    ax.set_title(f"{col_x} 与 {col_y} 的密度散点图", fontsize=14, pad=20)
+                    ax.set_xlabel(col_x, fontsize=12)
+                    ax.set_ylabel(col_y, fontsize=12)
+                    st.pyplot(fig)
+            elif chart_type == "箱线图":
+                col = configs["col"]
+                stats = cached_aggregate(
+                    (fingerprint, "箱线图", col),
+                    lambda: self._box_stats(col)
+                )
+                fig, ax = plt.subplots(figsize=(10, 6))
+                if stats is None:
+                    st.info("所选列没有有效数值")
+                else:
+                    ax.bxp([stats], showfliers=True)
+                    ax.set_title(f"{col}的箱线图（离群点 {stats['outlier_count']} 个，最多显示抽样的部分）",
+                                 fontsize=14, pad=20)
+                    st.pyplot(fig)
+            elif chart_type == "相关性热力图":
+                # 相关系数矩阵按文件指纹缓存，切换展示列数不会重新计算
+                accumulator = get_correlation(fingerprint, self.data)
+                columns = accumulator.top_variable_columns(configs["top_k"])
+                if len(columns) < 2:
+                    st.info("至少需要两列有变化的数值型数据")
+                else:
+                    corr = accumulator.correlation(columns)
+                    fig, ax = plt.subplots(figsize=(10, 8))
+                    sns.heatmap(corr, ax=ax, vmin=-1, vmax=1, cmap="coolwarm", square=True,
+                                annot=len(columns) <= 15, fmt=".2f")
+                    ax.set_title("数值列相关性热力图", fontsize=14, pad=20)
+                    st.pyplot(fig)
+            if fig is not None:
+                plt.close(fig)
                 
             # 其他图表类型类似处理...
             # 添加图表说明
             st.caption("提示：点击图表可放大查看，双击可重置")
         
+    @staticmethod
+    def _histogram_with_kde(values: np.ndarray, bins: int):
+        """直方图计数 + 抽样KDE（频数尺度）"""
+        if len(values) == 0:
+            return {"counts": np.zeros(bins), "edges": np.linspace(0, 1, bins + 1)}, None
+        hist = histogram(values, bins)
+        return hist, sampled_kde(values, hist["edges"])
+    
+    def _density(self, col_x: str, col_y: str, bins: int):
+        """散点图的二维分箱计数，只使用两列同时有效的行"""
+        x = pd.to_numeric(self.data[col_x], errors="coerce").to_numpy(dtype=np.float64, na_value=np.nan)
+        y = pd.to_numeric(self.data[col_y], errors="coerce").to_numpy(dtype=np.float64, na_value=np.nan)
+        valid = np.isfinite(x) & np.isfinite(y)
+        if not valid.any():
+            return None
+        return density_2d(x[valid], y[valid], bins)
+    
+    def _box_stats(self, col: str):
+        values = finite_values(self.data[col])
+        return box_stats(values, col) if len(values) else None
+        
     def process_data(self) -> None:
         """准备可视化所需数据"""
         # 可视化不需要预处理，直接在渲染时处理
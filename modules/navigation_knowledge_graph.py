@@ -4,6 +4,7 @@ from io import BytesIO
 from .base import BaseModule
 from utils.cache_utils import cache_navigation_info
 from Handle_csv.scenario.navigation.knowledge_graph import NavigationKnowledgeGraph
+from utils.perf import perf_recorder
 
 class NavigationKnowledgeGraphModule(BaseModule):
     """导航知识图谱可视化与预测模块"""
@@ -26,8 +27,8 @@ class NavigationKnowledgeGraphModule(BaseModule):
         
         try:
             # 获取导航信息（复用现有缓存逻辑）
-            self.navi_info = cache_navigation_info(self.data)
-            self.nav_data = self.navi_info.Get_json_info()['poi_info_list']
+            self.navi_info = cache_navigation_info(self.data, self.fingerprint)
+            self.nav_data = self.navi_info.trip_table
             
             # 构建知识图谱
             self.kg = NavigationKnowledgeGraph(user_id="current_user")
@@ -37,7 +38,8 @@ class NavigationKnowledgeGraphModule(BaseModule):
             self.prediction_features = self.kg.get_prediction_features()
             
             # 生成可视化
-            self.visualization_buf = self.kg.generate_visualization()
+            with perf_recorder.span("图表渲染(知识图谱)", size=self.kg.graph.number_of_nodes()):
+                self.visualization_buf = self.kg.generate_visualization()
             
             self.logger.info("导航知识图谱构建成功")
         except Exception as e:
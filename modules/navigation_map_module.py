@@ -3,16 +3,12 @@ import streamlit as st
 import folium
 from streamlit_folium import st_folium
 from .base import BaseModule
-from utils.cache_utils import cache_navigation_info
-from Handle_csv.scenario.navigation.interactive_maps import create_daily_navigation_maps
-import time
+from utils.cache_utils import cache_navigation_info, dataframe_fingerprint
+from utils.job_panel import render_job_panel
+from utils.job_queue import JOB_DONE
 
 # 移除原有logger初始化
 
-@st.cache_resource(show_spinner="正在生成导航地图...")
-def cache_daily_maps(nav_data):
-    return create_daily_navigation_maps(nav_data)
-
 class NavigationMapModule(BaseModule):
     """导航路线地图可视化模块"""
     
@@ -26,35 +22,42 @@ class NavigationMapModule(BaseModule):
         self.daily_maps = []
     
     def process_data(self) -> None:
-        """处理数据并通过缓存获取结果"""
+        """获取导航信息（使用缓存），每日地图由后台任务生成"""
         if self.data is None:
+            self.navi_info = None
             self.daily_maps = []
             return
             
         try:
-            # 计时
-            start_time = time.time()
-            self.navi_info = cache_navigation_info(self.data)
-            self.nav_data = self.navi_info.Get_json_info()['poi_info_list']
-            self.daily_maps = cache_daily_maps(self.nav_data)
-            end_time = time.time()
-            self.logger.info(f"导航地图生成耗时: {end_time - start_time:.2f}秒")  # 修改为self.logger
-            self.logger.info(f"成功加载 {len(self.daily_maps)} 张每日导航地图")  # 修改为self.logger
-            
+            self.navi_info = cache_navigation_info(self.data, self.fingerprint)
+            self.nav_data = self.navi_info.trip_table
         except KeyError as e:
             error_msg = f"导航数据格式错误，缺少关键字段: {str(e)}"
             st.error(error_msg)
             self.logger.error(error_msg, exc_info=True)  # 修改为self.logger
-            self.daily_maps = []
+            self.navi_info = None
         except Exception as e:
             error_msg = f"处理导航地图数据时出错: {str(e)}"
             st.error(error_msg)
             self.logger.error(error_msg, exc_info=True)  # 修改为self.logger
-            self.daily_maps = []
-        self.output = self.daily_maps
+            self.navi_info = None
     
     def render_output(self) -> None:
-        """渲染交互式地图"""
+        """渲染交互式地图（地图在后台任务中生成，完成后自动显示）"""
+        if self.navi_info is None:
+            st.info("没有可显示的导航地图数据，请上传包含完整导航信息的CSV文件")
+            return
+        render_job_panel(
+            "daily_maps", self.fingerprint or dataframe_fingerprint(self.data), self.navi_info,
+            "每日导航地图生成", self._render_daily_maps
+        )
+
+    def _render_daily_maps(self, snapshot: dict) -> None:
+        """展示每日地图任务的结果"""
+        if snapshot["status"] != JOB_DONE:
+            return
+        self.daily_maps = snapshot["result"] or []
+        self.output = self.daily_maps
         if not self.daily_maps:
             st.info("没有可显示的导航地图数据，请上传包含完整导航信息的CSV文件")
             return
@@ -2,7 +2,9 @@ import streamlit as st
 import pandas as pd
 import matplotlib.pyplot as plt
 from .base import BaseModule
-from utils.cache_utils import cache_navigation_info
+from utils.cache_utils import cache_navigation_info, dataframe_fingerprint
+from utils.job_panel import render_job_panel
+from utils.job_queue import JOB_DONE
 from Handle_csv.handle import get_target_info
 from Handle_csv.scenario.navigation.origin_destination_heatmap import plot_origin_destination_heatmap
 from Handle_csv.scenario.navigation.visualization import (
@@ -10,6 +12,7 @@ from Handle_csv.scenario.navigation.visualization import (
     plot_destination_type_pie
 )
 from Handle_csv.scenario.navigation.navigation_poi_time import plot_route_timeline, plot_route
+from utils.perf import perf_recorder
 
 @st.cache_resource(show_spinner="正在生成路线时间线...")
 def cache_route_timeline(navi_info):
@@ -33,9 +36,10 @@ class NavigationVisualizationModule(BaseModule):
             
         # 获取导航信息（使用缓存，避免重复计算）
         try:
-            self.navi_info = cache_navigation_info(self.data)
-            self.nav_data = self.navi_info.Get_json_info()['poi_info_list']
-            self.json_data = self.navi_info.Get_json_info()  # 保存JSON数据
+            self.navi_info = cache_navigation_info(self.data, self.fingerprint)
+            self.nav_data = self.navi_info.trip_table
+            # 直接由行程表生成JSON数据，居住地在后台推断，不在这里等待
+            self.json_data = {"vin": self.navi_info.vin, "poi_info_list": self.nav_data.to_records()}
             self.logger.info("导航数据处理成功") 
         except Exception as e:
             error_msg = f"处理导航数据时出错: {str(e)}"
@@ -46,6 +50,30 @@ class NavigationVisualizationModule(BaseModule):
             self.json_data = None
         
     
+    @staticmethod
+    def _render_route_timeline(snapshot: dict) -> None:
+        """展示路线时间线任务的结果"""
+        if snapshot["result"]:
+            st.image(snapshot["result"], use_column_width=True)
+        elif snapshot["status"] == JOB_DONE:
+            st.info("暂无路线时间线数据")
+
+    def _render_feature_labels(self, snapshot: dict, container_height: int) -> None:
+        """展示特征标签任务已得到的标签（任务进行中逐个出现）"""
+        labels_df = pd.DataFrame(
+            list(snapshot["partial_results"].items()),
+            columns=["特征", "值"]
+        )
+        with st.container(height=container_height):
+            if labels_df.empty:
+                st.info("暂无用户特征标签数据")
+            else:
+                st.dataframe(
+                    labels_df,
+                    use_container_width=True,
+                    hide_index=True
+                )
+
     def render_output(self) -> None:
         """渲染导航数据可视化结果"""
         if self.data is None or self.navi_info is None or self.nav_data is None:
@@ -58,7 +86,11 @@ class NavigationVisualizationModule(BaseModule):
         with col1:
             st.metric("目的地数量", len(self.nav_data))
         with col2:
-            st.metric("用户居住地", self.navi_info.home if self.navi_info.home else "未知")
+            # 居住地在后台推断，未完成时不阻塞页面
+            if self.navi_info.anchors_ready():
+                st.metric("用户居住地", self.navi_info.home if self.navi_info.home else "未知")
+            else:
+                st.metric("用户居住地", "推断中...")
         
         try:
             # 左侧：导航数据详情
@@ -70,25 +102,14 @@ class NavigationVisualizationModule(BaseModule):
                 with st.container(height=container_height):
                     st.json(self.json_data, expanded=False)
             
-            # 右侧：用户基本特征标签表格
+            # 右侧：用户基本特征标签表格（后台任务计算，页面不等待LLM/高德调用，面板自动刷新进度）
             with right_col:
                 st.subheader("用户基本特征标签")
-                # 使用缓存减少重复计算
-                feature_label = get_target_info(self.navi_info, 'user_basic_feature_label')
-                labels = feature_label.show_basic_feature_label()     
-                labels_df = pd.DataFrame(
-                    list(labels.items()),
-                    columns=["特征", "值"]
+                render_job_panel(
+                    "feature_labels", self.fingerprint or dataframe_fingerprint(self.data), self.navi_info,
+                    "特征标签计算",
+                    lambda snapshot: self._render_feature_labels(snapshot, container_height)
                 )
-                with st.container(height=container_height):
-                    if labels_df.empty:
-                        st.info("暂无用户特征标签数据")
-                    else:
-                        st.dataframe(
-                            labels_df,
-                            use_container_width=True,
-                            hide_index=True
-                        )
             
             # 路线时间线（使用缓存）
             st.subheader("导航数据可视化")
@@ -97,19 +118,19 @@ class NavigationVisualizationModule(BaseModule):
             with row1_col1:
                 with st.container(height=400):
                     st.subheader("路线时间线")
-                    # 使用缓存的路线时间线结果
-                    plot_buf = get_target_info(self.navi_info, 'nagivation_draw')
-                    if plot_buf:
-                        st.image(plot_buf, use_column_width=True)
-                    else:
-                        st.info("暂无路线时间线数据")
+                    # 路线时间线在后台任务中绘制，完成后自动显示
+                    render_job_panel(
+                        "route_timeline", self.fingerprint or dataframe_fingerprint(self.data), self.navi_info,
+                        "路线时间线绘制", self._render_route_timeline
+                    )
             
             with row1_col2:
                 with st.container(height=400):
                     st.subheader("起点-终点热力图")
                     grid_size = st.slider("网格大小(米)", 100, 500, 200)
                     try:
-                        df = plot_origin_destination_heatmap(self.nav_data, grid_size)
+                        with perf_recorder.span("图表渲染(起点-终点热力图)", size=len(self.nav_data)):
+                            df = plot_origin_destination_heatmap(self.nav_data, grid_size)
                         st.pyplot(plt.gcf())
                         with st.expander("查看详细数据"):
                             st.dataframe(df)
@@ -126,7 +147,8 @@ class NavigationVisualizationModule(BaseModule):
                     st.subheader("目的地与时间段热力图")
                     st.caption("展示不同时间段各目的地的访问频率")
                     try:
-                        plot_destination_time_heatmap(self.nav_data)
+                        with perf_recorder.span("图表渲染(目的地时间热力图)", size=len(self.nav_data)):
+                            plot_destination_time_heatmap(self.nav_data)
                         st.pyplot(plt.gcf())
                     except Exception as e:
                         error_msg = f"生成热力图时出错: {str(e)}"
@@ -138,7 +160,8 @@ class NavigationVisualizationModule(BaseModule):
                     st.subheader("目的地类型分布")
                     st.caption("展示不同类型目的地的占比情况")
                     try:
-                        plot_destination_type_pie(self.nav_data)
+                        with perf_recorder.span("图表渲染(目的地类型饼图)", size=len(self.nav_data)):
+                            plot_destination_type_pie(self.nav_data)
                         st.pyplot(plt.gcf())
                     except Exception as e:
                         error_msg = f"生成饼状图时出错: {str(e)}"
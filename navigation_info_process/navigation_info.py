@@ -1,14 +1,18 @@
 
 from use_GaoDe_api.geo import *
+from use_GaoDe_api.regeo_client import location_keys, regeo_client
+import numpy as np
 import pandas as pd
 class poi_info:
     def __init__(self,row):
         self.start_location=str(row['start_lon'])+','+str(row['start_lat'])
         self.end_location=str(row['end_lon'])+','+str(row['end_lat'])
         self.create_time=row['create_time']
-        #根据经纬度获取具体的地址
-        self.start_address=get_location_regeo(self.start_location)
-        self.end_address=get_location_regeo(self.end_location)
+        #根据经纬度获取具体的地址（走批量客户端的缓存，重复坐标不再请求）
+        start_key, end_key = location_keys([row['start_lon'], row['end_lon']], [row['start_lat'], row['end_lat']])
+        addresses = regeo_client.resolve([start_key, end_key])
+        self.start_address=addresses.get(start_key, '')
+        self.end_address=addresses.get(end_key, '')
 
     def show_json(self):
         print("yes")
@@ -19,13 +23,35 @@ class poi_info:
             'end_location_name':self.end_address,
             'create_time':self.create_time
         }
+
+def add_location_addresses(df):
+    """
+    批量为起终点补充地址：起终点坐标取整后统一去重，每个不同的坐标只逆地理编码一次（带缓存、并发），
+    再按坐标向量化地映射回每一行
+
+    返回:
+        新增 start_location_name / end_location_name 两列的DataFrame副本（请求失败的为空字符串）
+    """
+    df = df.copy()
+    start_keys = location_keys(df['start_lon'], df['start_lat'])
+    end_keys = location_keys(df['end_lon'], df['end_lat'])
+    addresses = regeo_client.resolve(pd.unique(np.concatenate([start_keys, end_keys])))
+    df['start_location_name'] = pd.Series(start_keys, index=df.index).map(addresses).fillna('')
+    df['end_location_name'] = pd.Series(end_keys, index=df.index).map(addresses).fillna('')
+    return df
+
 def get_poi_info_list(df):
-    poi_info_list=[]
-    for index,row in df.iterrows():
-        poi_info_list.append(poi_info(row).show_json())
-    return poi_info_list
+    df = add_location_addresses(df)
+    records = pd.DataFrame({
+        'start_location': df['start_lon'].astype(str) + ',' + df['start_lat'].astype(str),
+        'end_location': df['end_lon'].astype(str) + ',' + df['end_lat'].astype(str),
+        'start_location_name': df['start_location_name'],
+        'end_location_name': df['end_location_name'],
+        'create_time': df['create_time'],
+    })
+    return records.to_dict('records')
 
 def test_navigation_info():
     file_path='/Users/lichen18/Documents/Project/Data_mining/data/new_data/all_sequence_HLX14B172R0001061_withstartloc.csv'
     df=pd.read_csv(file_path)
-    print(get_poi_info_list(df))
\ No newline at end of file
+    print(get_poi_info_list(df))
@@ -7,6 +7,115 @@ from shapely.geometry import Polygon, MultiPolygon
 from shapely.errors import WKTReadingError
 import numpy as np
 from geopy.distance import geodesic  # 计算球面距离
+import hashlib
+import os
+import tempfile
+import threading
+from typing import Dict, List, Optional
+from use_GaoDe_api.geometry import (area_weighted_centroid, haversine_km, parse_boundary, points_in_rings,
+                                    simplify_rings)
+from utils.perf import perf_recorder
+
+BOUNDARY_CACHE_DIR = os.path.join(".cache", "boundaries")
+BOUNDARY_RENDER_TOLERANCE = 0.0005  # 绘制时的简化阈值（度，约50米）
+
+
+class RegionBoundary:
+    """
+    一个地区的边界：多边形坐标数组、面积加权质心和面积
+
+    rings 为 (n, 2) 的 [经度, 纬度] 数组列表，center 为 (纬度, 经度)。
+    """
+
+    def __init__(self, keywords: str, rings: List[np.ndarray]) -> None:
+        self.keywords = keywords
+        self.rings = rings
+        center_lat, center_lng, self.area_km2 = area_weighted_centroid(rings)
+        self.center = (center_lat, center_lng)
+
+    def simplified(self, tolerance: float = BOUNDARY_RENDER_TOLERANCE) -> List[np.ndarray]:
+        """用于绘制的简化多边形"""
+        return simplify_rings(self.rings, tolerance)
+
+    @property
+    def max_radius_km(self) -> float:
+        """质心到最远边界点的距离，用于把距离归一化为中心性得分"""
+        if not hasattr(self, "_max_radius_km"):
+            vertices = np.concatenate(self.rings)
+            self._max_radius_km = float(haversine_km(vertices[:, 1], vertices[:, 0], *self.center).max())
+        return self._max_radius_km
+
+    def contains(self, lat: np.ndarray, lng: np.ndarray) -> np.ndarray:
+        """批量判断点是否在地区内"""
+        return points_in_rings(lat, lng, self.rings)
+
+    def distance_to_center_km(self, lat: np.ndarray, lng: np.ndarray) -> np.ndarray:
+        """批量计算点到地区质心的球面距离（千米）"""
+        return haversine_km(np.asarray(lat, dtype=np.float64), np.asarray(lng, dtype=np.float64), *self.center)
+
+
+_boundary_cache: Dict[str, RegionBoundary] = {}
+_boundary_cache_lock = threading.Lock()
+
+
+def _boundary_cache_path(keywords: str) -> str:
+    return os.path.join(BOUNDARY_CACHE_DIR, hashlib.sha1(keywords.encode("utf-8")).hexdigest() + ".npz")
+
+
+def _load_boundary_file(keywords: str) -> Optional[List[np.ndarray]]:
+    path = _boundary_cache_path(keywords)
+    if not os.path.exists(path):
+        return None
+    try:
+        with np.load(path) as data:
+            return np.split(data["coords"], data["offsets"][1:-1])
+    except (OSError, ValueError, KeyError) as e:
+        print(f"读取边界缓存失败: {e}")
+        return None
+
+
+def _save_boundary_file(keywords: str, rings: List[np.ndarray]) -> None:
+    """所有多边形的坐标拼接存储，offsets 记录每个多边形的起止位置；先写临时文件再替换"""
+    os.makedirs(BOUNDARY_CACHE_DIR, exist_ok=True)
+    offsets = np.cumsum([0] + [len(ring) for ring in rings])
+    fd, tmp_path = tempfile.mkstemp(dir=BOUNDARY_CACHE_DIR, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            np.savez(f, coords=np.concatenate(rings), offsets=offsets)
+        os.replace(tmp_path, _boundary_cache_path(keywords))
+    except OSError as e:
+        print(f"写入边界缓存失败: {e}")
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+
+def get_region_boundary(keywords: str, refresh: bool = False) -> Optional[RegionBoundary]:
+    """
+    获取地区边界：先查进程内缓存，再查本地缓存（.cache/boundaries），都未命中时请求高德API并持久化
+
+    参数:
+        keywords: 地区名称
+        refresh: 是否忽略缓存重新请求
+    返回:
+        RegionBoundary，获取或解析失败时返回None
+    """
+    with _boundary_cache_lock:
+        boundary = None if refresh else _boundary_cache.get(keywords)
+    if boundary is not None:
+        return boundary
+    rings = None if refresh else _load_boundary_file(keywords)
+    if rings is None:
+        boundary_str = get_boundary_from_api(keywords)
+        rings = parse_boundary(boundary_str) if boundary_str else []
+        if not rings:
+            return None
+        _save_boundary_file(keywords, rings)
+    boundary = RegionBoundary(keywords, rings)
+    with _boundary_cache_lock:
+        _boundary_cache[keywords] = boundary
+    return boundary
+
+
 def visualize_boundary(keywords: str, interactive: bool = False, save_path=None):
     """
     可视化指定地区的边界
@@ -15,29 +124,14 @@ def visualize_boundary(keywords: str, interactive: bool = False, save_path=None)
         interactive: 是否生成交互式地图
         save_path: 保存图片路径，为None则不保存
     """
-    # 获取边界数据
-    boundary_str = get_boundary_from_api(keywords)
-    if not boundary_str:
+    # 获取边界数据（本地缓存，绘制时使用简化后的多边形）
+    boundary = get_region_boundary(keywords)
+    if boundary is None:
         print("无法获取边界数据，可视化失败")
         return
     
-    # 解析边界数据
     try:
-        polygons = []
-        # 分割多个多边形（如果有）
-        for poly_str in boundary_str.split('|'):
-            # 分割点坐标
-            points = poly_str.split(';')
-            # 转换为(经度, 纬度)元组列表
-            coords = [tuple(map(float, point.split(','))) for point in points if point]
-            # 创建多边形
-            if len(coords) >= 3:  # 多边形至少需要3个点
-                polygons.append(Polygon(coords))
-        
-        if not polygons:
-            print("无法解析有效的边界数据")
-            return
-            
+        polygons = [Polygon(ring) for ring in boundary.simplified()]
         # 创建MultiPolygon
         multi_poly = MultiPolygon(polygons)
         
@@ -78,9 +172,8 @@ def visualize_boundary(keywords: str, interactive: bool = False, save_path=None)
     
     # 交互式可视化
     else:
-        # 计算中心点
-        centroid = multi_poly.centroid
-        center = [centroid.y, centroid.x]  # folium使用[纬度, 经度]
+        # 中心点使用面积加权质心
+        center = list(boundary.center)  # folium使用[纬度, 经度]
         
         # 创建地图
         m = folium.Map(location=center, zoom_start=10, tiles='CartoDB positron')
@@ -123,7 +216,9 @@ def get_boundary_from_api(keywords: str) -> str:
         "extensions": 'all'
     }
     try:
-        response = requests.get(url, params=params)
+        with perf_recorder.span("高德请求(行政区边界)") as sp:
+            response = requests.get(url, params=params)
+            sp.size = len(response.content)
         response.raise_for_status()
         res = response.json()
         if res.get("status") != "1":
@@ -138,27 +233,12 @@ def get_boundary_from_api(keywords: str) -> str:
 def get_geometric_center(boundary_str: str) -> tuple[float, float]:
     """
     从边界坐标计算地区的几何中心（纬度, 经度）
-    处理多多边形情况（如包含飞地），返回整体质心
+    处理多多边形情况（如包含飞地），按鞋带公式计算各多边形的质心并按面积加权，
+    不会像顶点平均那样偏向采样密集的边
     """
     if not boundary_str:
         return (0.0, 0.0)
-    
-    all_points = []
-    # 解析多多边形边界
-    for poly_str in boundary_str.split('|'):
-        points = [p.split(',') for p in poly_str.split(';') if p]
-        # 转换为(经度, 纬度)浮点数
-        coords = [(float(lng), float(lat)) for lng, lat in points]
-        all_points.extend(coords)
-    
-    if not all_points:
-        return (0.0, 0.0)
-    
-    # 计算所有点的平均坐标（近似质心）
-    lngs = [p[0] for p in all_points]
-    lats = [p[1] for p in all_points]
-    center_lng = np.mean(lngs)
-    center_lat = np.mean(lats)
+    center_lat, center_lng, _ = area_weighted_centroid(parse_boundary(boundary_str))
     return (center_lat, center_lng)  # (纬度, 经度)
 
 # 比较两个点的几何中心性
@@ -171,13 +251,13 @@ def compare_geometric_centrality(
     比较两个点在目标地区内的几何中心性
     返回距离几何中心的距离及中心性判断
     """
-    # 1. 获取地区边界
-    boundary_str = get_boundary_from_api(keywords)
-    if not boundary_str:
+    # 1. 获取地区边界（本地缓存，不再每次请求）
+    boundary = get_region_boundary(keywords)
+    if boundary is None:
         return {"error": "无法获取地区边界"}
     
-    # 2. 计算地区几何中心
-    center = get_geometric_center(boundary_str)
+    # 2. 地区几何中心
+    center = boundary.center
     if center == (0.0, 0.0):
         return {"error": "无法计算几何中心"}
     
@@ -197,6 +277,33 @@ def compare_geometric_centrality(
     }
     return result
 
+# 批量计算多个点的中心性
+def score_centrality(keywords: str, lat, lng) -> Optional[Dict[str, np.ndarray]]:
+    """
+    批量计算点在目标地区内的几何中心性（如某个VIN或整个车队的全部行程目的地）
+
+    距离使用向量化的haversine公式，是否在地区内使用缓存边界上的批量点在多边形内判断，
+    不再逐点调用 geodesic。
+
+    参数:
+        keywords: 地区名称
+        lat: 纬度数组
+        lng: 经度数组
+    返回:
+        {"distance_km": 到质心的距离, "inside": 是否在地区内,
+         "centrality": 中心性得分（1 - 距离/质心到最远边界点的距离，截断到[0, 1]，地区外为0）}，
+        无法获取地区边界时返回None
+    """
+    boundary = get_region_boundary(keywords)
+    if boundary is None:
+        return None
+    lat = np.asarray(lat, dtype=np.float64)
+    lng = np.asarray(lng, dtype=np.float64)
+    distance = boundary.distance_to_center_km(lat, lng)
+    inside = boundary.contains(lat, lng)
+    centrality = np.where(inside, np.clip(1 - distance / boundary.max_radius_km, 0.0, 1.0), 0.0)
+    return {"distance_km": distance, "inside": inside, "centrality": centrality}
+
 # 示例用法
 if __name__ == "__main__":
     # 静态可视化示例
@@ -1,15 +1,155 @@
+import hashlib
 import requests
 import os
 import json
+import tempfile
+
+import numpy as np
+
+from use_GaoDe_api.geometry import douglas_peucker
+from use_GaoDe_api.rate_limit import amap_rate_limiter
+from utils.perf import perf_recorder
+
+STATIC_MAP_API_URL = "https://restapi.amap.com/v3/staticmap"
+# 可通过环境变量 STATIC_MAP_CACHE_DIR 指定缓存目录
+STATIC_MAP_CACHE_DIR = os.environ.get("STATIC_MAP_CACHE_DIR", os.path.join(".cache", "static_maps"))
+STATIC_MAP_CACHE_MAX_FILES = 512
+STATIC_MAP_MAX_URL_LENGTH = 8000  # 编码后请求URL的长度上限
+STATIC_MAP_MAX_PATH_POINTS = 100  # 高德静态地图单条折线最多100个点
+STATIC_MAP_MAX_LABELS = 10  # 高德静态地图最多10个标签
+
+
+def _thin_label_indices(count, max_labels):
+    """均匀抽取最多 max_labels 个标签点的下标，始终保留起点和终点"""
+    if count <= max_labels:
+        return list(range(count))
+    return sorted(set(np.linspace(0, count - 1, max_labels).round().astype(int).tolist()))
+
+
+def _static_map_params(key, locations, path_indices, label_indices, size, scale, line_color,
+                       line_weight, marker_color, label_color, label_bg_color):
+    """构建静态地图请求参数：折线使用简化后的点，标注点和标签只放在抽稀后的点上，标签保留原始序号"""
+    points_str = ";".join(f"{locations[i][0]},{locations[i][1]}" for i in path_indices)
+    paths_param = f"{line_weight},{line_color},1,0x0000FF,0.5:{points_str}"  # 透明度1（不透明）
+
+    marker_size = "small"
+    markers_param = f"{marker_size},{marker_color},0:" + ";".join(
+        f"{locations[i][0]},{locations[i][1]}" for i in label_indices)
+
+    # label_style: 内容(序号),字体(0=微软雅黑),粗体,字号,文字颜色,背景色
+    labels_param = "|".join(
+        f"地点{i + 1},0,1,12,{label_color},{label_bg_color}:{locations[i][0]},{locations[i][1]}"
+        for i in label_indices
+    )
+    return {
+        "key": key,
+        "paths": paths_param,
+        "markers": markers_param,  # 标注点样式
+        "labels": labels_param,    # 标签样式及位置
+        "size": size,
+        "scale": scale
+    }
+
+
+def _request_url_length(params):
+    return len(requests.Request("GET", STATIC_MAP_API_URL, params=params).prepare().url)
+
+
+def _fit_params_to_budget(key, locations, max_url_length=STATIC_MAP_MAX_URL_LENGTH, **style):
+    """
+    折线用 Douglas–Peucker 简化、标签均匀抽稀，逐步加大简化阈值直到点数和URL长度都在限制内
+
+    返回:
+        (请求参数, 折线保留的点数, 保留的标签数)
+    """
+    points = np.asarray(locations, dtype=np.float64)
+    # 经度按纬度余弦缩放，使简化阈值在东西、南北方向上的距离含义一致
+    planar = np.column_stack([points[:, 0] * np.cos(np.radians(points[:, 1].mean())), points[:, 1]])
+    label_indices = _thin_label_indices(len(locations), STATIC_MAP_MAX_LABELS)
+    path_indices = np.arange(len(locations))
+    tolerance = 1e-5  # 约1米
+    while True:
+        params = _static_map_params(key, locations, path_indices, label_indices, **style)
+        fits = len(path_indices) <= STATIC_MAP_MAX_PATH_POINTS and _request_url_length(params) <= max_url_length
+        if fits or len(path_indices) <= 2:
+            return params, len(path_indices), len(label_indices)
+        path_indices = douglas_peucker(planar, tolerance)
+        tolerance *= 2
+
+
+def _write_atomic(path, data):
+    """先写同目录临时文件再替换，其他进程不会读到写了一半的图片"""
+    directory = os.path.dirname(path) or "."
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def _static_map_cache_key(locations, style):
+    """图片缓存键：点序列 + 绘图样式（与API密钥无关）"""
+    payload = json.dumps({"locations": locations, "style": style}, sort_keys=True, ensure_ascii=False)
+    return hashlib.sha1(payload.encode("utf-8")).hexdigest()
+
+
+def _read_cached_map(cache_key):
+    cache_path = os.path.join(STATIC_MAP_CACHE_DIR, f"{cache_key}.png")
+    try:
+        with open(cache_path, "rb") as f:
+            data = f.read()
+    except OSError:
+        return None
+    try:
+        os.utime(cache_path)  # 刷新访问时间，淘汰时按最近使用保留
+    except OSError:
+        pass
+    return data
+
+
+def _write_cached_map(cache_key, data):
+    _write_atomic(os.path.join(STATIC_MAP_CACHE_DIR, f"{cache_key}.png"), data)
+    try:
+        entries = [entry for entry in os.scandir(STATIC_MAP_CACHE_DIR) if entry.name.endswith(".png")]
+    except OSError:
+        return
+    if len(entries) > STATIC_MAP_CACHE_MAX_FILES:
+        entries.sort(key=lambda entry: entry.stat().st_mtime)
+        for entry in entries[:len(entries) - STATIC_MAP_CACHE_MAX_FILES]:
+            try:
+                os.remove(entry.path)
+            except OSError:
+                pass
+
+
+def _save_map(save_path, data):
+    """保存图片到 save_path，图片过小（为空或损坏）时返回False"""
+    if len(data) < 1024:
+        print("错误：生成的图片为空或损坏")
+        return False
+    _write_atomic(save_path, data)
+    print(f"成功：地图已保存至 {os.path.abspath(save_path)}")
+    return True
+
+
 def draw_ordered_points(locations, key, size="800*600", 
                         scale=1,
                         line_color="0x0000FF", 
                         line_weight=5,
                         marker_color="0xFF0000", label_color="0xFFFFFF",
                         label_bg_color="0x5288d8", 
-                        save_path=None):
+                        save_path=None,
+                        use_cache=True):
     """
     绘制按顺序连接的经纬度点，使用labels字段为地点编号（支持任意序号）
+
+    点数较多时折线经 Douglas–Peucker 简化、标签均匀抽稀（保留起终点和原始序号），保证请求URL不超长；
+    图片按 (点序列, 样式) 的哈希缓存在 .cache/static_maps，相同路线不会重复请求高德API。
     
     参数:
         locations: 二维列表，每个元素为[经度, 纬度]
@@ -22,6 +162,7 @@ def draw_ordered_points(locations, key, size="800*600",
         label_color: 标签文字颜色（十六进制），默认0xFFFFFF（白色）
         label_bg_color: 标签背景色（十六进制），默认0x5288d8（蓝色）
         save_path: 可选，图片保存路径（如不需要保存可设为None）
+        use_cache: 是否使用本地图片缓存，默认True
     
     返回:
         成功：地图图片的二进制数据（response.content）
@@ -36,6 +177,7 @@ def draw_ordered_points(locations, key, size="800*600",
         print("错误：至少需要2个点才能绘制连线")
         return None
     
+    points = []
     for i, loc in enumerate(locations):
         if len(loc) != 2:
             print(f"错误：第{i+1}个点格式错误，需为[经度, 纬度]（如[116.3, 39.9]）")
@@ -49,76 +191,48 @@ def draw_ordered_points(locations, key, size="800*600",
         except ValueError:
             print(f"错误：第{i+1}个点经纬度必须为数字，当前值：{loc}")
             return None
+        points.append([round(lon, 6), round(lat, 6)])  # 高德坐标精度为6位小数，也缩短了URL
     
-    # 2. 构建API参数
-    ## 2.1 折线参数（按顺序连接所有点）
-    points_str = ";".join([f"{lon},{lat}" for lon, lat in locations])
-    paths_param = f"{line_weight},{line_color},1,0x0000FF,0.5:{points_str}"  # 透明度1（不透明）
-    
-    ## 2.2 标注点参数（仅显示标记，无内置label）
-    marker_size = "small"
-    markers_param = f"{marker_size},{marker_color},0:{';'.join([f'{lon},{lat}' for lon, lat in locations])}"
-    
-    ## 2.3 标签参数（使用labels字段实现编号，支持任意序号）
-    labels_list = []
-    for i, (lon, lat) in enumerate(locations, 1):
-        # 构建label_style字符串（注意逗号分隔，无多余符号）
-        label_style = (
-            f"地点{i},"       # content：序号（支持10以上数字）
-            "0,"          # font：0=微软雅黑
-            "1,"          # bold：1=粗体
-            "12,"         # fontSize：12号字
-            f"{label_color},"  # fontColor：文字颜色
-            f"{label_bg_color}"  # background：背景色
-        )
-        # 拼接单个标签：样式:经纬度
-        single_label = f"{label_style}:{lon},{lat}"
-        labels_list.append(single_label)
-    
-    # 多个标签用分号分隔
-    labels_param = "|".join(labels_list)
-    
-    # 3. 发送请求
-    api_url = "https://restapi.amap.com/v3/staticmap"
-    params = {
-        "key": key,
-        "paths": paths_param,
-        "markers": markers_param,  # 标注点样式
-        "labels": labels_param,    # 标签样式及位置
-        "size": size,
-        "scale": scale
+    style = {
+        "size": size, "scale": scale, "line_color": line_color, "line_weight": line_weight,
+        "marker_color": marker_color, "label_color": label_color, "label_bg_color": label_bg_color,
     }
-    with open("use_GaoDe_api/params.json", "w") as f:
-        json.dump(params,f, indent=2,ensure_ascii=False)
+
+    # 2. 查本地缓存
+    cache_key = _static_map_cache_key(points, style)
+    if use_cache:
+        cached = _read_cached_map(cache_key)
+        if cached is not None:
+            if save_path and not _save_map(save_path, cached):
+                return None
+            return cached
+
+    # 3. 构建API参数（控制在URL长度限制内）
+    params, path_points, label_count = _fit_params_to_budget(key, points, **style)
+    if path_points < len(points) or label_count < len(points):
+        print(f"共{len(points)}个点：折线简化为{path_points}个点，标注{label_count}个地点")
+
+    # 4. 发送请求
     try:
         print("正在请求高德API...")
-        response = requests.get(api_url, params=params, timeout=15)
+        amap_rate_limiter.acquire()
+        with perf_recorder.span("高德请求(静态地图)") as sp:
+            response = requests.get(STATIC_MAP_API_URL, params=params, timeout=15)
+            sp.size = len(response.content)
         
-        # 4. 校验响应是否为图片
+        # 5. 校验响应是否为图片
         if "image" not in response.headers.get("Content-Type", ""):
             print(f"API返回错误：{response.text}")
             return None
         
-        # 5. 可选：保存图片
-        if save_path:
-            save_dir = os.path.dirname(save_path)
-            if save_dir and not os.path.exists(save_dir):
-                os.makedirs(save_dir)
-            
-            if os.path.exists(save_path):
-                os.remove(save_path)
-            
-            with open(save_path, "wb") as f:
-                f.write(response.content)
-            
-            if os.path.getsize(save_path) < 1024:
-                print("错误：生成的图片为空或损坏")
-                os.remove(save_path)
-                return None
-            
-            print(f"成功：地图已保存至 {os.path.abspath(save_path)}")
+        # 6. 可选：保存图片
+        if save_path and not _save_map(save_path, response.content):
+            return None
+
+        if use_cache and len(response.content) >= 1024:
+            _write_cached_map(cache_key, response.content)
         
-        # 6. 返回图片二进制数据
+        # 7. 返回图片二进制数据
         return response.content
     
     except requests.exceptions.ConnectTimeout:
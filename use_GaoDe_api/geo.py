@@ -2,6 +2,8 @@ import json
 import requests
 from urllib.parse import quote
 from time import sleep
+from use_GaoDe_api.rate_limit import amap_rate_limiter
+from utils.perf import perf_recorder
 def get_location_geo_json_info(CITY,ADDRESS):
     '''
     (正)地理编码：将详细的结构化地址转换为高德经纬度坐标。且支持对地标性名胜景区、建筑物名称解析为高德经纬度坐标。
@@ -17,7 +19,10 @@ def get_location_geo_json_info(CITY,ADDRESS):
         'key': KEY,
         'output': OUTPUT
     }
-    response = json.loads(requests.get(url, params).content)
+    with perf_recorder.span("高德请求(地理编码)") as sp:
+        content = requests.get(url, params).content
+        sp.size = len(content)
+    response = json.loads(content)
     sleep(0.5)
     if 'geocodes' not in response:#如果请求出错
         if response['infocode'] == '30001':
@@ -56,11 +61,13 @@ def get_location_regeo_info(LOCATION, OUTPUT='json',RADIUS = 1000,EX = 'all'):
         'extensions': EX, #返回结果控制，extensions 参数默认取值是 base，也就是返回基本地址信息；extensions 参数取值为 all 时会返回基本地址信息、附近 POI 内容、道路信息以及道路交叉口信息。
         'poitype': '商场|购物服务'# 选填，以下内容需要 extensions 参数为 all 时才生效。逆地理编码在进行坐标解析之后不仅可以返回地址描述，也可以返回经纬度附近符合限定要求的 POI 内容（在 extensions 字段值为 all 时才会返回 POI 内容）。设置 POI 类型参数相当于为上述操作限定要求。参数仅支持传入 POI TYPECODE，可以传入多个 POI TYPECODE，相互之间用“|”分隔。
     }
-    response = requests.get(url, params = params)
+    amap_rate_limiter.acquire()  # 与其他高德请求共用限速，并发调用时也不会超过配额
+    with perf_recorder.span("高德请求(逆地理编码)") as sp:
+        response = requests.get(url, params = params)
+        sp.size = len(response.content)
     # answer = json.loads(response.content)
     # 这种方式也可以
     answer = response.json()
-    sleep(0.5)
     return answer
 
 def get_location_regeo(LOCATION):#输入是经纬度，输出是地址
@@ -84,7 +91,9 @@ def get_driving_path_info(ORIGIN,DESTINATION):
         'key': KEY,
         'extensions': EX,
     }
-    response = requests.get(url, params = params)
+    with perf_recorder.span("高德请求(驾车路径规划)") as sp:
+        response = requests.get(url, params = params)
+        sp.size = len(response.content)
     jd = response.json()
     sleep(0.3)
     return jd
@@ -0,0 +1,156 @@
+"""
+经纬度几何计算（NumPy向量化）
+
+- 高德边界字符串（"lng,lat;lng,lat|..."）解析为每个多边形一个 (n, 2) 数组
+- Douglas–Peucker 折线/多边形简化
+- 鞋带公式计算面积和面积加权质心（多多边形按各自面积加权）
+- 批量球面距离（haversine）和点是否在多边形内
+"""
+from typing import List, Tuple
+
+import numpy as np
+
+EARTH_RADIUS_KM = 6371.0088
+
+
+def parse_boundary(boundary_str: str) -> List[np.ndarray]:
+    """
+    解析高德行政区边界字符串，多边形之间用"|"分隔，点之间用";"分隔
+
+    返回:
+        多边形列表，每个为 (n, 2) 的 [经度, 纬度] float64 数组（少于3个点的多边形丢弃）
+    """
+    rings = []
+    for poly_str in boundary_str.split('|') if boundary_str else []:
+        poly_str = poly_str.strip().strip(';')
+        if not poly_str:
+            continue
+        ring = np.array(poly_str.replace(';', ',').split(','), dtype=np.float64).reshape(-1, 2)
+        if len(ring) >= 3:
+            rings.append(ring)
+    return rings
+
+
+def douglas_peucker(points: np.ndarray, tolerance: float) -> np.ndarray:
+    """
+    Douglas–Peucker 折线简化
+
+    参数:
+        points: (n, 2) 的平面坐标
+        tolerance: 允许偏离原折线的最大距离（与坐标同单位）
+    返回:
+        保留的点的下标（升序，始终包含首尾）
+    """
+    keep = np.zeros(len(points), dtype=bool)
+    keep[0] = keep[-1] = True
+    stack = [(0, len(points) - 1)]
+    while stack:
+        start, end = stack.pop()
+        if end - start < 2:
+            continue
+        segment = points[end] - points[start]
+        inner = points[start + 1:end] - points[start]
+        length = np.hypot(segment[0], segment[1])
+        if length == 0:  # 闭合多边形首尾重合时退化为到端点的距离
+            distances = np.hypot(inner[:, 0], inner[:, 1])
+        else:
+            distances = np.abs(segment[0] * inner[:, 1] - segment[1] * inner[:, 0]) / length
+        farthest = int(np.argmax(distances))
+        if distances[farthest] > tolerance:
+            split = start + 1 + farthest
+            keep[split] = True
+            stack.append((start, split))
+            stack.append((split, end))
+    return np.flatnonzero(keep)
+
+
+def simplify_rings(rings: List[np.ndarray], tolerance: float) -> List[np.ndarray]:
+    """简化多边形用于绘制（tolerance 单位为度），简化后不足4个点的多边形保留原样"""
+    simplified = []
+    for ring in rings:
+        reduced = ring[douglas_peucker(ring, tolerance)]
+        simplified.append(reduced if len(reduced) >= 4 else ring)
+    return simplified
+
+
+def _project(lng_lat: np.ndarray, origin_lat: float) -> np.ndarray:
+    """以 origin_lat 为基准的等距圆柱投影，单位为千米（城市尺度下误差可忽略）"""
+    scale = np.radians(1.0) * EARTH_RADIUS_KM
+    return np.column_stack([lng_lat[:, 0] * scale * np.cos(np.radians(origin_lat)), lng_lat[:, 1] * scale])
+
+
+def ring_area_centroid(ring: np.ndarray, origin_lat: float) -> Tuple[float, np.ndarray]:
+    """
+    鞋带公式计算单个多边形的面积（平方千米，取绝对值）和质心（[经度, 纬度]）
+    """
+    xy = _project(ring, origin_lat)
+    x, y = xy[:, 0], xy[:, 1]
+    x_next, y_next = np.roll(x, -1), np.roll(y, -1)
+    cross = x * y_next - x_next * y
+    signed_area = cross.sum() / 2
+    if signed_area == 0:
+        return 0.0, ring.mean(axis=0)
+    cx = ((x + x_next) * cross).sum() / (6 * signed_area)
+    cy = ((y + y_next) * cross).sum() / (6 * signed_area)
+    scale = np.radians(1.0) * EARTH_RADIUS_KM
+    centroid = np.array([cx / (scale * np.cos(np.radians(origin_lat))), cy / scale])
+    return abs(float(signed_area)), centroid
+
+
+def area_weighted_centroid(rings: List[np.ndarray]) -> Tuple[float, float, float]:
+    """
+    多多边形（如包含飞地、岛屿）的总面积和面积加权质心
+
+    返回:
+        (质心纬度, 质心经度, 总面积平方千米)，没有有效多边形时为 (0.0, 0.0, 0.0)
+    """
+    if not rings:
+        return (0.0, 0.0, 0.0)
+    origin_lat = float(np.concatenate(rings)[:, 1].mean())
+    areas, centroids = zip(*(ring_area_centroid(ring, origin_lat) for ring in rings))
+    areas = np.asarray(areas)
+    centroids = np.asarray(centroids)
+    total = float(areas.sum())
+    if total == 0:
+        center = np.concatenate(rings).mean(axis=0)
+    else:
+        center = (centroids * areas[:, None]).sum(axis=0) / total
+    return (float(center[1]), float(center[0]), total)
+
+
+def haversine_km(lat: np.ndarray, lng: np.ndarray, center_lat: float, center_lng: float) -> np.ndarray:
+    """一批点到某一点的球面距离（千米），输入为度"""
+    lat1, lng1 = np.radians(lat), np.radians(lng)
+    lat2, lng2 = np.radians(center_lat), np.radians(center_lng)
+    a = np.sin((lat2 - lat1) / 2) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin((lng2 - lng1) / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.clip(a, 0.0, 1.0)))
+
+
+def points_in_rings(lat: np.ndarray, lng: np.ndarray, rings: List[np.ndarray]) -> np.ndarray:
+    """
+    批量判断点是否在多多边形内（奇偶射线法，内环/飞地同样适用）
+
+    点先按纬度排序，每条边只与纬度落在 [边的最低纬度, 最高纬度) 内的那一段连续的点做比较，
+    总计算量约为 点数 × 水平线与边界的平均交点数，而不是 点数 × 边数。
+
+    返回:
+        与输入等长的布尔数组
+    """
+    lat = np.asarray(lat, dtype=np.float64)
+    lng = np.asarray(lng, dtype=np.float64)
+    order = np.argsort(lat, kind="stable")
+    sorted_lat, sorted_lng = lat[order], lng[order]
+    parity = np.zeros(len(lat), dtype=bool)
+    for ring in rings:
+        x0, y0 = ring[:, 0], ring[:, 1]
+        x1, y1 = np.roll(x0, -1), np.roll(y0, -1)
+        starts = np.searchsorted(sorted_lat, np.minimum(y0, y1), side="left")
+        ends = np.searchsorted(sorted_lat, np.maximum(y0, y1), side="left")
+        for edge in np.flatnonzero(ends > starts):
+            start, end = starts[edge], ends[edge]
+            ys = sorted_lat[start:end]
+            x_cross = x0[edge] + (ys - y0[edge]) * (x1[edge] - x0[edge]) / (y1[edge] - y0[edge])
+            parity[start:end] ^= sorted_lng[start:end] < x_cross
+    inside = np.empty(len(lat), dtype=bool)
+    inside[order] = parity
+    return inside
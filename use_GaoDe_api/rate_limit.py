@@ -0,0 +1,34 @@
+import os
+import threading
+import time
+
+# 高德Web服务的每秒请求数上限（按开发者账号的配额调整）
+AMAP_MAX_QPS = float(os.environ.get("AMAP_MAX_QPS", 3))
+
+
+class RateLimiter:
+    """
+    线程安全的请求限速器：相邻两次放行至少间隔 1/qps 秒
+
+    多个线程并发请求时，各线程按到达顺序领取放行时间点，在锁外等待，互不阻塞。
+    """
+
+    def __init__(self, qps: float) -> None:
+        self.interval = 1.0 / qps if qps > 0 else 0.0
+        self._next_slot = 0.0
+        self._lock = threading.Lock()
+
+    def acquire(self) -> None:
+        """阻塞到可以发出下一个请求"""
+        if self.interval == 0:
+            return
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next_slot)
+            self._next_slot = slot + self.interval
+        if slot > now:
+            time.sleep(slot - now)
+
+
+# 同一进程内所有高德请求共用的限速器
+amap_rate_limiter = RateLimiter(AMAP_MAX_QPS)
@@ -0,0 +1,120 @@
+import json
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, Iterable, Optional
+
+import numpy as np
+
+from use_GaoDe_api.geo import get_location_regeo_info
+
+REGEO_COORD_DECIMALS = 4  # 坐标取4位小数（约10米）后去重，同一停车点的GPS抖动只请求一次
+REGEO_MAX_WORKERS = 4  # 并发请求线程数（实际请求速率另受高德限速器约束）
+# 可通过环境变量 REGEO_CACHE_PATH 指定缓存文件
+DEFAULT_REGEO_CACHE_PATH = Path(os.environ.get("REGEO_CACHE_PATH", Path(".cache") / "regeo_addresses.json"))
+
+
+def location_keys(lon, lat, decimals: int = REGEO_COORD_DECIMALS) -> np.ndarray:
+    """把经纬度数组（向量化地）格式化为去重用的 "经度,纬度" 字符串，缺失坐标为空字符串"""
+    lon = np.asarray(lon, dtype=np.float64)
+    lat = np.asarray(lat, dtype=np.float64)
+    fmt = f"%.{decimals}f"
+    keys = np.char.add(np.char.add(np.char.mod(fmt, lon), ","), np.char.mod(fmt, lat)).astype(object)
+    keys[np.isnan(lon) | np.isnan(lat)] = ""
+    return keys
+
+
+class RegeoClient:
+    """
+    带持久化缓存的批量逆地理编码客户端
+
+    同一批坐标先去重，已缓存的直接查表，其余在线程池中并发请求高德API（受 amap_rate_limiter 限速），
+    成功的结果写入本地JSON缓存，跨文件、跨进程复用；写盘时先合并磁盘上的内容再原子替换。
+    """
+
+    def __init__(self, path: Optional[Path] = None, max_workers: int = REGEO_MAX_WORKERS) -> None:
+        self.path = Path(path) if path is not None else DEFAULT_REGEO_CACHE_PATH
+        self.max_workers = max_workers
+        self._addresses: Dict[str, str] = {}
+        self._lock = threading.Lock()
+        self._loaded = False
+
+    def _read_file(self) -> Dict[str, str]:
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            return {str(k): str(v) for k, v in data.items()} if isinstance(data, dict) else {}
+        except FileNotFoundError:
+            return {}
+        except (json.JSONDecodeError, OSError) as e:
+            print(f"加载逆地理编码缓存失败: {str(e)}，将使用空缓存")
+            return {}
+
+    def _ensure_loaded(self) -> None:
+        """首次使用时加载磁盘上的缓存（调用方持有锁）"""
+        if not self._loaded:
+            self._addresses.update(self._read_file())
+            self._loaded = True
+
+    def _save(self, addresses: Dict[str, str]) -> None:
+        with self._lock:
+            self._addresses.update(addresses)
+            merged = self._read_file()
+            merged.update(self._addresses)
+            self._addresses = merged
+            tmp_path = self.path.with_suffix(f".{os.getpid()}.tmp")
+            try:
+                self.path.parent.mkdir(parents=True, exist_ok=True)
+                with open(tmp_path, "w", encoding="utf-8") as f:
+                    json.dump(merged, f, ensure_ascii=False)
+                os.replace(tmp_path, self.path)
+            except OSError as e:
+                print(f"保存逆地理编码缓存失败: {str(e)}")
+                tmp_path.unlink(missing_ok=True)
+
+    def set_path(self, path: Path) -> None:
+        """切换到另一个缓存文件（丢弃内存中的内容，下次使用时从新文件加载）"""
+        with self._lock:
+            self.path = Path(path)
+            self._addresses = {}
+            self._loaded = False
+
+    @staticmethod
+    def _fetch(location: str) -> Optional[str]:
+        """请求单个坐标的地址，失败时返回None（不写入缓存，下次重试）"""
+        try:
+            address = get_location_regeo_info(location, 'json', '1000', 'all')['regeocode']['formatted_address']
+        except Exception as e:
+            print(f"逆地理编码{location}失败: {str(e)}")
+            return None
+        return address if isinstance(address, str) else ""  # 无地址时高德返回空列表
+
+    def resolve(self, locations: Iterable[str]) -> Dict[str, str]:
+        """
+        批量逆地理编码
+
+        参数:
+            locations: "经度,纬度" 字符串（可重复，空字符串忽略）
+        返回:
+            {坐标: 地址}，请求失败的坐标不出现在结果中
+        """
+        unique = [location for location in dict.fromkeys(locations) if location]
+        with self._lock:
+            self._ensure_loaded()
+            result = {location: self._addresses[location] for location in unique if location in self._addresses}
+        missing = [location for location in unique if location not in result]
+        if missing:
+            print(f"逆地理编码：共{len(unique)}个坐标，缓存命中{len(result)}个，请求{len(missing)}个")
+            with ThreadPoolExecutor(max_workers=max(1, min(self.max_workers, len(missing))),
+                                    thread_name_prefix="regeo") as executor:
+                fetched = {location: address
+                           for location, address in zip(missing, executor.map(self._fetch, missing))
+                           if address is not None}
+            self._save(fetched)
+            result.update(fetched)
+        return result
+
+
+# 创建全局逆地理编码客户端实例
+regeo_client = RegeoClient()
@@ -1,14 +1,16 @@
 from openai import AzureOpenAI  # 注意导入方式变化
 from openai import OpenAI
+from utils.perf import perf_recorder
 def ask_LLMmodel(input, prompt ,model_name = 'gpt4o'):
     if type(input) != str:
         input = str(input)
     if type(prompt) != str:
         prompt = str(prompt)
-    if model_name == 'gpt4o':
-        return askGPT(input, prompt)
-    elif model_name == 'qwen':
-        return askqwen(input, prompt)
+    with perf_recorder.span(f"LLM调用({model_name})", size=len(input) + len(prompt)):
+        if model_name == 'gpt4o':
+            return askGPT(input, prompt)
+        elif model_name == 'qwen':
+            return askqwen(input, prompt)
 
     return "请输入正确的模型名称"
 """ 
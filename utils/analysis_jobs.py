@@ -0,0 +1,97 @@
+# demo/utils/analysis_jobs.py
+"""
+耗时分析（LLM/高德调用、路线时间线和每日地图的绘制）的后台任务定义
+
+每个任务函数签名为 func(job, navi_info)，逐步上报进度和阶段性结果，
+由 utils.job_queue.job_manager 在线程池中执行，仪表盘和HTTP接口轮询任务状态。
+"""
+from collections import defaultdict
+from typing import Any, Dict, List, Optional
+
+import pandas as pd
+
+# 与 get_target_info 使用同一份特征标签模块（由 handle.py 导入并转出）
+from Handle_csv.handle import Basic_feature_label, load_label_template
+from Handle_csv.scenario.navigation.navigation_poi_time import plot_route, plot_route_timeline
+from Handle_csv.scenario.navigation.interactive_maps import create_daily_navigation_maps
+from utils.job_queue import Job, job_manager
+from utils.perf import perf_recorder
+
+LABEL_TEMPLATE = "Handle_csv/scenario/navigation/basic_features_labels_mapping_template.json"
+
+
+def anchors_job(job: Job, navi_info) -> Dict[str, Any]:
+    """推断居住地和工作地（两次LLM调用）"""
+    job.update(0.0, "正在推断居住地")
+    job.add_partial("居住地", navi_info.home)
+    job.check_cancelled()
+    job.update(0.5, "正在推断工作地")
+    job.add_partial("工作地", navi_info.workplace)
+    return {"居住地": navi_info.home, "工作地": navi_info.workplace}
+
+
+def feature_labels_job(job: Job, navi_info) -> Dict[str, Dict[str, Any]]:
+    """按模板逐个计算用户基本特征标签，每得到一个标签即作为阶段性结果上报，键为 '特征/标签'"""
+    total = sum(len(labels) for labels in load_label_template(LABEL_TEMPLATE).values())
+    feature_label = Basic_feature_label(navi_info, navi_info.config, compute=False)
+    for done, (feature, label, value) in enumerate(feature_label.iter_features_labels(template_json=LABEL_TEMPLATE), start=1):
+        job.add_partial(f"{feature}/{label}", value)
+        job.update(done / total, f"已完成 {feature}/{label}")
+        job.check_cancelled()
+    return feature_label.basic_features_labels_mapping
+
+
+def route_maps_job(job: Job, navi_info) -> Dict[str, Any]:
+    """按出发日期逐日生成路线静态地图（高德），每完成一天上报一张PNG，键为日期字符串"""
+    date_groups = defaultdict(list)
+    for row, date in zip(navi_info.trip_table, navi_info.trip_table.date):
+        if not pd.isna(date):  # 跳过无法解析的日期
+            date_groups[str(date)].append(row)
+    results = {}
+    for done, (date_str, rows) in enumerate(sorted(date_groups.items()), start=1):
+        job.update((done - 1) / len(date_groups), f"正在生成 {date_str} 的路线图")
+        results[date_str] = plot_route(rows)
+        job.add_partial(date_str, results[date_str])
+        job.check_cancelled()
+    return results
+
+
+def route_timeline_job(job: Job, navi_info) -> Optional[bytes]:
+    """绘制路线时间线PNG，没有有效行程时返回None"""
+    job.update(0.0, "正在绘制路线时间线")
+    with perf_recorder.span("图表渲染(路线时间线)", size=len(navi_info.trip_table)):
+        buf = plot_route_timeline(navi_info.trip_table)
+    return buf.getvalue() if buf is not None else None
+
+
+def daily_maps_job(job: Job, navi_info) -> List[Any]:
+    """按出发日期生成每日交互式导航地图（folium.Map列表）"""
+    job.update(0.0, "正在生成每日导航地图")
+    with perf_recorder.span("图表渲染(每日导航地图)", size=len(navi_info.trip_table)):
+        return create_daily_navigation_maps(navi_info.trip_table)
+
+
+# 任务类型 -> 任务函数
+ANALYSIS_JOBS = {
+    "anchors": anchors_job,
+    "feature_labels": feature_labels_job,
+    "route_maps": route_maps_job,
+    "route_timeline": route_timeline_job,
+    "daily_maps": daily_maps_job,
+}
+
+
+def submit_analysis(kind: str, fingerprint: str, navi_info) -> str:
+    """
+    提交一个分析任务
+
+    参数:
+        kind: ANALYSIS_JOBS 中的任务类型
+        fingerprint: 数据文件指纹（同一文件的同类任务未结束时复用）
+        navi_info: 导航信息
+    返回:
+        任务ID
+    """
+    if kind not in ANALYSIS_JOBS:
+        raise KeyError(f"不支持的分析任务: {kind}")
+    return job_manager.submit(kind, fingerprint, ANALYSIS_JOBS[kind], navi_info)
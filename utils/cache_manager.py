@@ -5,7 +5,7 @@ import pickle
 import hashlib
 import pandas as pd
 from pathlib import Path
-from typing import Dict, Any, Optional
+from typing import Callable, Dict, Any, Optional
 from utils.logger_setup import setup_logger  # 新增导入
 
 class CacheManager:
@@ -16,6 +16,7 @@ class CacheManager:
         self.cache_file = self.cache_dir / "offline_cache.pkl"
         self.cache_dir.mkdir(exist_ok=True)
         self.cache: Dict[str, Dict[str, Any]] = {}
+        self._memory_cache_clearers: Dict[str, Callable[[], None]] = {}  # 进程内缓存名 -> 清空函数
         self.logger = setup_logger()  # 初始化日志对象
         self._load_offline_cache()
     
@@ -47,10 +48,21 @@ class CacheManager:
         """获取指定文件的缓存"""
         return self.cache.get(filename)
     
-    def is_cache_valid(self, filename: str, df: pd.DataFrame) -> bool:
-        """检查缓存是否有效（文件存在且内容一致）"""
+    def is_cache_valid(self, filename: str, df: pd.DataFrame, fingerprint: Optional[str] = None) -> bool:
+        """
+        检查缓存是否有效（文件存在且内容一致）
+        
+        参数:
+            filename: 文件名
+            df: 当前数据帧
+            fingerprint: 上传文件内容的指纹（如md5），提供时直接比较指纹，无需对整个数据帧做哈希
+        """
         if filename not in self.cache:
             return False
+        
+        cached_fingerprint = self.cache[filename].get('fingerprint')
+        if fingerprint is not None and cached_fingerprint is not None:
+            return fingerprint == cached_fingerprint
             
         # 比较数据帧的哈希值确保内容一致
         cached_df = self.cache[filename].get('df')
@@ -59,7 +71,7 @@ class CacheManager:
             
         return self._df_hash(df) == self._df_hash(cached_df)
     
-    def update_file_cache(self, filename: str, df: pd.DataFrame) -> None:
+    def update_file_cache(self, filename: str, df: pd.DataFrame, fingerprint: Optional[str] = None) -> None:
         """更新文件缓存（创建或覆盖）"""
         # 初始化文件缓存结构
         if filename not in self.cache:
@@ -70,6 +82,7 @@ class CacheManager:
         
         # 更新数据帧并重置内容字典（数据变化时内容需重新计算）
         self.cache[filename]['df'] = df.copy()
+        self.cache[filename]['fingerprint'] = fingerprint
         self.cache[filename]['content_dict'] = {}
         
         # 保存到离线文件
@@ -96,14 +109,81 @@ class CacheManager:
         except Exception as e:
             print(f"内容 {content_key} 不可序列化，无法缓存: {str(e)}")
     
+    def _result_path(self, namespace: str, key: str) -> Path:
+        return self.cache_dir / namespace / f"{key}.pkl"
+    
+    def get_result_cache(self, namespace: str, key: str) -> Optional[Any]:
+        """
+        读取按指纹持久化的计算结果（每个结果一个文件，与文件缓存分开存放，避免每次保存都重写大文件）
+        
+        参数:
+            namespace: 结果类别，如 "navigation_info"
+            key: 结果键（通常是上传文件的指纹）
+        返回:
+            缓存的结果，不存在或读取失败时返回None
+        """
+        path = self._result_path(namespace, key)
+        if not path.exists():
+            return None
+        try:
+            with open(path, 'rb') as f:
+                result = pickle.load(f)
+            os.utime(path)  # 更新访问时间，用于LRU淘汰
+            return result
+        except Exception as e:
+            self.logger.error(f"读取结果缓存 {path} 失败: {str(e)}，将重新计算")
+            path.unlink(missing_ok=True)
+            return None
+    
+    def set_result_cache(self, namespace: str, key: str, result: Any, max_entries: int = 8) -> None:
+        """
+        持久化计算结果，超过max_entries时按最近使用时间淘汰最旧的结果
+        
+        参数:
+            namespace: 结果类别
+            key: 结果键
+            result: 可序列化的计算结果
+            max_entries: 该类别最多保留的结果数
+        """
+        path = self._result_path(namespace, key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_suffix(".pkl.tmp")
+        try:
+            with open(tmp_path, 'wb') as f:
+                pickle.dump(result, f)
+            os.replace(tmp_path, path)  # 原子替换，避免读到写了一半的文件
+        except Exception as e:
+            tmp_path.unlink(missing_ok=True)
+            self.logger.error(f"保存结果缓存 {path} 失败: {str(e)}")
+            return
+        
+        entries = sorted(path.parent.glob("*.pkl"), key=lambda p: p.stat().st_mtime, reverse=True)
+        for stale in entries[max_entries:]:
+            stale.unlink(missing_ok=True)
+            self.logger.info(f"结果缓存超出上限，已淘汰 {stale.name}")
+    
+    def register_memory_cache(self, name: str, clear_func: Callable[[], None]) -> None:
+        """
+        登记一个进程内缓存（各模块的LRU字典），清除所有缓存时一并清空
+
+        参数:
+            name: 缓存名称
+            clear_func: 在该缓存自己的锁内清空缓存的函数
+        """
+        self._memory_cache_clearers[name] = clear_func
+
     def clear_cache(self, filename: Optional[str] = None) -> None:
-        """清除缓存，可指定文件名（None则清除所有）"""
+        """清除缓存，可指定文件名（None则清除所有，包括按指纹持久化的计算结果和已登记的进程内缓存）"""
         if filename:
             if filename in self.cache:
                 del self.cache[filename]
                 print(f"已清除 {filename} 的缓存")
         else:
             self.cache = {}
+            for result_file in self.cache_dir.glob("*/*.pkl"):
+                result_file.unlink(missing_ok=True)
+            for clear_func in list(self._memory_cache_clearers.values()):
+                clear_func()
             print("已清除所有缓存")
         
         # 保存到离线文件
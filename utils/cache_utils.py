@@ -1,9 +1,123 @@
 # demo/utils/cache_utils.py
+import hashlib
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional
+import pandas as pd
 import streamlit as st
 from Handle_csv.scenario.navigation.navigation_info import get_navigation_info
+from utils.cache_manager import cache_manager
+from utils.logger_setup import setup_logger
 
-@st.cache_resource(show_spinner="正在处理导航基础数据...")
-def cache_navigation_info(df):
-    """缓存导航信息计算结果，避免重复调用get_navigation_info"""
-    return get_navigation_info(df)
+NAVIGATION_CACHE_NAMESPACE = "navigation_info"
+NAVIGATION_CACHE_MAX_ENTRIES = 8  # 内存和磁盘各最多保留的导航信息数量
 
+logger = setup_logger()
+
+# 进程内LRU缓存：指纹 -> navi_info
+_navigation_cache: "OrderedDict[str, object]" = OrderedDict()
+_navigation_cache_lock = threading.Lock()
+_compute_locks = {}  # 指纹 -> 锁，同一份数据只计算一次
+# 后台持久化线程：等居住地/工作地预取完成后再写盘，避免阻塞页面
+_persist_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="navi_cache_persist")
+
+
+def dataframe_fingerprint(df: pd.DataFrame) -> str:
+    """没有上传文件指纹时，用逐行哈希为DataFrame生成指纹（比to_csv快得多）"""
+    row_hashes = pd.util.hash_pandas_object(df, index=True).to_numpy()
+    header = f"{df.shape}|{'|'.join(map(str, df.columns))}".encode()
+    return hashlib.md5(header + row_hashes.tobytes()).hexdigest()
+
+
+def _remember(fingerprint: str, navi_info) -> None:
+    with _navigation_cache_lock:
+        _navigation_cache[fingerprint] = navi_info
+        _navigation_cache.move_to_end(fingerprint)
+        while len(_navigation_cache) > NAVIGATION_CACHE_MAX_ENTRIES:
+            _navigation_cache.popitem(last=False)
+
+
+def _clear_navigation_cache() -> None:
+    with _navigation_cache_lock:
+        _navigation_cache.clear()
+
+
+cache_manager.register_memory_cache(NAVIGATION_CACHE_NAMESPACE, _clear_navigation_cache)
+
+
+def _persist(fingerprint: str, navi_info) -> None:
+    try:
+        navi_info.home, navi_info.workplace  # 等待后台推断完成，使锚点一并持久化
+    except Exception as e:
+        logger.error(f"居住地/工作地推断失败，导航信息将不含锚点: {str(e)}")
+    cache_manager.set_result_cache(NAVIGATION_CACHE_NAMESPACE, fingerprint, navi_info,
+                                   max_entries=NAVIGATION_CACHE_MAX_ENTRIES)
+
+
+def get_cached_navigation_info(fingerprint: str):
+    """
+    只查缓存（进程内LRU和离线缓存目录），不触发计算
+
+    返回:
+        navi_info 对象，未缓存时返回None
+    """
+    with _navigation_cache_lock:
+        navi_info = _navigation_cache.get(fingerprint)
+        if navi_info is not None:
+            _navigation_cache.move_to_end(fingerprint)
+            return navi_info
+    navi_info = cache_manager.get_result_cache(NAVIGATION_CACHE_NAMESPACE, fingerprint)
+    if navi_info is not None:
+        _remember(fingerprint, navi_info)
+    return navi_info
+
+
+def cache_navigation_info(df: pd.DataFrame, fingerprint: Optional[str] = None, show_spinner: bool = True):
+    """
+    缓存导航信息计算结果，避免重复调用get_navigation_info
+
+    以上传文件的指纹为键：先查进程内LRU缓存，再查离线缓存目录，都未命中才重新计算；
+    新结果在后台写入离线缓存，服务重启后无需重新计算。居住地/工作地在后台预取，地图和知识图谱无需等待LLM。
+
+    参数:
+        df: 上传的数据
+        fingerprint: 上传文件内容的指纹，未提供时根据df计算
+        show_spinner: 计算时是否显示Streamlit加载提示（无界面调用时传False）
+    返回:
+        navi_info 对象
+    """
+    if fingerprint is None:
+        fingerprint = dataframe_fingerprint(df)
+
+    with _navigation_cache_lock:
+        navi_info = _navigation_cache.get(fingerprint)
+        if navi_info is not None:
+            _navigation_cache.move_to_end(fingerprint)
+            return navi_info
+        compute_lock = _compute_locks.setdefault(fingerprint, threading.Lock())
+
+    try:
+        with compute_lock:
+            # 等锁期间其他会话可能已经算好
+            with _navigation_cache_lock:
+                navi_info = _navigation_cache.get(fingerprint)
+            if navi_info is not None:
+                return navi_info
+
+            navi_info = cache_manager.get_result_cache(NAVIGATION_CACHE_NAMESPACE, fingerprint)
+            if navi_info is not None:
+                logger.info(f"导航信息从离线缓存加载: {fingerprint}")
+            else:
+                if show_spinner:
+                    with st.spinner("正在处理导航基础数据..."):
+                        navi_info = get_navigation_info(df, prefetch_anchors=True)
+                else:
+                    navi_info = get_navigation_info(df, prefetch_anchors=True)
+                _persist_executor.submit(_persist, fingerprint, navi_info)
+            _remember(fingerprint, navi_info)
+        return navi_info
+    finally:
+        # 计算失败也要释放该指纹的计算锁，避免锁表无限增长
+        with _navigation_cache_lock:
+            _compute_locks.pop(fingerprint, None)
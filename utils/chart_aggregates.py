@@ -0,0 +1,113 @@
+# demo/utils/chart_aggregates.py
+"""
+图表的服务端聚合
+
+直方图、二维密度、箱线图统计和KDE都在服务端用numpy聚合好，图表只绘制聚合结果，
+绘图开销只与分箱数有关，与数据行数无关；KDE在固定大小的抽样上计算。
+聚合结果按 (文件指纹, 图表, 参数) 缓存在进程内。
+"""
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from utils.cache_manager import cache_manager
+
+KDE_SAMPLE_SIZE = 20_000  # KDE使用的最大抽样数
+KDE_GRID_POINTS = 256
+BOX_OUTLIER_SAMPLE = 500  # 箱线图最多绘制的离群点数量
+AGGREGATE_CACHE_MAX_ENTRIES = 64
+
+
+def finite_values(series: pd.Series) -> np.ndarray:
+    """数值列转float64并去掉NaN/inf"""
+    values = pd.to_numeric(series, errors="coerce").to_numpy(dtype=np.float64, na_value=np.nan)
+    return values[np.isfinite(values)]
+
+
+def histogram(values: np.ndarray, bins: int) -> Dict[str, np.ndarray]:
+    """返回 {"counts": 每箱频数, "edges": 箱边界}"""
+    counts, edges = np.histogram(values, bins=bins)
+    return {"counts": counts, "edges": edges}
+
+
+def sampled_kde(values: np.ndarray, edges: np.ndarray, sample_size: int = KDE_SAMPLE_SIZE,
+                grid_points: int = KDE_GRID_POINTS, seed: int = 0) -> Optional[Dict[str, np.ndarray]]:
+    """
+    抽样后的高斯核密度估计（Scott带宽），按直方图的箱宽换算为频数尺度，可直接叠加在直方图上
+
+    返回:
+        {"x": 网格, "y": 频数尺度的密度}，样本不足或方差为0时返回None
+    """
+    if len(values) < 2:
+        return None
+    sample = values
+    if len(values) > sample_size:
+        sample = np.random.default_rng(seed).choice(values, size=sample_size, replace=False)
+    std = sample.std(ddof=1)
+    if not np.isfinite(std) or std == 0:
+        return None
+    bandwidth = std * len(sample) ** (-1 / 5)
+    grid = np.linspace(edges[0], edges[-1], grid_points)
+    density = np.zeros(grid_points)
+    # 按块计算，避免 grid × sample 的大矩阵
+    for start in range(0, len(sample), 4096):
+        diff = (grid[:, None] - sample[None, start:start + 4096]) / bandwidth
+        density += np.exp(-0.5 * diff * diff).sum(axis=1)
+    density /= len(sample) * bandwidth * np.sqrt(2 * np.pi)
+    bin_width = (edges[-1] - edges[0]) / max(len(edges) - 1, 1)
+    return {"x": grid, "y": density * len(values) * bin_width}
+
+
+def density_2d(x: np.ndarray, y: np.ndarray, bins: int) -> Dict[str, np.ndarray]:
+    """散点图的二维分箱计数，返回 {"counts": (bins, bins) 计数, "x_edges", "y_edges"}"""
+    counts, x_edges, y_edges = np.histogram2d(x, y, bins=bins)
+    return {"counts": counts, "x_edges": x_edges, "y_edges": y_edges}
+
+
+def box_stats(values: np.ndarray, label: str, seed: int = 0) -> Dict[str, Any]:
+    """
+    箱线图统计（matplotlib Axes.bxp 的输入格式），须线为1.5倍四分位距内的最远点，离群点最多抽样 BOX_OUTLIER_SAMPLE 个
+    """
+    q1, med, q3 = np.percentile(values, [25, 50, 75])
+    iqr = q3 - q1
+    is_outlier = (values < q1 - 1.5 * iqr) | (values > q3 + 1.5 * iqr)
+    inside = values[~is_outlier]
+    outliers = values[is_outlier]
+    if len(outliers) > BOX_OUTLIER_SAMPLE:
+        outliers = np.random.default_rng(seed).choice(outliers, size=BOX_OUTLIER_SAMPLE, replace=False)
+    return {
+        "label": label, "med": med, "q1": q1, "q3": q3,
+        "whislo": inside.min() if len(inside) else q1,
+        "whishi": inside.max() if len(inside) else q3,
+        "fliers": outliers,
+        "outlier_count": int(is_outlier.sum()),
+    }
+
+
+_aggregate_cache: "OrderedDict[Tuple[Hashable, ...], Any]" = OrderedDict()
+_aggregate_cache_lock = threading.Lock()
+
+
+def _clear_aggregate_cache() -> None:
+    with _aggregate_cache_lock:
+        _aggregate_cache.clear()
+
+
+cache_manager.register_memory_cache("chart_aggregates", _clear_aggregate_cache)
+
+
+def cached_aggregate(key: Tuple[Hashable, ...], compute: Callable[[], Any]) -> Any:
+    """按键缓存聚合结果（键通常为 (文件指纹, 图表类型, 列, 参数...)），进程内LRU"""
+    with _aggregate_cache_lock:
+        if key in _aggregate_cache:
+            _aggregate_cache.move_to_end(key)
+            return _aggregate_cache[key]
+    result = compute()
+    with _aggregate_cache_lock:
+        _aggregate_cache[key] = result
+        while len(_aggregate_cache) > AGGREGATE_CACHE_MAX_ENTRIES:
+            _aggregate_cache.popitem(last=False)
+    return result
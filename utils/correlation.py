@@ -0,0 +1,136 @@
+# demo/utils/correlation.py
+"""
+分块累加的相关系数矩阵
+
+逐块累加 成对有效计数 / 成对和 / 成对平方和 / 交叉积（float64矩阵乘法），
+与 DataFrame.corr() 一样按成对有效值（pairwise complete）计算皮尔逊相关系数；
+累加器可以跨块、跨文件合并，结果按文件指纹持久化，热力图每次重绘不再重新计算。
+"""
+import threading
+from collections import OrderedDict
+from typing import List, Optional
+
+import numpy as np
+import pandas as pd
+
+from utils.cache_manager import cache_manager
+
+CORRELATION_CACHE_NAMESPACE = "correlation"
+CORRELATION_MAX_ENTRIES = 16
+CORRELATION_CHUNK_ROWS = 100_000
+
+
+class CorrelationAccumulator:
+    """
+    数值列的相关系数累加器
+
+    为了数值稳定，各列先减去第一个块的列均值（平移不改变协方差）再累加。
+    """
+
+    def __init__(self, columns: List[str]) -> None:
+        self.columns = list(columns)
+        p = len(self.columns)
+        self.shift: Optional[np.ndarray] = None
+        self.pair_count = np.zeros((p, p))  # 两列同时有效的行数
+        self.pair_sum = np.zeros((p, p))  # [i, j]: 列i在两列同时有效的行上的和
+        self.pair_sum_sq = np.zeros((p, p))  # [i, j]: 列i在两列同时有效的行上的平方和
+        self.cross = np.zeros((p, p))  # 交叉积之和
+
+    def update(self, chunk: pd.DataFrame) -> None:
+        values = chunk[self.columns].to_numpy(dtype=np.float64, na_value=np.nan)
+        valid = np.isfinite(values)
+        if self.shift is None:
+            with np.errstate(invalid="ignore"):
+                column_sums = np.where(valid, values, 0.0).sum(axis=0)
+                self.shift = np.where(valid.any(axis=0), column_sums / np.maximum(valid.sum(axis=0), 1), 0.0)
+        centered = np.where(valid, values - self.shift, 0.0)
+        mask = valid.astype(np.float64)
+        self.pair_count += mask.T @ mask
+        self.pair_sum += centered.T @ mask
+        self.pair_sum_sq += (centered * centered).T @ mask
+        self.cross += centered.T @ centered
+
+    def merge(self, other: "CorrelationAccumulator") -> "CorrelationAccumulator":
+        """合并列相同的另一个累加器（另一个的数据平移到本累加器的参照值上）"""
+        if other.columns != self.columns:
+            raise ValueError("只能合并列相同的相关系数累加器")
+        if other.shift is None:
+            return self
+        if self.shift is None:
+            self.shift = other.shift.copy()
+        # other 的值为 x - s_o，换算到 x - s_self 需要加 d = s_o - s_self
+        d = other.shift - self.shift
+        n = other.pair_count
+        sum_i = other.pair_sum  # [i, j]: sum(x_i - s_o_i)
+        self.pair_count += n
+        self.pair_sum += sum_i + d[:, None] * n
+        self.pair_sum_sq += other.pair_sum_sq + 2 * d[:, None] * sum_i + (d * d)[:, None] * n
+        self.cross += other.cross + d[:, None] * sum_i.T + d[None, :] * sum_i + np.outer(d, d) * n
+        return self
+
+    def variances(self) -> pd.Series:
+        """各列的样本方差"""
+        n = np.diag(self.pair_count)
+        total = np.diag(self.pair_sum)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            variance = (np.diag(self.pair_sum_sq) - total * total / n) / (n - 1)
+        return pd.Series(np.where(n > 1, variance, np.nan), index=self.columns)
+
+    def correlation(self, columns: Optional[List[str]] = None) -> pd.DataFrame:
+        """皮尔逊相关系数矩阵，可只取部分列"""
+        n = self.pair_count
+        sum_i, sum_j = self.pair_sum, self.pair_sum.T
+        with np.errstate(invalid="ignore", divide="ignore"):
+            covariance = n * self.cross - sum_i * sum_j
+            var_i = n * self.pair_sum_sq - sum_i * sum_i
+            var_j = var_i.T
+            corr = covariance / np.sqrt(var_i * var_j)
+        corr = np.where((n > 1) & (var_i > 0) & (var_j > 0), np.clip(corr, -1.0, 1.0), np.nan)
+        np.fill_diagonal(corr, np.where(np.diag(var_i) > 0, 1.0, np.nan))
+        result = pd.DataFrame(corr, index=self.columns, columns=self.columns)
+        return result.loc[columns, columns] if columns is not None else result
+
+    def top_variable_columns(self, k: int) -> List[str]:
+        """方差最大的k列（用于只展示变化最大的列）"""
+        return self.variances().dropna().sort_values(ascending=False).index[:k].tolist()
+
+
+def correlation_from_frame(df: pd.DataFrame, chunksize: int = CORRELATION_CHUNK_ROWS) -> CorrelationAccumulator:
+    """逐块累加数据帧所有数值列的相关系数"""
+    columns = df.select_dtypes(include=[np.number]).columns.tolist()
+    accumulator = CorrelationAccumulator(columns)
+    for start in range(0, len(df), chunksize):
+        accumulator.update(df.iloc[start:start + chunksize])
+    return accumulator
+
+
+_correlation_cache: "OrderedDict[str, CorrelationAccumulator]" = OrderedDict()
+_correlation_cache_lock = threading.Lock()
+
+
+def _clear_correlation_cache() -> None:
+    with _correlation_cache_lock:
+        _correlation_cache.clear()
+
+
+cache_manager.register_memory_cache(CORRELATION_CACHE_NAMESPACE, _clear_correlation_cache)
+
+
+def get_correlation(fingerprint: str, df: pd.DataFrame) -> CorrelationAccumulator:
+    """
+    按文件指纹获取相关系数累加器：先查进程内缓存，再查离线缓存目录，都未命中时逐块计算并持久化
+    """
+    with _correlation_cache_lock:
+        accumulator = _correlation_cache.get(fingerprint)
+    if accumulator is None:
+        accumulator = cache_manager.get_result_cache(CORRELATION_CACHE_NAMESPACE, fingerprint)
+        if accumulator is None:
+            accumulator = correlation_from_frame(df)
+            cache_manager.set_result_cache(CORRELATION_CACHE_NAMESPACE, fingerprint, accumulator,
+                                           max_entries=CORRELATION_MAX_ENTRIES)
+    with _correlation_cache_lock:
+        _correlation_cache[fingerprint] = accumulator
+        _correlation_cache.move_to_end(fingerprint)
+        while len(_correlation_cache) > CORRELATION_MAX_ENTRIES:
+            _correlation_cache.popitem(last=False)
+    return accumulator
@@ -0,0 +1,186 @@
+# demo/utils/frame_index.py
+"""
+大数据帧的筛选索引
+
+- 数值列：按值排序后的位置数组（排序索引），范围条件用二分查找定位，不再逐行比较
+- 其他列：分类编码后的倒排索引（每个取值 -> 行位置），等值条件直接取位置；
+  文本包含条件只在去重后的取值上匹配，再合并对应的行位置
+索引按列懒构建，同一文件（按指纹）只构建一次，多次筛选和翻页都复用。
+"""
+import os
+import tempfile
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from utils.cache_manager import cache_manager
+
+FRAME_INDEX_MAX_ENTRIES = 4  # 进程内最多保留的文件索引数量
+CSV_EXPORT_CHUNK_ROWS = 100_000  # 导出CSV时每块的行数
+
+
+class SortedColumnIndex:
+    """数值列的排序索引：values 为升序的非空值，positions 为对应的行位置"""
+
+    def __init__(self, series: pd.Series) -> None:
+        values = pd.to_numeric(series, errors="coerce").to_numpy(dtype=np.float64)
+        valid = np.flatnonzero(~np.isnan(values))
+        order = np.argsort(values[valid], kind="stable")
+        self.positions = valid[order]
+        self.values = values[self.positions]
+
+    @property
+    def min(self) -> Optional[float]:
+        return float(self.values[0]) if len(self.values) else None
+
+    @property
+    def max(self) -> Optional[float]:
+        return float(self.values[-1]) if len(self.values) else None
+
+    def range(self, low: float, high: float) -> np.ndarray:
+        """low <= 值 <= high 的行位置（无序）"""
+        start = np.searchsorted(self.values, low, side="left")
+        end = np.searchsorted(self.values, high, side="right")
+        return self.positions[start:end]
+
+
+class InvertedColumnIndex:
+    """分类/文本列的倒排索引：categories 为去重后的取值，每个取值对应一段连续的行位置"""
+
+    def __init__(self, series: pd.Series) -> None:
+        codes, categories = pd.factorize(series, sort=False)
+        self.categories = np.asarray(categories, dtype=object)
+        valid = codes >= 0
+        self.positions = np.flatnonzero(valid)[np.argsort(codes[valid], kind="stable")]
+        counts = np.bincount(codes[valid], minlength=len(self.categories))
+        self.offsets = np.concatenate(([0], np.cumsum(counts)))
+        self._lookup = {value: code for code, value in enumerate(self.categories)}
+
+    def __len__(self) -> int:
+        return len(self.categories)
+
+    def _positions_for_codes(self, codes: Iterable[int]) -> np.ndarray:
+        parts = [self.positions[self.offsets[code]:self.offsets[code + 1]] for code in codes]
+        return np.concatenate(parts) if parts else np.empty(0, dtype=np.int64)
+
+    def equals(self, values: Iterable[Any]) -> np.ndarray:
+        """取值属于 values 的行位置（无序）"""
+        return self._positions_for_codes(self._lookup[v] for v in values if v in self._lookup)
+
+    def contains(self, text: str, case: bool = False) -> np.ndarray:
+        """取值（转为字符串）包含 text 的行位置（无序），只在去重后的取值上做字符串匹配"""
+        matched = pd.Series(self.categories.astype(str)).str.contains(text, case=case, regex=False).to_numpy()
+        return self._positions_for_codes(np.flatnonzero(matched))
+
+
+class FrameIndex:
+    """一个数据帧的筛选索引集合，各列索引在首次使用时构建"""
+
+    def __init__(self, df: pd.DataFrame) -> None:
+        self.df = df
+        self._sorted: Dict[str, SortedColumnIndex] = {}
+        self._inverted: Dict[str, InvertedColumnIndex] = {}
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self.df)
+
+    def sorted_index(self, column: str) -> SortedColumnIndex:
+        with self._lock:
+            if column not in self._sorted:
+                self._sorted[column] = SortedColumnIndex(self.df[column])
+            return self._sorted[column]
+
+    def inverted_index(self, column: str) -> InvertedColumnIndex:
+        with self._lock:
+            if column not in self._inverted:
+                self._inverted[column] = InvertedColumnIndex(self.df[column])
+            return self._inverted[column]
+
+    def query(self, filters: List[Tuple[str, str, Any]]) -> np.ndarray:
+        """
+        按条件筛选
+
+        参数:
+            filters: [(列名, 条件类型, 参数)]，条件类型为
+                "range"    参数 (最小值, 最大值)，闭区间
+                "in"       参数 取值列表
+                "contains" 参数 子串（不区分大小写）
+        返回:
+            满足全部条件的行位置（升序，即原始顺序）
+        """
+        result = None
+        # 先算命中行少的条件，交集越早变小越快
+        candidates = []
+        for column, filter_type, value in filters:
+            if filter_type == "range":
+                positions = self.sorted_index(column).range(value[0], value[1])
+            elif filter_type == "in":
+                positions = self.inverted_index(column).equals(value)
+            elif filter_type == "contains":
+                if not value:
+                    continue
+                positions = self.inverted_index(column).contains(value)
+            else:
+                raise ValueError(f"不支持的筛选类型: {filter_type}")
+            candidates.append(positions)
+        for positions in sorted(candidates, key=len):
+            positions = np.sort(positions)
+            result = positions if result is None else np.intersect1d(result, positions, assume_unique=True)
+            if len(result) == 0:
+                break
+        if result is None:
+            return np.arange(len(self.df))
+        return result
+
+    def page(self, positions: np.ndarray, page: int, page_size: int) -> pd.DataFrame:
+        """取筛选结果的第 page 页（从1开始）"""
+        start = max(page - 1, 0) * page_size
+        return self.df.iloc[positions[start:start + page_size]]
+
+    def export_csv(self, positions: np.ndarray):
+        """
+        分块把筛选结果写成CSV（UTF-8）临时文件，不在内存中拼接整份CSV字符串
+
+        返回:
+            以 "rb" 打开的文件对象（io.BufferedReader，可直接传给 st.download_button）
+        """
+        with tempfile.NamedTemporaryFile(mode="wb", suffix=".csv", delete=False) as f:
+            path = f.name
+            for start in range(0, max(len(positions), 1), CSV_EXPORT_CHUNK_ROWS):
+                chunk = self.df.iloc[positions[start:start + CSV_EXPORT_CHUNK_ROWS]]
+                f.write(chunk.to_csv(index=False, header=(start == 0)).encode("utf-8"))
+        handle = open(path, "rb")
+        try:
+            os.unlink(path)  # 已打开的句柄仍可读取，文件对象回收后磁盘空间随之释放
+        except OSError:
+            pass  # Windows下不能删除已打开的文件，留给系统临时目录清理
+        return handle
+
+
+_frame_indexes: "OrderedDict[str, FrameIndex]" = OrderedDict()
+_frame_indexes_lock = threading.Lock()
+
+
+def get_frame_index(fingerprint: str, df: pd.DataFrame) -> FrameIndex:
+    """按文件指纹获取（或创建）数据帧的筛选索引，进程内LRU保留最近 FRAME_INDEX_MAX_ENTRIES 个"""
+    with _frame_indexes_lock:
+        frame_index = _frame_indexes.get(fingerprint)
+        if frame_index is None:
+            frame_index = FrameIndex(df)
+            _frame_indexes[fingerprint] = frame_index
+        _frame_indexes.move_to_end(fingerprint)
+        while len(_frame_indexes) > FRAME_INDEX_MAX_ENTRIES:
+            _frame_indexes.popitem(last=False)
+        return frame_index
+
+
+def _clear_frame_indexes() -> None:
+    with _frame_indexes_lock:
+        _frame_indexes.clear()
+
+
+cache_manager.register_memory_cache("frame_index", _clear_frame_indexes)
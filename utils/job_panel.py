@@ -0,0 +1,65 @@
+# demo/utils/job_panel.py
+"""
+仪表盘中后台分析任务的展示面板
+
+面板放在 st.fragment 中：任务未结束时每 JOB_POLL_INTERVAL_S 秒只重跑该面板（不重跑整页），
+阶段性结果随之出现；任务结束后触发一次整页重跑以停止轮询。任务失败时显示错误和重试按钮。
+"""
+from typing import Any, Callable, Dict
+
+import streamlit as st
+
+from utils.analysis_jobs import submit_analysis
+from utils.job_queue import job_manager, JOB_FAILED, JOB_CANCELLED, FINISHED_STATUSES
+
+JOB_POLL_INTERVAL_S = 2  # 任务未结束时面板的自动刷新间隔（秒）
+
+
+def get_analysis_job(kind: str, fingerprint: str, navi_info, retry: bool = False) -> Dict[str, Any]:
+    """
+    获取（必要时提交）某个文件某类分析任务的状态快照
+
+    参数:
+        kind: utils.analysis_jobs.ANALYSIS_JOBS 中的任务类型
+        fingerprint: 数据文件指纹
+        navi_info: 导航信息
+        retry: 最近的任务失败时是否重新提交（失败的任务保留错误信息，由用户点击重试）
+    返回:
+        任务状态快照
+    """
+    job = job_manager.find_latest(kind, fingerprint)
+    if job is None or job.status == JOB_CANCELLED or (retry and job.status == JOB_FAILED):
+        job_id = submit_analysis(kind, fingerprint, navi_info)
+    else:
+        job_id = job.job_id
+    return job_manager.get_status(job_id)
+
+
+def render_job_panel(kind: str, fingerprint: str, navi_info, title: str,
+                     render_results: Callable[[Dict[str, Any]], None]) -> None:
+    """
+    渲染一个后台任务的进度、错误和结果
+
+    参数:
+        kind, fingerprint, navi_info: 同 get_analysis_job
+        title: 任务名称（用于进度和错误提示）
+        render_results: 根据任务状态快照渲染结果的函数（任务进行中也会调用，用于展示阶段性结果）
+    """
+    snapshot = get_analysis_job(kind, fingerprint, navi_info)
+    run_every = None if snapshot["status"] in FINISHED_STATUSES else JOB_POLL_INTERVAL_S
+
+    @st.fragment(run_every=run_every)
+    def job_panel():
+        current = get_analysis_job(kind, fingerprint, navi_info)
+        if current["status"] == JOB_FAILED:
+            st.error(f"{title}失败: {current['error']}")
+            if st.button("重新计算", key=f"retry_{kind}_job"):
+                get_analysis_job(kind, fingerprint, navi_info, retry=True)
+                st.rerun()
+        elif current["status"] not in FINISHED_STATUSES:
+            st.progress(current["progress"], text=f"{title}{current['status']}：{current['message']}")
+        render_results(current)
+        if run_every is not None and current["status"] in FINISHED_STATUSES:
+            st.rerun()  # 任务已结束，整页重跑一次，面板不再定时刷新
+
+    job_panel()
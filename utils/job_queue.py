@@ -0,0 +1,190 @@
+# demo/utils/job_queue.py
+import time
+import uuid
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional
+from utils.logger_setup import setup_logger
+
+# 任务状态
+JOB_PENDING = "排队中"
+JOB_RUNNING = "运行中"
+JOB_DONE = "已完成"
+JOB_FAILED = "失败"
+JOB_CANCELLED = "已取消"
+FINISHED_STATUSES = (JOB_DONE, JOB_FAILED, JOB_CANCELLED)
+
+
+class JobCancelled(Exception):
+    """任务被取消时由 Job.check_cancelled 抛出"""
+
+
+class Job:
+    """
+    一个后台分析任务
+
+    任务函数通过 update() 上报进度、通过 add_partial() 上报阶段性结果，
+    轮询方通过 snapshot() 获取一致的状态副本。
+    """
+
+    def __init__(self, kind: str, fingerprint: str):
+        self.job_id = uuid.uuid4().hex[:12]
+        self.kind = kind
+        self.fingerprint = fingerprint
+        self.status = JOB_PENDING
+        self.progress = 0.0
+        self.message = ""
+        self.partial_results: "OrderedDict[str, Any]" = OrderedDict()
+        self.result: Any = None
+        self.error = ""
+        self.created_at = time.time()
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        self._cancel_event = threading.Event()
+        self._lock = threading.Lock()
+
+    def update(self, progress: Optional[float] = None, message: Optional[str] = None) -> None:
+        """上报进度（0~1）和当前步骤说明"""
+        with self._lock:
+            if progress is not None:
+                self.progress = min(max(float(progress), 0.0), 1.0)
+            if message is not None:
+                self.message = message
+
+    def add_partial(self, key: str, value: Any) -> None:
+        """上报一个阶段性结果（如单个标签、单日路线图）"""
+        with self._lock:
+            self.partial_results[key] = value
+
+    def cancel(self) -> None:
+        self._cancel_event.set()
+
+    def check_cancelled(self) -> None:
+        """任务函数在步骤之间调用，被取消时抛出 JobCancelled"""
+        if self._cancel_event.is_set():
+            raise JobCancelled(self.job_id)
+
+    @property
+    def finished(self) -> bool:
+        return self.status in FINISHED_STATUSES
+
+    def snapshot(self) -> Dict[str, Any]:
+        """返回任务状态的副本（阶段性结果为浅拷贝）"""
+        with self._lock:
+            end_time = self.finished_at or time.time()
+            return {
+                "job_id": self.job_id,
+                "kind": self.kind,
+                "fingerprint": self.fingerprint,
+                "status": self.status,
+                "progress": self.progress,
+                "message": self.message,
+                "partial_results": dict(self.partial_results),
+                "result": self.result,
+                "error": self.error,
+                "elapsed_s": round(end_time - (self.started_at or end_time), 3),
+            }
+
+
+class JobManager:
+    """后台任务管理：线程池执行、按任务ID查询、同一文件的同类任务去重"""
+
+    def __init__(self, max_workers: int = 4, max_finished_jobs: int = 100):
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="analysis_job")
+        self._jobs: "OrderedDict[str, Job]" = OrderedDict()
+        self._active: Dict[tuple, str] = {}  # (任务类型, 指纹) -> 正在进行的任务ID
+        self._lock = threading.Lock()
+        self.max_finished_jobs = max_finished_jobs
+        self.logger = setup_logger()
+
+    def submit(self, kind: str, fingerprint: str, func: Callable[..., Any], *args, **kwargs) -> str:
+        """
+        提交任务
+
+        参数:
+            kind: 任务类型（如 "feature_labels"）
+            fingerprint: 数据文件指纹；同一文件的同类任务未结束时直接返回已有任务ID
+            func: 任务函数，签名为 func(job, *args, **kwargs)，返回值作为最终结果
+        返回:
+            任务ID
+        """
+        with self._lock:
+            active_id = self._active.get((kind, fingerprint))
+            if active_id is not None:
+                return active_id
+            job = Job(kind, fingerprint)
+            self._jobs[job.job_id] = job
+            self._active[(kind, fingerprint)] = job.job_id
+            self._prune()
+        self._executor.submit(self._run, job, func, args, kwargs)
+        self.logger.info(f"[任务] 已提交 {kind} ({fingerprint}) -> {job.job_id}")
+        return job.job_id
+
+    def _run(self, job: Job, func: Callable[..., Any], args: tuple, kwargs: dict) -> None:
+        with job._lock:
+            job.status = JOB_RUNNING
+            job.started_at = time.time()
+        try:
+            job.check_cancelled()
+            result = func(job, *args, **kwargs)
+            with job._lock:
+                job.result = result
+                job.progress = 1.0
+                job.status = JOB_DONE
+        except JobCancelled:
+            with job._lock:
+                job.status = JOB_CANCELLED
+        except Exception as e:
+            with job._lock:
+                job.status = JOB_FAILED
+                job.error = str(e)
+            self.logger.error(f"[任务] {job.kind} ({job.job_id}) 失败: {str(e)}", exc_info=True)
+        finally:
+            with job._lock:
+                job.finished_at = time.time()
+            with self._lock:
+                if self._active.get((job.kind, job.fingerprint)) == job.job_id:
+                    del self._active[(job.kind, job.fingerprint)]
+            self.logger.info(f"[任务] {job.kind} ({job.job_id}) {job.status}，"
+                             f"耗时 {job.finished_at - job.started_at:.2f}秒")
+
+    def _prune(self) -> None:
+        """只保留最近 max_finished_jobs 个已结束的任务（调用方持有锁）"""
+        finished_ids = [job_id for job_id, job in self._jobs.items() if job.finished]
+        for job_id in finished_ids[:max(0, len(finished_ids) - self.max_finished_jobs)]:
+            del self._jobs[job_id]
+
+    def get_job(self, job_id: str) -> Optional[Job]:
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def get_status(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """任务状态快照，任务不存在时返回None"""
+        job = self.get_job(job_id)
+        return job.snapshot() if job is not None else None
+
+    def find_latest(self, kind: str, fingerprint: str) -> Optional[Job]:
+        """查找某文件某类任务中最新提交的一个"""
+        with self._lock:
+            for job in reversed(self._jobs.values()):
+                if job.kind == kind and job.fingerprint == fingerprint:
+                    return job
+        return None
+
+    def list_jobs(self) -> List[Dict[str, Any]]:
+        with self._lock:
+            jobs = list(self._jobs.values())
+        return [job.snapshot() for job in jobs]
+
+    def cancel(self, job_id: str) -> bool:
+        """请求取消任务（任务在下一个检查点结束），任务不存在或已结束返回False"""
+        job = self.get_job(job_id)
+        if job is None or job.finished:
+            return False
+        job.cancel()
+        return True
+
+
+# 创建全局任务管理器实例
+job_manager = JobManager()
@@ -1,44 +1,206 @@
+import atexit
+import copy
+import json
 import logging
 import os
+import queue
+import random
+import re
+import shutil
+import threading
+import time
 from datetime import datetime
-from logging.handlers import RotatingFileHandler
-import sys
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+from typing import Any, Dict, List, Optional
 
 _LOG_DIR = None
+_LOG_DIR_CREATOR_PID = None  # 创建日志目录的进程
+_LISTENER: Optional[QueueListener] = None
+_LISTENER_PID = None  # 监听线程所在进程（fork出的子进程没有该线程，需要重新初始化）
+
+MAIN_LOG_DIR = "Logger"
+# 保留策略：最多保留最近 LOG_KEEP_RUNS 次启动的日志目录，且删除超过 LOG_MAX_AGE_DAYS 天的目录
+LOG_KEEP_RUNS = int(os.environ.get("LOG_KEEP_RUNS", 20))
+LOG_MAX_AGE_DAYS = float(os.environ.get("LOG_MAX_AGE_DAYS", 30))
+# 子进程（如批处理的进程池）通过环境变量沿用父进程的日志目录，不再各自新建
+_LOG_DIR_ENV = "DASHBOARD_LOG_DIR"
+_RUN_DIR_PATTERN = re.compile(r"^\d{8}_\d{6}$")
+
+
+class JsonLineFormatter(logging.Formatter):
+    """每条日志输出为一行JSON，便于检索和统计"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        payload = {
+            "time": self.formatTime(record),
+            "level": record.levelname,
+            "logger": record.name,
+            "location": f"{record.module}:{record.funcName}:{record.lineno}",
+            "process": record.process,
+            "thread": record.threadName,
+            "message": record.getMessage(),
+        }
+        perf_payload = getattr(record, "perf", None)  # 性能记录的阶段、耗时、数据量
+        if perf_payload is not None:
+            payload["perf"] = perf_payload
+        diagnostics_payload = getattr(record, "diagnostics", None)
+        if diagnostics_payload is not None:
+            payload["diagnostics"] = diagnostics_payload
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            payload["exception"] = record.exc_text
+        return json.dumps(payload, ensure_ascii=False, default=str)
+
+
+class _DeferredFormatQueueHandler(QueueHandler):
+    """
+    只把日志记录放入队列，格式化和写文件都在监听线程中完成
+
+    标准 QueueHandler.prepare 会在调用线程中格式化整条日志；这里只合并消息参数、
+    把异常转成文本（traceback对象不能跨线程保留），保留模块、行号等字段供JSON格式化使用。
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+
+def _prune_log_dirs(main_log_dir: str, current_dir: str) -> None:
+    """按保留策略删除旧的日志目录（只处理 YYYYmmdd_HHMMSS 格式的目录，当前目录始终保留）"""
+    try:
+        run_dirs = sorted(
+            name for name in os.listdir(main_log_dir)
+            if _RUN_DIR_PATTERN.match(name) and os.path.isdir(os.path.join(main_log_dir, name))
+        )
+    except OSError:
+        return
+    cutoff = time.time() - LOG_MAX_AGE_DAYS * 86400
+    keep = set(run_dirs[-LOG_KEEP_RUNS:]) if LOG_KEEP_RUNS > 0 else set()
+    for name in run_dirs:
+        path = os.path.join(main_log_dir, name)
+        if os.path.abspath(path) == os.path.abspath(current_dir):
+            continue
+        expired = os.path.getmtime(path) < cutoff
+        if name not in keep or expired:
+            shutil.rmtree(path, ignore_errors=True)
+
+
+def _stop_listener() -> None:
+    diagnostics.flush()
+    if _LISTENER is not None:
+        _LISTENER.stop()
+
 
 def setup_logger():
-    global _LOG_DIR
-    
-    main_log_dir = "Logger"
-    if not os.path.exists(main_log_dir):
-        os.makedirs(main_log_dir)
-    
-    if _LOG_DIR is None:
-        current_time = datetime.now().strftime("%Y%m%d_%H%M%S")
-        _LOG_DIR = os.path.join(main_log_dir, current_time)
-        os.makedirs(_LOG_DIR, exist_ok=True)
-    
-    log_file = os.path.join(_LOG_DIR, "app.log")
-    
+    global _LOG_DIR, _LOG_DIR_CREATOR_PID, _LISTENER, _LISTENER_PID
+
     logger = logging.getLogger("dashboard_app")
-    logger.setLevel(logging.INFO)
-    
     if logger.handlers:
-        return logger
-    
-    formatter = logging.Formatter(
-        '%(asctime)s - %(name)s - %(module)s:%(funcName)s:%(lineno)d - %(levelname)s - %(message)s'
-    )
-    
-    # 仅保留文件处理器（移除控制台处理器）
+        if _LISTENER_PID == os.getpid():
+            return logger
+        for handler in list(logger.handlers):  # fork继承的队列没有监听线程消费
+            logger.removeHandler(handler)
+    logger.setLevel(logging.INFO)
+
+    if _LOG_DIR is None:
+        inherited_dir = os.environ.get(_LOG_DIR_ENV)
+        if inherited_dir and os.path.isdir(inherited_dir):
+            _LOG_DIR = inherited_dir
+        else:
+            os.makedirs(MAIN_LOG_DIR, exist_ok=True)
+            current_time = datetime.now().strftime("%Y%m%d_%H%M%S")
+            _LOG_DIR = os.path.join(MAIN_LOG_DIR, current_time)
+            os.makedirs(_LOG_DIR, exist_ok=True)
+            os.environ[_LOG_DIR_ENV] = _LOG_DIR
+            _LOG_DIR_CREATOR_PID = os.getpid()
+            _prune_log_dirs(MAIN_LOG_DIR, _LOG_DIR)
+
+    # 沿用父进程目录的子进程写各自的文件，避免多个进程轮转同一个文件
+    log_name = "app.log" if _LOG_DIR_CREATOR_PID == os.getpid() else f"app_{os.getpid()}.log"
+    log_file = os.path.join(_LOG_DIR, log_name)
+
+    # 仅保留文件处理器（移除控制台处理器），由后台监听线程写入，调用方只做入队
     file_handler = RotatingFileHandler(
         log_file,
         maxBytes=5*1024*1024,
         backupCount=3,
         encoding='utf-8'
     )
-    file_handler.setFormatter(formatter)
+    file_handler.setFormatter(JsonLineFormatter())
     file_handler.setLevel(logging.INFO)
-    logger.addHandler(file_handler)
+
+    log_queue = queue.SimpleQueue()
+    logger.addHandler(_DeferredFormatQueueHandler(log_queue))
+    _LISTENER = QueueListener(log_queue, file_handler, respect_handler_level=True)
+    _LISTENER.start()
+    if _LISTENER_PID is None:
+        atexit.register(_stop_listener)
+    _LISTENER_PID = os.getpid()
+
     logger.info(f"服务启动，日志存储目录：{_LOG_DIR}")
-    return logger
\ No newline at end of file
+    return logger
+
+
+class DiagnosticCounter:
+    """
+    逐行诊断信息的聚合计数器
+
+    热点循环中不再逐行print/写日志，只调用 record() 计数，并用蓄水池抽样保留少量示例；
+    阶段结束时调用 flush() 把计数和示例汇总成一条结构化日志。
+    """
+
+    def __init__(self, max_examples: int = 3, max_example_length: int = 200) -> None:
+        self.max_examples = max_examples
+        self.max_example_length = max_example_length
+        self._counts: Dict[str, int] = {}
+        self._examples: Dict[str, List[str]] = {}
+        self._lock = threading.Lock()
+        self._random = random.Random(0)
+
+    def record(self, key: str, example: Any = None) -> None:
+        """累计一次诊断事件，example 为可选的示例（如出错的原始值）"""
+        with self._lock:
+            count = self._counts.get(key, 0) + 1
+            self._counts[key] = count
+            if example is None:
+                return
+            examples = self._examples.setdefault(key, [])
+            if len(examples) < self.max_examples:
+                examples.append(str(example)[:self.max_example_length])
+            else:
+                slot = self._random.randrange(count)
+                if slot < self.max_examples:
+                    examples[slot] = str(example)[:self.max_example_length]
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        """当前累计的 {诊断项: {"count": 次数, "examples": [示例...]}}"""
+        with self._lock:
+            return {key: {"count": count, "examples": list(self._examples.get(key, []))}
+                    for key, count in self._counts.items()}
+
+    def flush(self, *keys: str) -> Dict[str, Dict[str, Any]]:
+        """
+        把指定诊断项（不指定则全部）的汇总写入日志并清零
+
+        返回:
+            写入日志的汇总，没有诊断事件时为空字典
+        """
+        with self._lock:
+            selected = keys or tuple(self._counts)
+            summary = {key: {"count": self._counts.pop(key), "examples": self._examples.pop(key, [])}
+                       for key in selected if key in self._counts}
+        if summary:
+            logger = setup_logger()
+            details = "，".join(f"{key} {item['count']} 次" for key, item in summary.items())
+            logger.warning(f"诊断汇总: {details}", extra={"diagnostics": summary})
+        return summary
+
+
+# 创建全局诊断计数器实例
+diagnostics = DiagnosticCounter()
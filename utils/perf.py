@@ -0,0 +1,126 @@
+# demo/utils/perf.py
+import time
+import threading
+import functools
+import pandas as pd
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, List, Optional
+from utils.logger_setup import setup_logger
+
+
+class _Span:
+    """单次计时的句柄，可在计时过程中补充数据量（如响应字节数）"""
+    __slots__ = ("stage", "size")
+
+    def __init__(self, stage: str, size: Optional[int] = None):
+        self.stage = stage
+        self.size = size
+
+
+class PerfRecorder:
+    """流水线各阶段的性能统计：墙钟耗时、调用次数、数据量"""
+
+    def __init__(self):
+        self._stats: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()  # 后台线程/线程池中的调用也会记录
+        self.logger = setup_logger()
+
+    def record(self, stage: str, elapsed: float, size: Optional[int] = None, stacklevel: int = 1) -> None:
+        """
+        记录一次阶段耗时
+
+        参数:
+            stacklevel: 日志位置取第几层调用方（1为直接调用 record 的位置，span/timed 会据此指向业务代码）
+        """
+        with self._lock:
+            stat = self._stats.get(stage)
+            if stat is None:
+                stat = {"calls": 0, "total_s": 0.0, "max_s": 0.0, "last_s": 0.0, "total_size": 0}
+                self._stats[stage] = stat
+            stat["calls"] += 1
+            stat["total_s"] += elapsed
+            stat["max_s"] = max(stat["max_s"], elapsed)
+            stat["last_s"] = elapsed
+            if size is not None:
+                stat["total_size"] += int(size)
+        size_info = f", 数据量 {size}" if size is not None else ""
+        self.logger.info(f"[性能] {stage}: {elapsed:.3f}秒{size_info}", stacklevel=stacklevel + 1,
+                         extra={"perf": {"stage": stage, "elapsed_s": round(elapsed, 6), "size": size}})
+
+    @contextmanager
+    def span(self, stage: str, size: Optional[int] = None, stacklevel: int = 1):
+        """
+        计时上下文管理器
+
+        用法:
+            with perf_recorder.span("CSV解析", size=len(raw)) as sp:
+                df = pd.read_csv(...)
+                sp.size = len(df)  # 可在结束前更新数据量
+        """
+        handle = _Span(stage, size)
+        start_time = time.perf_counter()
+        try:
+            yield handle
+        finally:
+            # 跳过本生成器和 contextlib 的 __exit__ 两层，日志位置为 with 语句所在处
+            self.record(stage, time.perf_counter() - start_time, handle.size, stacklevel=stacklevel + 2)
+
+    def timed(self, stage: str, size_func: Optional[Callable[..., int]] = None):
+        """
+        计时装饰器
+
+        参数:
+            stage: 阶段名称
+            size_func: 可选，根据被装饰函数的参数计算数据量
+        """
+        def decorator(func):
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                size = None
+                if size_func is not None:
+                    try:
+                        size = size_func(*args, **kwargs)
+                    except Exception:
+                        size = None
+                with self.span(stage, size, stacklevel=2):  # 日志位置为被装饰函数的调用处
+                    return func(*args, **kwargs)
+            return wrapper
+        return decorator
+
+    def get_stats(self) -> List[Dict[str, Any]]:
+        """返回各阶段统计的快照（按累计耗时降序）"""
+        with self._lock:
+            rows = [
+                {
+                    "阶段": stage,
+                    "调用次数": stat["calls"],
+                    "累计耗时(秒)": round(stat["total_s"], 4),
+                    "平均耗时(秒)": round(stat["total_s"] / stat["calls"], 4),
+                    "最大耗时(秒)": round(stat["max_s"], 4),
+                    "最近耗时(秒)": round(stat["last_s"], 4),
+                    "累计数据量": stat["total_size"],
+                }
+                for stage, stat in self._stats.items()
+            ]
+        return sorted(rows, key=lambda x: x["累计耗时(秒)"], reverse=True)
+
+    def to_dataframe(self) -> pd.DataFrame:
+        """以DataFrame形式返回统计结果，便于在仪表盘中展示"""
+        return pd.DataFrame(self.get_stats())
+
+    def log_summary(self) -> None:
+        """将当前统计汇总写入日志"""
+        for row in self.get_stats():
+            self.logger.info(
+                f"[性能汇总] {row['阶段']}: {row['调用次数']}次, 累计{row['累计耗时(秒)']}秒, "
+                f"平均{row['平均耗时(秒)']}秒, 数据量{row['累计数据量']}"
+            )
+
+    def reset(self) -> None:
+        """清空统计"""
+        with self._lock:
+            self._stats = {}
+
+
+# 创建全局性能统计实例
+perf_recorder = PerfRecorder()
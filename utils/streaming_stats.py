@@ -0,0 +1,251 @@
+# demo/utils/streaming_stats.py
+"""
+可合并的单遍统计累加器
+
+每列维护 count / 缺失数 / 均值 / 方差（Chan并行合并公式）/ 最小最大值 / 近似分位数（KLL式压缩采样），
+可以逐块（chunk）更新、跨文件合并，结果按文件指纹持久化，统计面板无需重新扫描数据；
+对放不进内存的文件，用 stats_from_csv 按块读取即可。
+"""
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from utils.cache_manager import cache_manager
+
+FRAME_STATS_CACHE_NAMESPACE = "frame_stats"
+FRAME_STATS_MAX_ENTRIES = 16
+STATS_CHUNK_ROWS = 200_000
+QUANTILE_SKETCH_SIZE = 2048  # 每层最多保留的样本数，越大分位数越准
+
+
+class QuantileSketch:
+    """
+    可合并的近似分位数草图
+
+    第 i 层的每个样本代表 2**i 个原始值；某层超过 k 个样本时排序、隔一个取一个（随机起点）升到上一层。
+    内存为 O(k·log(n/k))，排名误差约为 O(1/k)。
+    """
+
+    def __init__(self, k: int = QUANTILE_SKETCH_SIZE, seed: int = 0) -> None:
+        self.k = k
+        self.levels: List[np.ndarray] = [np.empty(0)]
+        self._rng = np.random.default_rng(seed)
+
+    def _compact(self) -> None:
+        level = 0
+        while level < len(self.levels):
+            items = self.levels[level]
+            if len(items) > self.k:
+                items = np.sort(items)
+                keep_odd = len(items) % 2  # 奇数个时留下最后一个在本层
+                promoted = items[self._rng.integers(2):len(items) - keep_odd:2]
+                self.levels[level] = items[len(items) - keep_odd:]
+                if level + 1 == len(self.levels):
+                    self.levels.append(np.empty(0))
+                self.levels[level + 1] = np.concatenate([self.levels[level + 1], promoted])
+            level += 1
+
+    def update(self, values: np.ndarray) -> None:
+        if len(values):
+            self.levels[0] = np.concatenate([self.levels[0], values])
+            self._compact()
+
+    def merge(self, other: "QuantileSketch") -> None:
+        for level, items in enumerate(other.levels):
+            if level == len(self.levels):
+                self.levels.append(np.empty(0))
+            self.levels[level] = np.concatenate([self.levels[level], items])
+        self._compact()
+
+    def quantiles(self, qs: Iterable[float]) -> List[float]:
+        values = np.concatenate(self.levels)
+        if len(values) == 0:
+            return [np.nan for _ in qs]
+        if len(self.levels) == 1:  # 还没有压缩过，样本就是全部原始值，结果与pandas一致
+            return [float(q) for q in np.quantile(values, list(qs))]
+        weights = np.concatenate([np.full(len(items), 2.0 ** level) for level, items in enumerate(self.levels)])
+        order = np.argsort(values, kind="stable")
+        values, cumulative = values[order], np.cumsum(weights[order])
+        total = cumulative[-1]
+        return [float(values[min(np.searchsorted(cumulative, q * total, side="left"), len(values) - 1)]) for q in qs]
+
+
+class ColumnAccumulator:
+    """单个数值列的累加器"""
+
+    def __init__(self) -> None:
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0  # 与均值差的平方和
+        self.min = np.inf
+        self.max = -np.inf
+        self.sketch = QuantileSketch()
+
+    def _combine(self, count: int, mean: float, m2: float) -> None:
+        if count == 0:
+            return
+        total = self.count + count
+        delta = mean - self.mean
+        self.mean += delta * count / total
+        self.m2 += m2 + delta * delta * self.count * count / total
+        self.count = total
+
+    def update(self, values: np.ndarray) -> None:
+        """values 为已去掉缺失值的float数组"""
+        if len(values) == 0:
+            return
+        chunk_mean = float(values.mean())
+        self._combine(len(values), chunk_mean, float(((values - chunk_mean) ** 2).sum()))
+        self.min = min(self.min, float(values.min()))
+        self.max = max(self.max, float(values.max()))
+        self.sketch.update(values)
+
+    def merge(self, other: "ColumnAccumulator") -> None:
+        self._combine(other.count, other.mean, other.m2)
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        self.sketch.merge(other.sketch)
+
+    @property
+    def std(self) -> float:
+        return float(np.sqrt(self.m2 / (self.count - 1))) if self.count > 1 else np.nan
+
+    def describe(self) -> Dict[str, float]:
+        """与 DataFrame.describe() 相同的统计项"""
+        if self.count == 0:
+            return {"count": 0.0, "mean": np.nan, "std": np.nan, "min": np.nan,
+                    "25%": np.nan, "50%": np.nan, "75%": np.nan, "max": np.nan}
+        q25, q50, q75 = self.sketch.quantiles([0.25, 0.5, 0.75])
+        return {"count": float(self.count), "mean": self.mean, "std": self.std, "min": self.min,
+                "25%": q25, "50%": q50, "75%": q75, "max": self.max}
+
+
+class FrameStats:
+    """
+    一个（或多个合并后的）数据文件的统计结果
+
+    数值列（np.number）维护 ColumnAccumulator，所有列维护缺失值数量。
+    """
+
+    def __init__(self) -> None:
+        self.rows = 0
+        self.columns: List[str] = []
+        self.null_counts: Dict[str, int] = {}
+        self.numeric: Dict[str, ColumnAccumulator] = {}
+
+    def _ensure_column(self, column: str) -> None:
+        if column not in self.null_counts:
+            self.columns.append(column)
+            self.null_counts[column] = self.rows  # 之前的块/文件中没有该列，视为缺失
+
+    def update(self, chunk: pd.DataFrame) -> None:
+        """用一个数据块更新统计"""
+        null_counts = chunk.isnull().sum()
+        for column in chunk.columns:
+            self._ensure_column(column)
+            self.null_counts[column] += int(null_counts[column])
+        for column in self.columns:
+            if column not in chunk.columns:
+                self.null_counts[column] += len(chunk)
+        for column in chunk.select_dtypes(include=[np.number]).columns:
+            values = chunk[column].to_numpy(dtype=np.float64, na_value=np.nan)
+            self.numeric.setdefault(column, ColumnAccumulator()).update(values[~np.isnan(values)])
+        self.rows += len(chunk)
+
+    def merge(self, other: "FrameStats") -> "FrameStats":
+        """合并另一个统计结果（如另一个文件），返回自身"""
+        for column in other.columns:
+            self._ensure_column(column)
+        for column in self.columns:
+            self.null_counts[column] += other.null_counts.get(column, other.rows)
+        for column, accumulator in other.numeric.items():
+            self.numeric.setdefault(column, ColumnAccumulator()).merge(accumulator)
+        self.rows += other.rows
+        return self
+
+    def describe(self) -> pd.DataFrame:
+        """数值列的描述统计（与 DataFrame.describe() 同样的行和列布局，分位数为近似值）"""
+        if not self.numeric:
+            return pd.DataFrame()
+        return pd.DataFrame({column: accumulator.describe() for column, accumulator in self.numeric.items()})
+
+    def missing(self) -> pd.DataFrame:
+        """各列的缺失值数量和比例"""
+        missing_values = pd.Series(self.null_counts, dtype="int64").reindex(self.columns)
+        return pd.DataFrame({
+            '缺失值数量': missing_values,
+            '缺失值比例(%)': (missing_values / self.rows * 100) if self.rows else missing_values * 0.0,
+        })
+
+
+def stats_from_frame(df: pd.DataFrame, chunksize: int = STATS_CHUNK_ROWS) -> FrameStats:
+    """逐块计算已加载数据帧的统计"""
+    stats = FrameStats()
+    for start in range(0, len(df), chunksize):
+        stats.update(df.iloc[start:start + chunksize])
+    if len(df) == 0:
+        stats.update(df)
+    return stats
+
+
+def stats_from_csv(source: Any, chunksize: int = STATS_CHUNK_ROWS, **read_csv_kwargs) -> FrameStats:
+    """按块读取CSV（路径或文件对象）计算统计，内存只占一个块，适合放不进内存的文件"""
+    stats = FrameStats()
+    for chunk in pd.read_csv(source, chunksize=chunksize, **read_csv_kwargs):
+        stats.update(chunk)
+    return stats
+
+
+def merge_frame_stats(stats_list: Iterable[FrameStats]) -> FrameStats:
+    """合并多个文件的统计"""
+    merged = FrameStats()
+    for stats in stats_list:
+        merged.merge(stats)
+    return merged
+
+
+_stats_cache: "OrderedDict[str, FrameStats]" = OrderedDict()
+_stats_cache_lock = threading.Lock()
+
+
+def _clear_stats_cache() -> None:
+    with _stats_cache_lock:
+        _stats_cache.clear()
+
+
+cache_manager.register_memory_cache(FRAME_STATS_CACHE_NAMESPACE, _clear_stats_cache)
+
+
+def get_frame_stats(fingerprint: str, df: Optional[pd.DataFrame] = None, source: Any = None) -> Optional[FrameStats]:
+    """
+    按文件指纹获取统计：先查进程内缓存，再查离线缓存目录，都未命中时从df或CSV源计算并持久化
+
+    参数:
+        fingerprint: 文件指纹
+        df: 已加载的数据帧
+        source: CSV路径或文件对象（df为None时按块读取）
+    返回:
+        FrameStats，未命中缓存且没有提供数据时返回None
+    """
+    with _stats_cache_lock:
+        stats = _stats_cache.get(fingerprint)
+    if stats is None:
+        stats = cache_manager.get_result_cache(FRAME_STATS_CACHE_NAMESPACE, fingerprint)
+        if stats is None:
+            if df is not None:
+                stats = stats_from_frame(df)
+            elif source is not None:
+                stats = stats_from_csv(source)
+            else:
+                return None
+            cache_manager.set_result_cache(FRAME_STATS_CACHE_NAMESPACE, fingerprint, stats,
+                                           max_entries=FRAME_STATS_MAX_ENTRIES)
+    with _stats_cache_lock:
+        _stats_cache[fingerprint] = stats
+        _stats_cache.move_to_end(fingerprint)
+        while len(_stats_cache) > FRAME_STATS_MAX_ENTRIES:
+            _stats_cache.popitem(last=False)
+    return stats